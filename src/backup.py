@@ -0,0 +1,257 @@
+"""Content-addressed backup store for the game data files.
+
+Every save takes a snapshot of the files about to be overwritten. Files are
+split into chunks at record boundaries (a line starting with an Id, as in
+gfio.read_pipe_file) using content-defined cut points, each chunk is stored
+once under its SHA-256, so an edit only adds the few chunks around the edited
+records - hundreds of snapshots of a 200 MB C_Item cost little more than the
+edits themselves, and the identical C_/S_ pair is stored once.
+
+Layout (under `<workspace>/.gfeditor/backups`, see default_store_for):
+
+    objects/ab/cdef...      zlib-compressed chunk, named by the SHA-256 of its content
+    snapshots/<id>.json     {id, created, label, files: [{path, size, sha256, chunks}]}
+
+CLI: `gfeditor backups list|show|restore|prune` (cli.py).
+"""
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import tempfile
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import gfio, instrument
+except ImportError:
+    import gfio
+    import instrument
+
+STORE_DIRNAME = '.gfeditor/backups'
+# a cut point after about one record in AVG_RECORDS, chunks never larger than MAX_CHUNK
+AVG_RECORDS = 64
+MAX_CHUNK = 1024 * 1024
+COMPRESS_LEVEL = 6
+
+_RECORD_START = re.compile(rb'\n(?=[ \t\r\n]*\d+\|)')
+
+
+class BackupError(Exception):
+    pass
+
+
+def default_store_for(path) -> Path:
+    """Store for a data file: next to the Assets folder that contains it, else next to the file."""
+    p = Path(path).resolve()
+    for parent in p.parents:
+        if parent.name == 'Assets':
+            return parent.parent / STORE_DIRNAME
+    return p.parent / STORE_DIRNAME
+
+
+def record_boundaries(data: bytes) -> List[int]:
+    """Offsets where records start (after the newline before an Id); plain lines if there are no Ids."""
+    cuts = [m.end() for m in _RECORD_START.finditer(data)]
+    if not cuts:
+        cuts = [m.end() for m in re.finditer(rb'\n', data)]
+    return cuts
+
+
+def split_chunks(data: bytes, avg_records: int = AVG_RECORDS, max_chunk: int = MAX_CHUNK) -> List[memoryview]:
+    """Split data at record boundaries; a record whose CRC ends a chunk is chosen by content,
+    so inserting or editing a record only changes the chunk(s) around it."""
+    view = memoryview(data)
+    out = []
+    start = 0
+    prev = 0
+    avg_records = max(1, avg_records)
+    for cut in record_boundaries(data) + [len(data)]:
+        if cut <= prev:
+            continue
+        rec = view[prev:cut]
+        if cut - start >= max_chunk or zlib.crc32(rec) % avg_records == 0 or cut == len(data):
+            out.append(view[start:cut])
+            start = cut
+        prev = cut
+    if start < len(data):
+        out.append(view[start:])
+    return out
+
+
+class BackupStore:
+    """Snapshots of data files, deduplicated by chunk."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.snapshots_dir = self.root / 'snapshots'
+
+    # --- objects --------------------------------------------------------
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def _put(self, chunk) -> Tuple[str, bool]:
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(zlib.compress(chunk, COMPRESS_LEVEL))
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return digest, True
+
+    def _get(self, digest: str) -> bytes:
+        try:
+            return zlib.decompress(self._object_path(digest).read_bytes())
+        except (OSError, zlib.error) as exc:
+            raise BackupError(f'missing or damaged chunk {digest[:12]}: {exc}')
+
+    # --- snapshots ------------------------------------------------------
+    def snapshot(self, paths: Iterable[str], label: str = '') -> Optional[dict]:
+        """Store the current content of the existing paths as one snapshot. Returns its manifest."""
+        files = []
+        new_chunks = 0
+        new_bytes = 0
+        with instrument.span('backup.snapshot', cat='io') as sp:
+            for p in paths:
+                if not p or not os.path.isfile(p):
+                    continue
+                data = Path(p).read_bytes()
+                digests = []
+                for chunk in split_chunks(data):
+                    digest, added = self._put(chunk)
+                    digests.append(digest)
+                    if added:
+                        new_chunks += 1
+                        new_bytes += len(chunk)
+                files.append({
+                    'path': str(Path(p).resolve()),
+                    'size': len(data),
+                    'sha256': hashlib.sha256(data).hexdigest(),
+                    'chunks': digests,
+                })
+            sp.set(files=len(files), new_chunks=new_chunks, new_bytes=new_bytes)
+        if not files:
+            return None
+        now = datetime.now()
+        sid = now.strftime('%Y%m%d-%H%M%S-%f')
+        manifest = {
+            'id': sid,
+            'created': now.isoformat(timespec='seconds'),
+            'label': label,
+            'files': files,
+            'new_bytes': new_bytes,
+        }
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        gfio.write_bytes_atomic(str(self.snapshots_dir / f'{sid}.json'),
+                                json.dumps(manifest, indent=1).encode('utf-8'))
+        return manifest
+
+    def list(self) -> List[dict]:
+        """All snapshot manifests, oldest first."""
+        out = []
+        if not self.snapshots_dir.is_dir():
+            return out
+        for p in sorted(self.snapshots_dir.glob('*.json')):
+            try:
+                out.append(json.loads(p.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                pass
+        return out
+
+    def get(self, snapshot_id: str) -> dict:
+        """A manifest by id or unique id prefix ('latest' for the newest)."""
+        snaps = self.list()
+        if snapshot_id == 'latest' and snaps:
+            return snaps[-1]
+        hits = [s for s in snaps if s['id'].startswith(snapshot_id)]
+        if len(hits) != 1:
+            raise BackupError(f'{"no" if not hits else "ambiguous"} snapshot {snapshot_id!r}')
+        return hits[0]
+
+    def read_file(self, entry: dict) -> bytes:
+        data = b''.join(self._get(d) for d in entry['chunks'])
+        if hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise BackupError(f'checksum mismatch restoring {entry["path"]}')
+        return data
+
+    def restore(self, snapshot_id: str, dest_dir=None, only: Optional[str] = None) -> List[str]:
+        """Write the files of a snapshot back (atomically) to their paths, or into dest_dir.
+
+        only: restore just the file with this name. Returns the written paths.
+        """
+        manifest = self.get(snapshot_id)
+        written = []
+        for entry in manifest['files']:
+            name = Path(entry['path']).name
+            if only and name.lower() != only.lower():
+                continue
+            target = Path(dest_dir) / name if dest_dir else Path(entry['path'])
+            gfio.write_bytes_atomic(str(target), self.read_file(entry))
+            written.append(str(target))
+        if only and not written:
+            raise BackupError(f'{only!r} is not in snapshot {manifest["id"]}')
+        return written
+
+    def prune(self, keep: Optional[int] = None, older_than_days: Optional[float] = None) -> Dict[str, int]:
+        """Drop snapshots beyond the newest `keep` and/or older than N days, then unreferenced chunks."""
+        snaps = self.list()
+        drop = set()
+        if keep is not None:
+            drop.update(s['id'] for s in snaps[:max(0, len(snaps) - keep)])
+        if older_than_days is not None:
+            limit = datetime.now() - timedelta(days=older_than_days)
+            drop.update(s['id'] for s in snaps if datetime.fromisoformat(s['created']) < limit)
+        for sid in drop:
+            try:
+                (self.snapshots_dir / f'{sid}.json').unlink()
+            except OSError:
+                pass
+        removed, freed = self.gc()
+        return {'snapshots': len(drop), 'chunks': removed, 'bytes': freed}
+
+    def gc(self) -> Tuple[int, int]:
+        """Delete chunks no snapshot references. Returns (count, bytes on disk)."""
+        live = set()
+        for s in self.list():
+            for entry in s['files']:
+                live.update(entry['chunks'])
+        removed = freed = 0
+        if not self.objects.is_dir():
+            return 0, 0
+        for sub in self.objects.iterdir():
+            if not sub.is_dir():
+                continue
+            for obj in sub.iterdir():
+                if sub.name + obj.name not in live:
+                    try:
+                        freed += obj.stat().st_size
+                        obj.unlink()
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed, freed
+
+    def disk_usage(self) -> int:
+        total = 0
+        for base in (self.objects, self.snapshots_dir):
+            if base.is_dir():
+                for dirpath, _, names in os.walk(base):
+                    for n in names:
+                        try:
+                            total += os.path.getsize(os.path.join(dirpath, n))
+                        except OSError:
+                            pass
+        return total
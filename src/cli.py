@@ -1,17 +1,674 @@
 """CLI for src-based package."""
 from pathlib import Path
+import argparse
+import os
 import sys
+import time
+
 from . import gfio as _io
 from .modules.items import read_items, write_items_pair
 
 
+def _icon_cache_settings():
+    """(dir, max_mb) of the GUI's icon cache (QSettings icon_cache/dir, icon_cache/max_mb); None where unset."""
+    try:
+        from PySide6.QtCore import QSettings
+        settings = QSettings('GFEditor', 'GFEditor')
+        root = settings.value('icon_cache/dir', '') or None
+        max_mb = settings.value('icon_cache/max_mb', None)
+        return root, int(max_mb) if max_mb not in (None, '') else None
+    except Exception:
+        return None, None
+
+
+def icons_convert(argv):
+    """icons-convert: decode every icon under Assets/itemicon into the persistent thumbnail cache."""
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+    from .modules.items import icon_cache
+    from .modules.items.icon_index import IconIndex
+
+    ap = argparse.ArgumentParser(prog='gfeditor icons-convert',
+                                 description='Convert item icons (DDS) to cached PNG thumbnails.')
+    ap.add_argument('icon_dir', nargs='?', default='Assets/itemicon', help='icon directory (default: Assets/itemicon)')
+    ap.add_argument('--cache', default=None,
+                    help='cache directory (default: the GUI setting icon_cache/dir, else the per-user GFEditor icon cache)')
+    ap.add_argument('--max-mb', type=int, default=None,
+                    help='cache size cap in MB (default: the GUI setting icon_cache/max_mb, else 256)')
+    ap.add_argument('--workers', type=int, default=0, help='worker processes (default: CPU count)')
+    ap.add_argument('--force', action='store_true', help='convert again even if a thumbnail is up to date')
+    args = ap.parse_args(argv)
+
+    icon_dir = Path(args.icon_dir)
+    if not icon_dir.is_dir():
+        print('Icon directory not found:', icon_dir)
+        return 2
+    # same cache as the GUI unless told otherwise
+    root, max_mb = args.cache, args.max_mb
+    if root is None or max_mb is None:
+        gui_root, gui_max_mb = _icon_cache_settings()
+        root = root or gui_root
+        max_mb = max_mb or gui_max_mb or icon_cache.DEFAULT_MAX_BYTES // (1024 * 1024)
+    cache = icon_cache.IconCache(root, max_bytes=max_mb * 1024 * 1024)
+    files = IconIndex(icon_dir).files()
+    todo = [str(p) for p in files if args.force or not cache.contains(p)]
+    skipped = len(files) - len(todo)
+    print(f'{len(files)} icons in {icon_dir}, {skipped} up to date, {len(todo)} to convert -> {cache.root}')
+    if not todo:
+        return 0
+
+    workers = args.workers or os.cpu_count() or 1
+    failed = []
+    done = 0
+    step = max(1, len(todo) // 20)
+    t0 = time.perf_counter()
+    # chunked map keeps inter-process overhead low for tens of thousands of small icons
+    chunksize = max(1, min(64, len(todo) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(icon_cache.convert_icon, todo, repeat(str(cache.root)), repeat(cache.thumb_size),
+                           chunksize=chunksize)
+        for path, err in results:
+            done += 1
+            if err:
+                failed.append((path, err))
+            if done % step == 0 or done == len(todo):
+                rate = done / max(time.perf_counter() - t0, 1e-6)
+                print(f'  [{done}/{len(todo)}] {rate:.0f} icons/s, {len(failed)} failed', flush=True)
+
+    # size accounting/eviction happens once here instead of in every worker; the thumbnails of
+    # this directory are kept, or the next run would convert the evicted ones again
+    keep = {k for k in (cache.key_for(p) for p in files) if k}
+    cache.evict(cache.max_bytes, keep=keep)
+    used = cache.stats()['bytes']
+    if used > cache.max_bytes:
+        print(f'warning: the cache holds {used / 2 ** 20:.0f} MB, over its {max_mb} MB cap; raise --max-mb '
+              f'(GUI setting icon_cache/max_mb) or the GUI will evict thumbnails of {icon_dir}')
+    for path, err in failed[:20]:
+        print('  failed:', path, '-', err)
+    if len(failed) > 20:
+        print(f'  ... and {len(failed) - 20} more')
+    print(f'Converted {len(todo) - len(failed)} icons in {time.perf_counter() - t0:.1f}s')
+    return 1 if failed else 0
+
+
+def icons_atlas(argv):
+    """icons-atlas: pack every icon under Assets/itemicon into one memory-mapped atlas file."""
+    from concurrent.futures import ProcessPoolExecutor
+    from .modules.items import icon_atlas, icon_cache
+    from .modules.items.icon_index import IconIndex
+
+    ap = argparse.ArgumentParser(prog='gfeditor icons-atlas',
+                                 description='Pack item icons into a memory-mapped atlas for instant loading.')
+    ap.add_argument('icon_dir', nargs='?', default='Assets/itemicon', help='icon directory (default: Assets/itemicon)')
+    ap.add_argument('--cache', default=None,
+                    help='cache directory (default: the GUI setting icon_cache/dir, else the per-user GFEditor icon cache)')
+    ap.add_argument('--out', default=None, help='atlas file (default: inside the cache directory)')
+    ap.add_argument('--cell', type=int, default=icon_atlas.ATLAS_CELL,
+                    help=f'icons larger than CELL x CELL are scaled down (default: {icon_atlas.ATLAS_CELL})')
+    ap.add_argument('--workers', type=int, default=0, help='worker processes (default: CPU count)')
+    args = ap.parse_args(argv)
+
+    icon_dir = Path(args.icon_dir)
+    if not icon_dir.is_dir():
+        print('Icon directory not found:', icon_dir)
+        return 2
+    # the GUI opens the atlas inside its own cache directory (icon_cache/dir)
+    root = Path(args.cache or _icon_cache_settings()[0] or icon_cache.default_cache_dir())
+    out = Path(args.out) if args.out else icon_atlas.atlas_path_for(root, icon_dir)
+    files = IconIndex(icon_dir).files()
+    print(f'{len(files)} icons in {icon_dir} -> {out}')
+    if not files:
+        return 0
+
+    workers = args.workers or os.cpu_count() or 1
+    step = max(1, len(files) // 20)
+    t0 = time.perf_counter()
+
+    def progress(done, _path, _err):
+        if done % step == 0 or done == len(files):
+            rate = done / max(time.perf_counter() - t0, 1e-6)
+            print(f'  [{done}/{len(files)}] {rate:.0f} icons/s', flush=True)
+
+    chunksize = max(1, min(64, len(files) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        stats = icon_atlas.build_atlas(files, out, cell=args.cell, icon_dir=icon_dir, progress=progress,
+                                       mapper=lambda fn, *its: pool.map(fn, *its, chunksize=chunksize))
+    failed = stats['failed']
+    for path, err in failed[:20]:
+        print('  failed:', path, '-', err)
+    if len(failed) > 20:
+        print(f'  ... and {len(failed) - 20} more')
+    print(f"Packed {stats['icons']} icons into {stats['pages']} page(s), "
+          f"{stats['bytes'] / (1024 * 1024):.1f} MB in {time.perf_counter() - t0:.1f}s")
+    return 1 if failed else 0
+
+
+def _tsv_cell(v) -> str:
+    # one record per line: escape the separators (Tip fields contain newlines)
+    return str(v).replace('\\', '\\\\').replace('\t', '\\t').replace('\r', '\\r').replace('\n', '\\n')
+
+
+def _emit(out, fmt, header, rows):
+    """Stream rows (iterable of lists) to out as TSV (with a header line) or JSON lines."""
+    import json
+    try:
+        # console code pages (cp950/cp1252) cannot print every Big5 name
+        out.reconfigure(errors='replace')
+    except Exception:
+        pass
+    try:
+        if fmt == 'jsonl':
+            for r in rows:
+                out.write(json.dumps(dict(zip(header, r)), ensure_ascii=False) + '\n')
+        else:
+            out.write('\t'.join(header) + '\n')
+            for r in rows:
+                out.write('\t'.join(_tsv_cell(v) for v in r) + '\n')
+        out.flush()
+    except BrokenPipeError:
+        # output piped into `head` and closed early: stop quietly
+        try:
+            sys.stdout = open(os.devnull, 'w')
+        except OSError:
+            pass
+
+
+def _load_table_arg(args):
+    from .modules.items.table import load_table
+    p = Path(args.file)
+    if not p.exists():
+        print('File not found:', p, file=sys.stderr)
+        return None
+    t0 = time.perf_counter()
+    table = load_table(str(p), encoding=args.encoding)
+    if args.verbose:
+        print(f'# {len(table)} rows, {len(table.header)} columns in {time.perf_counter() - t0:.2f}s', file=sys.stderr)
+    return table
+
+
+def query(argv):
+    """query: print the rows of an item file matching a vectorized expression."""
+    import numpy as np
+    from .modules.items import query as item_query
+
+    ap = argparse.ArgumentParser(prog='gfeditor query',
+                                 description='Filter an item file with an expression, e.g. '
+                                             '"ItemType == 7 and (OpFlags & NoTrade)".')
+    ap.add_argument('file', help='pipe-delimited item file (C_Item, S_Item, ...)')
+    ap.add_argument('expr', nargs='?', default='True', help='filter expression (default: every row)')
+    ap.add_argument('-c', '--columns', default='Id,Name', help='output columns, comma separated, or "*" (default: Id,Name)')
+    ap.add_argument('-f', '--format', choices=('tsv', 'jsonl'), default='tsv', help='output format (default: tsv)')
+    ap.add_argument('-n', '--limit', type=int, default=0, help='stop after N rows')
+    ap.add_argument('--count', action='store_true', help='print only the number of matching rows')
+    ap.add_argument('--encoding', default='big5', help='file encoding (default: big5)')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    table = _load_table_arg(args)
+    if table is None:
+        return 2
+    columns = table.header if args.columns.strip() == '*' else [c.strip() for c in args.columns.split(',') if c.strip()]
+    try:
+        for c in columns:
+            table.index_of(c)
+        t0 = time.perf_counter()
+        idx = np.flatnonzero(item_query.evaluate(table, args.expr))
+    except (KeyError, item_query.QueryError) as exc:
+        print('Error:', exc.args[0] if exc.args else exc, file=sys.stderr)
+        return 2
+    if args.verbose:
+        print(f'# {len(idx)} matches in {(time.perf_counter() - t0) * 1000:.1f} ms', file=sys.stderr)
+    if args.count:
+        print(len(idx))
+        return 0
+    if args.limit:
+        idx = idx[:args.limit]
+
+    cols = [table.column(c) if args.format == 'jsonl' else None for c in columns]
+    pos = [table.index_of(c) for c in columns]
+
+    def rows():
+        for i in idx.tolist():
+            if args.format == 'jsonl':
+                # typed values (numbers stay numbers)
+                yield [col[i].item() if isinstance(col[i], np.generic) else col[i] for col in cols]
+            else:
+                r = table.rows[i]
+                yield [r[p] for p in pos]
+
+    _emit(sys.stdout, args.format, columns, rows())
+    return 0
+
+
+def stats(argv):
+    """stats: group-by counts and aggregates over an item file."""
+    import numpy as np
+    from .modules.items import query as item_query
+
+    ap = argparse.ArgumentParser(prog='gfeditor stats',
+                                 description='Aggregate an item file, e.g. --by ItemType,ItemQuality --agg SysPrice:mean.')
+    ap.add_argument('file', help='pipe-delimited item file (C_Item, S_Item, ...)')
+    ap.add_argument('--by', default='', help='group-by columns, comma separated')
+    ap.add_argument('--agg', default='count', help='aggregates COL:count|sum|mean|min|max, comma separated (default: count)')
+    ap.add_argument('--where', default=None, help='only rows matching this query expression')
+    ap.add_argument('--flags', action='store_true', help='per-flag item counts (OpFlags and OpFlagsPlus)')
+    ap.add_argument('--classes', action='store_true', help='per-class item counts (RestrictClass)')
+    ap.add_argument('-f', '--format', choices=('tsv', 'jsonl'), default='tsv', help='output format (default: tsv)')
+    ap.add_argument('--encoding', default='big5', help='file encoding (default: big5)')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    table = _load_table_arg(args)
+    if table is None:
+        return 2
+    t0 = time.perf_counter()
+    try:
+        mask = item_query.evaluate(table, args.where) if args.where else None
+        rows = table.rows if mask is None else [table.rows[i] for i in np.flatnonzero(mask).tolist()]
+        if args.flags:
+            from .modules.items.flag_index import ItemFlagIndex
+            counts = ItemFlagIndex(rows, table.header).counts()
+            _emit(sys.stdout, args.format, ['flag', 'count'], ([k, v] for k, v in counts.items()))
+        elif args.classes:
+            from .modules.items.class_index import ClassIndex
+            report = ClassIndex.from_rows(rows, table.header).report()
+            _emit(sys.stdout, args.format, ['class_id', 'class', 'restricted_to', 'usable'], (list(r) for r in report))
+        else:
+            by = [c.strip() for c in args.by.split(',') if c.strip()]
+            header, out = item_query.group_stats(table, by, item_query.parse_aggs(args.agg), mask)
+            _emit(sys.stdout, args.format, header, out)
+    except (KeyError, item_query.QueryError) as exc:
+        print('Error:', exc.args[0] if exc.args else exc, file=sys.stderr)
+        return 2
+    if args.verbose:
+        print(f'# computed in {(time.perf_counter() - t0) * 1000:.1f} ms', file=sys.stderr)
+    return 0
+
+
+def diff(argv):
+    """diff: records (and columns) that differ between two versions of a data file."""
+    from . import recdiff
+    from .modules.items.reader import DEFAULT_HEADER
+
+    ap = argparse.ArgumentParser(prog='gfeditor diff',
+                                 description='Record-level diff of two pipe-delimited files (matched by Id).')
+    ap.add_argument('left', help='old / reference file')
+    ap.add_argument('right', help='new file')
+    ap.add_argument('-f', '--format', choices=('tsv', 'jsonl'), default='tsv', help='output format (default: tsv)')
+    ap.add_argument('--values', action='store_true', help='one line per changed column with both values')
+    ap.add_argument('--count', action='store_true', help='print only the number of differing records')
+    ap.add_argument('--encoding', default='big5', help='file encoding (default: big5)')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    for p in (args.left, args.right):
+        if not Path(p).is_file():
+            print('File not found:', p, file=sys.stderr)
+            return 2
+    t0 = time.perf_counter()
+    left = _io.scan_records(Path(args.left).read_bytes())
+    right = _io.scan_records(Path(args.right).read_bytes())
+    changes = recdiff.compare_spans(left, right, args.encoding, len(DEFAULT_HEADER))
+    if args.verbose:
+        print(f'# {len(left)} vs {len(right)} records, {len(changes)} differ, '
+              f'{(time.perf_counter() - t0) * 1000:.0f} ms', file=sys.stderr)
+    if args.count:
+        print(len(changes))
+        return 1 if changes else 0
+
+    def name(c):
+        return DEFAULT_HEADER[c] if c < len(DEFAULT_HEADER) else f'col{c}'
+
+    if args.values:
+        def rows():
+            for ch in changes:
+                a = _io.decode_record(left, ch.left, args.encoding, len(DEFAULT_HEADER)) if ch.left is not None else []
+                b = _io.decode_record(right, ch.right, args.encoding, len(DEFAULT_HEADER)) if ch.right is not None else []
+                for c in (ch.columns if ch.kind == 'changed' else [0]):
+                    yield [ch.kind, ch.id, name(c), a[c] if c < len(a) else '', b[c] if c < len(b) else '']
+        _emit(sys.stdout, args.format, ['change', 'Id', 'column', 'left', 'right'], rows())
+    else:
+        _emit(sys.stdout, args.format, ['change', 'Id', 'columns'],
+              ([ch.kind, ch.id, ','.join(name(c) for c in ch.columns) if ch.kind == 'changed' else '']
+               for ch in changes))
+    # like diff(1): 1 when the files differ
+    return 1 if changes else 0
+
+
+def merge(argv):
+    """merge: three-way merge of an item table edited in parallel (writes the C_/S_ pair)."""
+    from .modules.items import merge as item_merge
+    from .modules.items.writer import write_encoded_pair
+
+    ap = argparse.ArgumentParser(prog='gfeditor merge',
+                                 description='Three-way merge by record (Id) and field: base is the common '
+                                             'ancestor of ours and theirs. Exit status 1 when there were conflicts.')
+    ap.add_argument('base', help='common ancestor')
+    ap.add_argument('ours', help='our version (its order and line endings are kept)')
+    ap.add_argument('theirs', help='their version')
+    ap.add_argument('-o', '--output', required=True, help='merged client file (C_...)')
+    ap.add_argument('--server', default=None,
+                    help='server file written with the same content (default: S_ counterpart of --output)')
+    ap.add_argument('--no-server', action='store_true', help='write only --output')
+    ap.add_argument('--prefer', choices=('ours', 'theirs'), default='ours', help='value kept on a conflict (default: ours)')
+    ap.add_argument('--report', default=None, help='write the conflicts as TSV to this file (default: stderr)')
+    ap.add_argument('--encoding', default='big5', help='file encoding (default: big5)')
+    ap.add_argument('--fsync', action='store_true', help='flush the output to disk before returning')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    for p in (args.base, args.ours, args.theirs):
+        if not Path(p).is_file():
+            print('File not found:', p, file=sys.stderr)
+            return 2
+    server = None if args.no_server else (args.server or _server_counterpart(args.output))
+    t0 = time.perf_counter()
+    result = item_merge.merge_files(args.base, args.ours, args.theirs, encoding=args.encoding,
+                                    prefer=args.prefer, output_paths=[args.output, server])
+    try:
+        write_encoded_pair(result.chunks, args.output, server, fsync=args.fsync)
+        size = result.size
+    finally:
+        result.close()
+    st = result.stats
+    print(f"Merged: {st['unchanged']} unchanged, {st['ours']} from ours, {st['theirs']} from theirs, "
+          f"{st['merged']} field-merged, {st['added']} added, {st['deleted']} deleted, "
+          f"{st['conflicts']} conflict(s)", file=sys.stderr)
+    print('Wrote client:', args.output, file=sys.stderr)
+    if server:
+        print('Wrote server:', server, file=sys.stderr)
+    if args.verbose:
+        print(f'# {size} bytes in {time.perf_counter() - t0:.2f}s', file=sys.stderr)
+    if result.conflicts:
+        rows = ([c.kind, c.id, c.column, c.base, c.ours, c.theirs] for c in result.conflicts)
+        header = ['conflict', 'Id', 'column', 'base', 'ours', 'theirs']
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8', newline='') as fh:
+                _emit(fh, 'tsv', header, rows)
+        else:
+            _emit(sys.stderr, 'tsv', header, rows)
+        return 1
+    return 0
+
+
+def bulk(argv):
+    """bulk: preview or apply `set COL = EXPR [where COND]` over an item file (and its S_ pair)."""
+    from . import backup
+    from .document import RowDocument
+    from .modules.items import bulk as item_bulk
+    from .modules.items.reader import DEFAULT_HEADER
+    from .modules.items.table import ItemTable
+
+    ap = argparse.ArgumentParser(prog='gfeditor bulk',
+                                 description='Mass field update, e.g. "set SysPrice = SysPrice * 1.15 where '
+                                             'ItemType in (7, 8) and ItemQuality >= 5". Prints the changed cells; '
+                                             'writes only with --apply.')
+    ap.add_argument('file', help='pipe-delimited item file (C_Item, C_ItemMall, ...)')
+    ap.add_argument('statement', help='set <column> = <expr> [, <column> op= <expr> ...] [where <condition>]')
+    ap.add_argument('--apply', action='store_true', help='write the changes (default: preview only)')
+    ap.add_argument('--server', default=None, help='server file written with the same content (default: the existing S_ counterpart)')
+    ap.add_argument('--no-server', action='store_true', help='write only the given file')
+    ap.add_argument('--no-backup', action='store_true', help='do not snapshot the files before writing')
+    ap.add_argument('-n', '--limit', type=int, default=50, help='changed cells to print, 0 for all (default: 50)')
+    ap.add_argument('-f', '--format', choices=('tsv', 'jsonl'), default='tsv', help='output format (default: tsv)')
+    ap.add_argument('--encoding', default='big5', help='file encoding (default: big5)')
+    ap.add_argument('--fsync', action='store_true', help='flush the output to disk before returning')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    p = Path(args.file)
+    if not p.is_file():
+        print('File not found:', p, file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    rows, spans = _io.read_pipe_records(str(p), encoding=args.encoding, expected_fields=len(DEFAULT_HEADER))
+    table = ItemTable(DEFAULT_HEADER, rows, str(p))
+    t1 = time.perf_counter()
+    try:
+        plan = item_bulk.plan(table, args.statement)
+    except (KeyError, item_bulk.QueryError) as exc:
+        print('Error:', exc.args[0] if exc.args else exc, file=sys.stderr)
+        return 2
+    if args.verbose:
+        print(f'# {len(rows)} rows read in {t1 - t0:.2f}s, planned in {(time.perf_counter() - t1) * 1000:.1f} ms',
+              file=sys.stderr)
+    changed_rows = plan.rows()
+    print(f'{plan.matched} row(s) match, {plan.cells} cell(s) change in {len(changed_rows)} row(s)', file=sys.stderr)
+    _emit(sys.stdout, args.format, ['row', 'Id', 'column', 'old', 'new'],
+          ([r, rows[r][0], col, old, new] for r, col, old, new in plan.preview(args.limit)))
+    if not args.apply or not plan.cells:
+        return 0
+
+    doc = RowDocument(rows, encoding=args.encoding, source=spans)
+    item_bulk.apply(plan, rows, doc)
+    server = None if args.no_server else (args.server or _server_counterpart(str(p)))
+    # the pair is kept identical: the S_ counterpart is rewritten only when it exists (or was named)
+    if server and not args.server and not Path(server).is_file():
+        server = None
+    paths = [str(p)] + ([server] if server else [])
+    if not args.no_backup:
+        store = backup.BackupStore(backup.default_store_for(str(p)))
+        snap = store.snapshot(paths, label='bulk')
+        if snap:
+            print('Backup:', snap['id'], file=sys.stderr)
+    t2 = time.perf_counter()
+    doc.save(paths, fsync=args.fsync)
+    for path in paths:
+        print('Wrote:', path, file=sys.stderr)
+    if args.verbose:
+        print(f'# written in {time.perf_counter() - t2:.2f}s', file=sys.stderr)
+    return 0
+
+
+def export_sqlite(argv):
+    """export-sqlite: C_Item, C_ItemMall and T_ files into one SQLite database for ad-hoc SQL."""
+    from . import sqlite_io
+
+    ap = argparse.ArgumentParser(prog='gfeditor export-sqlite',
+                                 description='One table per file (typed columns, indexes on Id, ItemType, ItemQuality, '
+                                             'IconFilename). Edits made in SQL go back with import-sqlite.')
+    ap.add_argument('db', help='SQLite database to write (replaced)')
+    ap.add_argument('files', nargs='*', help='data files (default: C_Item, C_ItemMall and T_* under --assets)')
+    ap.add_argument('--assets', default=None, help='Assets folder to take the files from (default: ./Assets)')
+    ap.add_argument('--encoding', default='big5', help='encoding of the C_ files (default: big5)')
+    ap.add_argument('--translate-encoding', default=None,
+                    help='encoding of the T_ files (default: as the Translate tab: mbcs on Windows, else utf-8)')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    files = args.files or sqlite_io.find_data_files(args.assets or Path.cwd() / 'Assets')
+    if not files:
+        print('No data files found (pass them or use --assets)', file=sys.stderr)
+        return 2
+    for f in files:
+        if not Path(f).is_file():
+            print('File not found:', f, file=sys.stderr)
+            return 2
+    t0 = time.perf_counter()
+    try:
+        srcs = sqlite_io.export_files(args.db, files, encoding=args.encoding, translate_encoding=args.translate_encoding)
+    except (sqlite_io.SqliteIOError, LookupError) as exc:
+        print('Error:', exc, file=sys.stderr)
+        return 2
+    for src in srcs:
+        print(f'{src.table}\t{src.records} rows\t{src.path}')
+    if args.verbose:
+        print(f'# {args.db}: {os.path.getsize(args.db)} bytes in {time.perf_counter() - t0:.2f}s', file=sys.stderr)
+    return 0
+
+
+def import_sqlite(argv):
+    """import-sqlite: write the edits made in an export-sqlite database back to the data files."""
+    from . import backup, sqlite_io
+
+    ap = argparse.ArgumentParser(prog='gfeditor import-sqlite',
+                                 description='Only edited records are re-encoded; rows inserted in SQL are appended '
+                                             'and deleted ones removed. C_ files also rewrite their existing S_ pair.')
+    ap.add_argument('db', help='database written by export-sqlite')
+    ap.add_argument('--only', default=None, help='tables to import, comma separated (default: all)')
+    ap.add_argument('--dry-run', action='store_true', help='report the changes without writing')
+    ap.add_argument('--force', action='store_true', help='import even if a file changed on disk since the export')
+    ap.add_argument('--full', action='store_true', help='compare every row (ignore the change log)')
+    ap.add_argument('--no-server', action='store_true', help='do not rewrite the S_ counterparts')
+    ap.add_argument('--no-backup', action='store_true', help='do not snapshot the files before writing')
+    ap.add_argument('--fsync', action='store_true', help='flush the files to disk before returning')
+    ap.add_argument('-v', '--verbose', action='store_true', help='print timings to stderr')
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    tables = [t.strip() for t in args.only.split(',') if t.strip()] if args.only else None
+    try:
+        results = sqlite_io.import_files(args.db, tables, force=args.force, full_scan=args.full)
+    except (sqlite_io.SqliteIOError, LookupError) as exc:
+        print('Error:', exc, file=sys.stderr)
+        return 2
+    targets = []
+    for res in results:
+        st = res.stats
+        print(f"{res.source.table}\t{st['updated']} updated, {st['added']} added, {st['deleted']} deleted"
+              + ('  (full compare)' if res.full_scan else ''))
+        if not res.changed:
+            continue
+        paths = [res.path]
+        server = None if args.no_server or res.source.kind != 'items' else _server_counterpart(res.path)
+        if server and Path(server).is_file():
+            paths.append(server)
+        targets.append((res, paths))
+    if args.dry_run or not targets:
+        return 0
+
+    if not args.no_backup:
+        store = backup.BackupStore(backup.default_store_for(targets[0][1][0]))
+        snap = store.snapshot([p for _, paths in targets for p in paths], label='import-sqlite')
+        if snap:
+            print('Backup:', snap['id'], file=sys.stderr)
+    for res, paths in targets:
+        _io.write_targets(paths, res.chunks, fsync=args.fsync)
+        for path in paths:
+            print('Wrote:', path, file=sys.stderr)
+    sqlite_io.mark_imported(args.db, [res for res, _ in targets])
+    if args.verbose:
+        print(f'# imported in {time.perf_counter() - t0:.2f}s', file=sys.stderr)
+    return 0
+
+
+def _server_counterpart(client_path: str):
+    """Assets/Client/C_X -> Assets/Server/S_X (same folder if not in Assets/Client); None if not a C_ file."""
+    p = Path(client_path)
+    if not p.name.upper().startswith('C_'):
+        return None
+    name = 'S_' + p.name[2:]
+    if p.parent.name.lower() == 'client':
+        return str(p.parent.parent / 'Server' / name)
+    return str(p.with_name(name))
+
+
+def _backup_store(args):
+    from . import backup
+    if args.store:
+        return backup.BackupStore(args.store)
+    if args.data_file:
+        return backup.BackupStore(backup.default_store_for(args.data_file))
+    # workspace root: cwd or the first parent holding an Assets folder
+    cwd = Path.cwd().resolve()
+    for d in [cwd] + list(cwd.parents):
+        if d.name == 'Assets':
+            return backup.BackupStore(d.parent / backup.STORE_DIRNAME)
+        if (d / 'Assets').is_dir():
+            return backup.BackupStore(d / backup.STORE_DIRNAME)
+    return backup.BackupStore(cwd / backup.STORE_DIRNAME)
+
+
+def backups(argv):
+    """backups: list, inspect, restore and prune the snapshots taken on save."""
+    from . import backup
+
+    ap = argparse.ArgumentParser(prog='gfeditor backups',
+                                 description='Snapshots of the data files kept by every save (see backup.py).')
+    ap.add_argument('--store', default=None, help='backup store directory (default: <workspace>/.gfeditor/backups)')
+    ap.add_argument('--for', dest='data_file', default=None, help='use the store of this data file')
+    sub = ap.add_subparsers(dest='action', required=True)
+    sub.add_parser('list', help='list snapshots, oldest first')
+    p_show = sub.add_parser('show', help='files of one snapshot')
+    p_show.add_argument('id', help='snapshot id, unique prefix or "latest"')
+    p_restore = sub.add_parser('restore', help='write the files of a snapshot back')
+    p_restore.add_argument('id', help='snapshot id, unique prefix or "latest"')
+    p_restore.add_argument('--to', default=None, help='restore into this directory instead of the original paths')
+    p_restore.add_argument('--only', default=None, help='restore just this file name (e.g. C_Item.ini)')
+    p_prune = sub.add_parser('prune', help='drop old snapshots and unreferenced chunks')
+    p_prune.add_argument('--keep', type=int, default=None, help='keep the newest N snapshots')
+    p_prune.add_argument('--older-than', type=float, default=None, metavar='DAYS', help='drop snapshots older than DAYS')
+    args = ap.parse_args(argv)
+
+    store = _backup_store(args)
+    try:
+        if args.action == 'list':
+            snaps = store.list()
+            for s in snaps:
+                size = sum(f['size'] for f in s['files'])
+                names = ', '.join(Path(f['path']).name for f in s['files'])
+                print(f"{s['id']}\t{s['created']}\t{s.get('label', '')}\t{size}\t+{s.get('new_bytes', 0)}\t{names}")
+            print(f'# {len(snaps)} snapshots, {store.disk_usage()} bytes on disk in {store.root}', file=sys.stderr)
+        elif args.action == 'show':
+            s = store.get(args.id)
+            print(f"{s['id']}  {s['created']}  {s.get('label', '')}")
+            for f in s['files']:
+                print(f"  {f['path']}\t{f['size']}\t{f['sha256'][:16]}\t{len(f['chunks'])} chunks")
+        elif args.action == 'restore':
+            if args.to:
+                Path(args.to).mkdir(parents=True, exist_ok=True)
+            for path in store.restore(args.id, dest_dir=args.to, only=args.only):
+                print('Restored:', path)
+        elif args.action == 'prune':
+            if args.keep is None and args.older_than is None:
+                print('Error: prune needs --keep and/or --older-than', file=sys.stderr)
+                return 2
+            res = store.prune(keep=args.keep, older_than_days=args.older_than)
+            print(f"Removed {res['snapshots']} snapshots, {res['chunks']} chunks ({res['bytes']} bytes)")
+    except backup.BackupError as exc:
+        print('Error:', exc, file=sys.stderr)
+        return 2
+    return 0
+
+
 def main(argv=None):
     argv = argv or sys.argv[1:]
     if not argv:
         print('Usage: gfeditor <path_to_file> [encoding]')
         print('       gfeditor import-items <src_path> [client_dest] [server_dest]')
+        print('       gfeditor icons-convert [icon_dir] [--cache DIR] [--max-mb N] [--workers N] [--force]')
+        print('       gfeditor icons-atlas [icon_dir] [--cache DIR] [--out FILE] [--cell PX] [--workers N]')
+        print('       gfeditor query <file> "<expr>" [--columns A,B] [--format tsv|jsonl] [--limit N] [--count]')
+        print('       gfeditor stats <file> [--by A,B] [--agg COL:mean,...] [--where EXPR] [--flags] [--classes]')
+        print('       gfeditor diff <left> <right> [--values] [--count] [--format tsv|jsonl]')
+        print('       gfeditor merge <base> <ours> <theirs> -o <C_out> [--server S_out] [--prefer ours|theirs] [--report FILE]')
+        print('       gfeditor bulk <file> "set COL = EXPR [where COND]" [--apply] [--server S_out] [--limit N]')
+        print('       gfeditor export-sqlite <db> [files...] [--assets DIR]')
+        print('       gfeditor import-sqlite <db> [--only TABLES] [--dry-run] [--force] [--full]')
+        print('       gfeditor backups [--store DIR] list|show ID|restore ID [--to DIR]|prune [--keep N] [--older-than DAYS]')
         return 1
 
+    if argv[0] == 'icons-convert':
+        return icons_convert(argv[1:])
+    if argv[0] == 'icons-atlas':
+        return icons_atlas(argv[1:])
+    if argv[0] == 'query':
+        return query(argv[1:])
+    if argv[0] == 'stats':
+        return stats(argv[1:])
+    if argv[0] == 'diff':
+        return diff(argv[1:])
+    if argv[0] == 'merge':
+        return merge(argv[1:])
+    if argv[0] == 'bulk':
+        return bulk(argv[1:])
+    if argv[0] == 'export-sqlite':
+        return export_sqlite(argv[1:])
+    if argv[0] == 'import-sqlite':
+        return import_sqlite(argv[1:])
+    if argv[0] == 'backups':
+        return backups(argv[1:])
+
     if argv[0] == 'import-items':
         # import-items <src_path> [client_dest] [server_dest]
         if len(argv) < 2:
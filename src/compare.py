@@ -0,0 +1,313 @@
+"""Compare dialog: record/column diff of the loaded table against another version.
+
+The other side can be the server mirror (S_), a backup snapshot (backup.py)
+or any file. Both sides are compared as bytes (recdiff.compare_spans): the
+loaded rows are serialized through their RowDocument (only edited rows are
+encoded), records are hashed, and only the differing ones are decoded and
+compared column by column - a 500k-row file takes a couple of seconds, in a
+worker thread. The result list is a model-backed view, so it stays fast with
+hundreds of thousands of changes.
+"""
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt, QThread, Signal
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import (
+    QCheckBox, QComboBox, QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QListView,
+    QMessageBox, QPushButton, QSplitter, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+
+import backup
+import gfio
+import instrument
+import recdiff
+from document import RowDocument
+
+KIND_MARK = {'changed': '~', 'added': '+', 'removed': '-'}
+KIND_COLOR = {'changed': QColor(176, 112, 0), 'added': QColor(0, 128, 0), 'removed': QColor(192, 0, 0)}
+CHANGED_BG = QColor(255, 236, 179)
+
+
+class CompareWorker(QThread):
+    """Serialize the loaded side, read the other side and diff them.
+
+    Emits result({'left': RecordSpans, 'right': RecordSpans, 'changes': [RecordChange], 'seconds'}).
+    """
+    result = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, job, load_right: Callable[[], bytes], encoding: str = 'big5', expected: int = 93):
+        super().__init__()
+        self.job = job
+        self.load_right = load_right
+        self.encoding = encoding
+        self.expected = expected
+
+    def run(self):
+        try:
+            import time
+            t0 = time.perf_counter()
+            with instrument.span('CompareWorker.run', cat='diff'):
+                left = gfio.scan_records(b''.join(self.job.encode()))
+                right = gfio.scan_records(self.load_right())
+                changes = recdiff.compare_spans(left, right, self.encoding, self.expected)
+            self.result.emit({'left': left, 'right': right, 'changes': changes,
+                              'seconds': time.perf_counter() - t0})
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ChangesModel(QAbstractListModel):
+    """List of RecordChange: '~ 1005  (3)' / '+ 9' / '- 2'."""
+
+    def __init__(self, changes: Optional[List] = None, parent=None):
+        super().__init__(parent)
+        self.changes = changes or []
+
+    def set_changes(self, changes) -> None:
+        self.beginResetModel()
+        self.changes = changes
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.changes)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ch = self.changes[index.row()]
+        if role == Qt.DisplayRole:
+            extra = f'  ({len(ch.columns)})' if ch.kind == 'changed' else ''
+            return f'{KIND_MARK[ch.kind]} {ch.id}{extra}'
+        if role == Qt.ForegroundRole:
+            return KIND_COLOR[ch.kind]
+        if role == Qt.UserRole:
+            return ch
+        return None
+
+
+class CompareDialog(QDialog):
+    """Non-modal compare view; on_select(row index) jumps the editor to a changed record."""
+
+    def __init__(self, parent, rows, header, document=None, current_path: Optional[str] = None,
+                 server_path: Optional[str] = None, on_select: Optional[Callable[[int], None]] = None):
+        super().__init__(parent)
+        self.setWindowTitle('Comparar')
+        self.setMinimumSize(1000, 650)
+        self.rows = rows
+        self.header = list(header or [])
+        self.document = document if document is not None and document.rows is rows else RowDocument(rows)
+        self.current_path = current_path
+        self.server_path = server_path
+        self.on_select = on_select
+        self.worker = None
+        self.result = None
+        self._snapshots = []
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.source = QComboBox()
+        self.source.addItem('Servidor (S_)', 'server')
+        self.source.addItem('Backup', 'backup')
+        self.source.addItem('Outro arquivo...', 'file')
+        self.snapshot = QComboBox()
+        self.snapshot.setMinimumWidth(260)
+        self.btn_run = QPushButton('Comparar')
+        top.addWidget(QLabel('Carregado vs'))
+        top.addWidget(self.source)
+        top.addWidget(self.snapshot)
+        top.addWidget(self.btn_run)
+        top.addStretch()
+        layout.addLayout(top)
+
+        self.summary = QLabel('')
+        layout.addWidget(self.summary)
+
+        split = QSplitter()
+        left = QWidget()
+        lv = QVBoxLayout(left)
+        lv.setContentsMargins(0, 0, 0, 0)
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText('Filtrar Id...')
+        self.model = ChangesModel(parent=self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.list = QListView()
+        self.list.setModel(self.proxy)
+        self.list.setUniformItemSizes(True)
+        lv.addWidget(self.filter)
+        lv.addWidget(self.list)
+        split.addWidget(left)
+
+        right = QWidget()
+        rv = QVBoxLayout(right)
+        rv.setContentsMargins(0, 0, 0, 0)
+        self.only_changed = QCheckBox('Somente colunas alteradas')
+        self.only_changed.setChecked(True)
+        self.detail = QTableWidget(0, 3)
+        self.detail.setHorizontalHeaderLabels(['Coluna', 'Carregado', 'Outro'])
+        self.detail.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.detail.verticalHeader().setVisible(False)
+        self.detail.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.detail.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        rv.addWidget(self.only_changed)
+        rv.addWidget(self.detail)
+        split.addWidget(right)
+        split.setSizes([250, 750])
+        layout.addWidget(split, 1)
+
+        self.source.currentIndexChanged.connect(self._on_source_changed)
+        self.btn_run.clicked.connect(self.run)
+        self.filter.textChanged.connect(self.proxy.setFilterFixedString)
+        self.list.selectionModel().currentChanged.connect(lambda cur, _prev: self._show_detail(cur))
+        self.list.doubleClicked.connect(self._on_double_click)
+        self.only_changed.toggled.connect(lambda _on: self._show_detail(self.list.currentIndex()))
+        self._on_source_changed()
+
+    # --- sources ----------------------------------------------------------
+    def _on_source_changed(self, *_):
+        kind = self.source.currentData()
+        self.snapshot.setVisible(kind == 'backup')
+        if kind == 'backup' and not self._snapshots:
+            self._load_snapshots()
+
+    def _load_snapshots(self):
+        self.snapshot.clear()
+        self._snapshots = []
+        if not self.current_path:
+            return
+        name = Path(self.current_path).name.lower()
+        try:
+            store = backup.BackupStore(backup.default_store_for(self.current_path))
+            for snap in reversed(store.list()):
+                for entry in snap['files']:
+                    if Path(entry['path']).name.lower() == name:
+                        self._snapshots.append((store, entry))
+                        self.snapshot.addItem(f"{snap['id']}  {snap.get('label', '')}")
+                        break
+        except Exception:
+            pass
+        if not self._snapshots:
+            self.snapshot.addItem('(nenhum backup)')
+
+    def _right_loader(self):
+        """(label, callable returning the other side's bytes), or None if nothing to compare."""
+        kind = self.source.currentData()
+        if kind == 'server':
+            if not self.server_path or not Path(self.server_path).is_file():
+                QMessageBox.information(self, 'Comparar', 'Arquivo do servidor nao encontrado')
+                return None
+            path = self.server_path
+            return Path(path).name, lambda: Path(path).read_bytes()
+        if kind == 'backup':
+            i = self.snapshot.currentIndex()
+            if not (0 <= i < len(self._snapshots)):
+                QMessageBox.information(self, 'Comparar', 'Nenhum backup deste arquivo')
+                return None
+            store, entry = self._snapshots[i]
+            return f'backup {self.snapshot.currentText().split()[0]}', lambda: store.read_file(entry)
+        start = str(Path(self.current_path).parent) if self.current_path else ''
+        path, _ = QFileDialog.getOpenFileName(self, 'Comparar com', start)
+        if not path:
+            return None
+        return Path(path).name, lambda: Path(path).read_bytes()
+
+    # --- run --------------------------------------------------------------
+    def run(self):
+        if self.worker is not None:
+            return
+        source = self._right_loader()
+        if source is None:
+            return
+        label, load = source
+        self.detail.setHorizontalHeaderLabels(['Coluna', 'Carregado', label])
+        self.summary.setText(f'Comparando com {label}...')
+        self.btn_run.setEnabled(False)
+        # snapshot no GUI thread (copia so as linhas editadas); serializacao + diff no worker
+        worker = CompareWorker(self.document.snapshot(), load, encoding=self.document.encoding,
+                               expected=max(len(self.header), 1))
+        worker.result.connect(lambda res, label=label: self._on_result(label, res))
+        worker.error.connect(self._on_error)
+        self.worker = worker
+        worker.start()
+
+    def _on_result(self, label: str, res: dict):
+        self.worker = None
+        self.btn_run.setEnabled(True)
+        self.result = res
+        changes = res['changes']
+        self.model.set_changes(changes)
+        counts = {k: 0 for k in KIND_MARK}
+        for ch in changes:
+            counts[ch.kind] += 1
+        self.summary.setText(
+            f"{len(res['left'])} vs {len(res['right'])} registros ({label}): {counts['changed']} alterado(s), "
+            f"{counts['added']} so no outro, {counts['removed']} so no carregado  -  {res['seconds']:.2f}s")
+        self.detail.setRowCount(0)
+        if changes:
+            self.list.setCurrentIndex(self.proxy.index(0, 0))
+
+    def _on_error(self, msg: str):
+        self.worker = None
+        self.btn_run.setEnabled(True)
+        self.summary.setText('')
+        QMessageBox.warning(self, 'Comparar', f'Falha ao comparar: {msg}')
+
+    # --- detail -----------------------------------------------------------
+    def _fields(self, spans, i):
+        if spans is None or i is None:
+            return []
+        return gfio.decode_record(spans, i, self.document.encoding, max(len(self.header), 1))
+
+    def _show_detail(self, proxy_index):
+        self.detail.setRowCount(0)
+        if self.result is None or not proxy_index.isValid():
+            return
+        ch = self.model.data(self.proxy.mapToSource(proxy_index), Qt.UserRole)
+        a = self._fields(self.result['left'], ch.left)
+        b = self._fields(self.result['right'], ch.right)
+        changed = set(ch.columns) if ch.kind == 'changed' else set(range(max(len(a), len(b))))
+        cols = sorted(changed) if self.only_changed.isChecked() else list(range(max(len(a), len(b))))
+        self.detail.setRowCount(len(cols))
+        bold = QFont()
+        bold.setBold(True)
+        for r, c in enumerate(cols):
+            name = self.header[c] if c < len(self.header) else f'col{c}'
+            cells = (name, a[c] if c < len(a) else '', b[c] if c < len(b) else '')
+            for k, val in enumerate(cells):
+                item = QTableWidgetItem(val)
+                if c in changed:
+                    item.setBackground(CHANGED_BG)
+                    if k == 0:
+                        item.setFont(bold)
+                self.detail.setItem(r, k, item)
+
+    def _on_double_click(self, proxy_index):
+        ch = self.model.data(self.proxy.mapToSource(proxy_index), Qt.UserRole)
+        if ch is not None and ch.left is not None and self.on_select is not None:
+            try:
+                self.on_select(ch.left)
+            except Exception:
+                pass
+
+
+def show_compare_dialog(parent, rows, header, on_select=None, current_path: Optional[str] = None,
+                        server_path: Optional[str] = None) -> CompareDialog:
+    """Open the compare view for rows loaded in the MainWindow `parent` (non-modal).
+
+    current_path / server_path: the C_ file the rows came from and its S_
+    counterpart; default to the parent's open pair when the rows are its document's.
+    """
+    document = getattr(parent, 'document', None)
+    if current_path is None and document is not None and document.rows is rows:
+        current_path = getattr(parent, 'current_path', None)
+        pair = getattr(parent, 'pair_paths', None) or ()
+        server_path = server_path or (pair[1] if len(pair) > 1 else None)
+    dlg = CompareDialog(parent, rows, header,
+                        document=document,
+                        current_path=current_path,
+                        server_path=server_path,
+                        on_select=on_select)
+    dlg.show()
+    return dlg
@@ -0,0 +1,240 @@
+"""Diagnostics dock for the main window: recent stage timings, RSS and memory estimates.
+
+The dock reads the shared span buffer of instrument.py (opening it turns
+recording on), so a screenshot of it shows where time went on the user's own
+dataset: file read, decode, table fill, item navigation, icon decode and
+translation lookups. "Copy report" puts the same numbers on the clipboard and
+"Dump trace" writes the Chrome trace JSON.
+"""
+import os
+import sys
+from typing import Optional
+
+from PySide6.QtCore import Qt, QObject, QSettings, QTimer
+from PySide6.QtWidgets import (
+    QApplication, QCheckBox, QDockWidget, QFileDialog, QHBoxLayout, QHeaderView, QLabel,
+    QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+
+import instrument
+
+RECENT_SPANS = 50
+REFRESH_MS = 1000
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None if unknown)."""
+    try:
+        import psutil
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        pass
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/statm') as fh:
+                return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except Exception:
+            return None
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+        except Exception:
+            return None
+    try:
+        import resource
+        # peak, not current; ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak if sys.platform == 'darwin' else peak * 1024)
+    except Exception:
+        return None
+
+
+def estimate_rows_bytes(rows, sample: int = 200) -> int:
+    """Approximate memory held by a list of row lists (outer list + rows + cell strings).
+
+    Measures up to `sample` evenly spaced rows and scales; strings shared
+    between cells (interned '0', '') are counted once per cell, so this errs high.
+    """
+    n = len(rows) if rows else 0
+    if not n:
+        return 0
+    step = max(1, n // max(1, sample))
+    measured = 0
+    count = 0
+    for i in range(0, n, step):
+        row = rows[i]
+        measured += sys.getsizeof(row) + sum(sys.getsizeof(c) for c in row)
+        count += 1
+    return sys.getsizeof(rows) + int(measured / count * n)
+
+
+def format_bytes(n: Optional[int]) -> str:
+    if n is None:
+        return '?'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024.0
+    return str(n)
+
+
+class DiagnosticsDock(QDockWidget):
+    """Dockable HUD: last spans, per-stage summary and memory figures for `window`."""
+
+    def __init__(self, window, parent=None):
+        super().__init__('Diagnostico', parent or window)
+        self.setObjectName('diagnostics_dock')
+        self.window_ref = window
+
+        body = QWidget()
+        layout = QVBoxLayout(body)
+        self.lbl_memory = QLabel()
+        self.lbl_memory.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.lbl_memory)
+
+        self.summary_table = QTableWidget(0, 4)
+        self.summary_table.setHorizontalHeaderLabels(['Etapa', 'N', 'Ultimo (ms)', 'Max (ms)'])
+        self.recent_table = QTableWidget(0, 3)
+        self.recent_table.setHorizontalHeaderLabels(['Span', 'ms', 'Detalhes'])
+        for t in (self.summary_table, self.recent_table):
+            t.setEditTriggers(QTableWidget.NoEditTriggers)
+            t.verticalHeader().setVisible(False)
+            t.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(QLabel('Por etapa'))
+        layout.addWidget(self.summary_table, 1)
+        layout.addWidget(QLabel(f'Ultimos {RECENT_SPANS} spans'))
+        layout.addWidget(self.recent_table, 1)
+
+        buttons = QHBoxLayout()
+        self.chk_record = QCheckBox('Gravar')
+        self.chk_record.setToolTip('Record stage timings (also saved as setting diagnostics/trace)')
+        self.chk_record.toggled.connect(self._on_record_toggled)
+        btn_clear = QPushButton('Limpar')
+        btn_clear.clicked.connect(self._on_clear)
+        btn_copy = QPushButton('Copiar relatorio')
+        btn_copy.clicked.connect(self._on_copy)
+        btn_dump = QPushButton('Dump trace')
+        btn_dump.clicked.connect(self._on_dump)
+        buttons.addWidget(self.chk_record)
+        buttons.addStretch()
+        for b in (btn_clear, btn_copy, btn_dump):
+            buttons.addWidget(b)
+        layout.addLayout(buttons)
+        self.setWidget(body)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility)
+
+    # --- data -----------------------------------------------------------
+    def memory_info(self) -> dict:
+        w = self.window_ref
+        rows = getattr(w, 'rows', None) or []
+        table = getattr(w, 'table', None)
+        cells = 0
+        try:
+            if table is not None:
+                cells = table.rowCount() * table.columnCount()
+        except Exception:
+            pass
+        try:
+            qobjects = len(w.findChildren(QObject))
+        except Exception:
+            qobjects = 0
+        return {
+            'rss': process_rss(),
+            'rows': len(rows),
+            'rows_bytes': estimate_rows_bytes(rows),
+            'table_cells': cells,
+            'qobjects': qobjects,
+            'spans': len(instrument.spans()),
+        }
+
+    def report_text(self) -> str:
+        """Plain-text report (what "Copy report" puts on the clipboard)."""
+        m = self.memory_info()
+        lines = [
+            f"RSS: {format_bytes(m['rss'])}",
+            f"Rows: {m['rows']} (~{format_bytes(m['rows_bytes'])})",
+            f"Qt: {m['table_cells']} table cells, {m['qobjects']} QObjects",
+            '',
+            'stage\tcount\tlast_ms\tmax_ms\ttotal_ms',
+        ]
+        for name, s in sorted(instrument.summary().items(), key=lambda kv: -kv[1]['total_ms']):
+            lines.append(f"{name}\t{s['count']}\t{s['last_ms']:.1f}\t{s['max_ms']:.1f}\t{s['total_ms']:.1f}")
+        return '\n'.join(lines)
+
+    # --- UI -------------------------------------------------------------
+    def refresh(self) -> None:
+        m = self.memory_info()
+        self.lbl_memory.setText(
+            f"RSS {format_bytes(m['rss'])}  |  rows {m['rows']} (~{format_bytes(m['rows_bytes'])})  |  "
+            f"{m['table_cells']} celulas, {m['qobjects']} QObjects  |  {m['spans']} spans")
+
+        summary = sorted(instrument.summary().items(), key=lambda kv: -kv[1]['total_ms'])
+        self.summary_table.setRowCount(len(summary))
+        for i, (name, s) in enumerate(summary):
+            for j, val in enumerate((name, str(s['count']), f"{s['last_ms']:.1f}", f"{s['max_ms']:.1f}")):
+                self.summary_table.setItem(i, j, QTableWidgetItem(val))
+
+        recent = instrument.spans()[-RECENT_SPANS:][::-1]
+        self.recent_table.setRowCount(len(recent))
+        for i, ev in enumerate(recent):
+            args = ev.get('args') or {}
+            detail = ', '.join(f'{k}={v}' for k, v in args.items())
+            for j, val in enumerate((ev['name'], f"{ev['dur'] / 1000.0:.1f}", detail)):
+                self.recent_table.setItem(i, j, QTableWidgetItem(val))
+
+    def _on_visibility(self, visible: bool) -> None:
+        if visible:
+            # opening the HUD starts recording so there is something to show
+            if not instrument.is_enabled():
+                instrument.enable(True)
+            self.chk_record.blockSignals(True)
+            self.chk_record.setChecked(instrument.is_enabled())
+            self.chk_record.blockSignals(False)
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def _on_record_toggled(self, on: bool) -> None:
+        instrument.enable(on)
+        try:
+            QSettings('GFEditor', 'GFEditor').setValue('diagnostics/trace', 'true' if on else 'false')
+        except Exception:
+            pass
+
+    def _on_clear(self) -> None:
+        instrument.clear()
+        self.refresh()
+
+    def _on_copy(self) -> None:
+        try:
+            QApplication.clipboard().setText(self.report_text())
+        except Exception:
+            pass
+
+    def _on_dump(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, 'Salvar trace', instrument.DEFAULT_TRACE_FILE,
+                                              'Chrome trace (*.json)')
+        if path:
+            try:
+                instrument.dump_chrome_trace(path)
+            except Exception:
+                pass
@@ -0,0 +1,269 @@
+"""Row document: the loaded rows plus per-row dirty tracking for saves.
+
+The GUI table is only a view; edits go into `RowDocument.rows` (the same
+list objects the editor works on) and are flagged with `mark_dirty()` /
+`set_cell()`. Saving then:
+
+- does nothing when no row is dirty;
+- re-encodes only the dirty rows. When the document was loaded with
+  gfio.read_pipe_records, every other record (and any header before the
+  first one) is copied byte for byte from the loaded file through memoryview
+  slices, so unchanged records are never decoded/re-encoded and a diff of the
+  saved file shows only the edited records. Without that index the encoded
+  bytes of each record are cached from the previous save instead;
+- encodes once and writes the same bytes to every target (C_/S_ pair),
+  atomically (gfio.write_targets).
+
+With a `journal` (journal.Journal) attached, every change made through
+set_cell / set_row / mark_dirty(before=...) is also appended to the edit
+journal, so unsaved edits survive a crash.
+
+A save is split so the slow part can run off the GUI thread:
+`snapshot()` (GUI thread) copies the rows to encode, `SaveJob.encode()` and
+the writes run anywhere, and `commit(job)` (GUI thread) clears only the dirty
+flags the job covered - rows edited meanwhile stay dirty. `save()` does all
+three in one call.
+
+Re-encoded records use the format of gfio.write_pipe_file (fields joined by
+'|', unencodable characters replaced); with a source index an edited record
+keeps its original line terminator.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import gfio, instrument
+    from .journal import Record
+except ImportError:
+    import gfio
+    import instrument
+    from journal import Record
+
+
+class SaveJob:
+    """What one save needs, detached from the live rows (see RowDocument.snapshot)."""
+
+    def __init__(self, encoding: str, newline: str, pending: Dict[int, List[str]],
+                 cached: List[Optional[bytes]], marks: Dict[int, int], source=None):
+        self.encoding = encoding
+        self.newline = newline
+        self.pending = pending      # index -> copy of a row to (re-)encode
+        self.cached = cached        # encoded bytes per record (None: pending or copied from source)
+        self.marks = marks          # dirty generation of each row covered by this job
+        self.source = source        # gfio.RecordSpans of the loaded file, or None
+        self.encoded: List[Optional[bytes]] = []
+        self.size = 0
+
+    def _encode_row(self, i: int, row: List[str]) -> bytes:
+        body = '|'.join(row).encode(self.encoding, errors='replace')
+        src = self.source
+        if src is None:
+            return body + self.newline.encode(self.encoding)
+        # keep the record's leading blank lines and original terminator
+        data = src.data
+        return data[src.starts[i]:src.cstarts[i]] + body + data[src.cends[i]:src.next_start(i)]
+
+    def encode(self) -> List:
+        """Encode the pending rows; return the file as a list of chunks (bytes / memoryview).
+
+        Runs of records copied from the source are coalesced into one
+        memoryview slice each. Thread-safe: touches only the job.
+        """
+        with instrument.span('document.encode', cat='io', rows=len(self.cached), encoded=len(self.pending)):
+            enc = list(self.cached)
+            for i, row in self.pending.items():
+                enc[i] = self._encode_row(i, row)
+            self.encoded = enc
+            chunks: List = []
+            src = self.source
+            if src is None:
+                chunks = enc
+            else:
+                view = memoryview(src.data)
+                run_start = 0
+                run_end = src.starts[0] if len(src) else len(src.data)   # header before the first record
+                for i, piece in enumerate(enc):
+                    if piece is None:
+                        a, b = src.starts[i], src.next_start(i)
+                        if a == run_end:
+                            run_end = b
+                            continue
+                        if run_end > run_start:
+                            chunks.append(view[run_start:run_end])
+                        run_start, run_end = a, b
+                    else:
+                        if run_end > run_start:
+                            chunks.append(view[run_start:run_end])
+                        run_start = run_end = src.next_start(i)
+                        chunks.append(piece)
+                if run_end > run_start:
+                    chunks.append(view[run_start:run_end])
+            self.size = sum(len(c) for c in chunks)
+        return chunks
+
+
+class RowDocument:
+    """Rows of a pipe-delimited file with dirty flags and an encoded-record cache."""
+
+    def __init__(self, rows: List[List[str]], encoding: str = 'big5', newline: str = '\n', source=None):
+        self.rows = rows
+        self.encoding = encoding
+        self.newline = newline
+        # gfio.RecordSpans of the file the rows came from (verbatim copy of unchanged records)
+        self.source = source if source is not None and len(source) == len(rows) else None
+        # dirty row index -> generation of its latest change
+        self.dirty: Dict[int, int] = {}
+        self._generation = 0
+        # journal.Journal receiving every field change (None: not journaled)
+        self.journal = None
+        # encoded bytes of each record as last written (None = not encoded yet)
+        self._encoded: List[Optional[bytes]] = [None] * len(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.dirty)
+
+    def mark_dirty(self, index: int, before: Optional[List[str]] = None) -> None:
+        """Flag a row changed in place (e.g. by the item editor).
+
+        before: the row as it was, so the changed fields can be journaled.
+        """
+        if 0 <= index < len(self.rows):
+            self._generation += 1
+            self.dirty[index] = self._generation
+            if self.journal is not None and before is not None:
+                self.journal.append_row(index, before, self.rows[index])
+
+    def set_cell(self, index: int, col: int, value: str) -> bool:
+        """Set one field; returns True (and marks the row dirty) only if it changed."""
+        row = self.rows[index]
+        if col >= len(row):
+            if value == '':
+                return False
+            row.extend([''] * (col + 1 - len(row)))
+        old = row[col]
+        if old == value:
+            return False
+        row[col] = value
+        self.mark_dirty(index)
+        if self.journal is not None:
+            self.journal.append(index, row[0] if col else old, col, old, value)
+        return True
+
+    def set_cells(self, cells: Iterable[Tuple[int, int, str]]) -> int:
+        """Set many fields, (index, col, value) each; returns how many changed.
+
+        The changes go to the journal in one append, after all of them are
+        applied, so its on_append hook (autosave) never sees a half-applied batch.
+        """
+        rows = self.rows
+        records = []
+        for index, col, value in cells:
+            row = rows[index]
+            if col >= len(row):
+                if value == '':
+                    continue
+                row.extend([''] * (col + 1 - len(row)))
+            old = row[col]
+            if old == value:
+                continue
+            row[col] = value
+            self.mark_dirty(index)
+            records.append(Record(index, row[0] if col else old, col, old, value))
+        if self.journal is not None:
+            self.journal.extend(records)
+        return len(records)
+
+    def set_row(self, index: int, values: Iterable[str]) -> bool:
+        values = list(values)
+        if self.rows[index] == values:
+            return False
+        before = list(self.rows[index])
+        self.rows[index][:] = values
+        self.mark_dirty(index, before=before)
+        return True
+
+    def apply_reload(self, delta, decoded: Dict[int, List[str]], source=None) -> Tuple[List[int], List[int]]:
+        """Patch in a version of the file changed by another program (see recdiff.diff_records).
+
+        decoded: fields of the changed and added records, by their index in the
+        new file. Row lists are updated in place and the outer list keeps its
+        identity, so views holding `rows` see the new data. Rows with unsaved
+        edits keep the local version (a conflict); dirty rows the other program
+        removed are dropped. Returns (patched, conflicts), indices into the new rows.
+        """
+        rows = self.rows
+        patched: List[int] = []
+        conflicts: List[int] = []
+        if not delta.structural:
+            for i, j in delta.changed:
+                if i in self.dirty:
+                    conflicts.append(i)
+                elif rows[i] != decoded[j]:
+                    rows[i][:] = decoded[j]
+                    patched.append(i)
+        else:
+            changed = {j for _, j in delta.changed}
+            new_rows = []
+            dirty: Dict[int, int] = {}
+            for j, i in enumerate(delta.new_to_old):
+                if i < 0:
+                    new_rows.append(decoded[j])
+                    patched.append(j)
+                    continue
+                row = rows[i]
+                if i in self.dirty:
+                    dirty[j] = self.dirty[i]
+                    if j in changed:
+                        conflicts.append(j)
+                elif j in changed and row != decoded[j]:
+                    row[:] = decoded[j]
+                    patched.append(j)
+                new_rows.append(row)
+            rows[:] = new_rows
+            self.dirty = dirty
+        self.source = source if source is not None and len(source) == len(rows) else None
+        self._encoded = [None] * len(rows)
+        return patched, conflicts
+
+    def snapshot(self) -> SaveJob:
+        """GUI thread: copy the rows that need encoding; cheap when only a few rows changed."""
+        n = len(self.rows)
+        if len(self._encoded) != n:
+            # rows appended/removed behind our back: re-encode everything
+            self._encoded = [None] * n
+            self.source = None
+        cached = list(self._encoded)
+        for i in self.dirty:
+            if i < n:
+                cached[i] = None
+        if self.source is not None:
+            pending = {i: list(self.rows[i]) for i in self.dirty if i < n}
+        else:
+            pending = {i: list(self.rows[i]) for i in range(n) if cached[i] is None}
+        return SaveJob(self.encoding, self.newline, pending, cached, dict(self.dirty), self.source)
+
+    def commit(self, job: SaveJob) -> None:
+        """GUI thread, after the job was written: keep its encoded records, clear the flags it covered."""
+        if len(job.encoded) == len(self.rows):
+            self._encoded = job.encoded
+        for i, gen in job.marks.items():
+            # rows edited again while saving keep their (newer) flag
+            if self.dirty.get(i) == gen:
+                del self.dirty[i]
+
+    def serialize(self) -> bytes:
+        return b''.join(self.snapshot().encode())
+
+    def save(self, paths: Iterable[str], force: bool = False, fsync: bool = False,
+             progress: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Write the rows to every path. Returns False (nothing written) if there were no changes."""
+        if not self.dirty and not force:
+            return False
+        job = self.snapshot()
+        with instrument.span('document.save', cat='io', rows=len(self.rows), dirty=len(self.dirty)):
+            gfio.write_targets(list(paths), job.encode(), fsync=fsync, progress=progress)
+        self.commit(job)
+        return True
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 """IO utilities for GF Editor (in src package)."""
-from typing import List, Optional
-import chardet
+import re
+from typing import Callable, List, Optional
+
+try:
+    from . import instrument
+except ImportError:
+    import instrument
 
 
 def detect_encoding(path: str, default: str = 'utf-8') -> str:
@@ -9,11 +14,13 @@ def detect_encoding(path: str, default: str = 'utf-8') -> str:
         sample = f.read(4096)
     if not sample:
         return default
+    import chardet  # ~20 ms to import; only needed when sniffing an encoding
     detected = chardet.detect(sample)
     enc = detected.get('encoding') or default
     return enc
 
 
+@instrument.traced('gfio.read_pipe_file', cat='io')
 def read_pipe_file(path: str, encoding: Optional[str] = None, limit: Optional[int] = None,
                    expected_fields: Optional[int] = None) -> List[List[str]]:
     """Read a pipe-delimited file.
@@ -75,6 +82,7 @@ def read_pipe_file(path: str, encoding: Optional[str] = None, limit: Optional[in
     return rows
 
 
+@instrument.traced('gfio.read_ids', cat='io')
 def read_ids(path: str, encoding: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
     """Read only the first field (Id) from each line to avoid loading full dataset into memory.
 
@@ -101,8 +109,205 @@ def read_ids(path: str, encoding: Optional[str] = None, limit: Optional[int] = N
     return ids
 
 
+class RecordSpans:
+    """Byte offsets of the logical records of a loaded file, plus the raw bytes.
+
+    For record i: data[starts[i]:cstarts[i]] is leading whitespace (blank lines),
+    data[cstarts[i]:cends[i]] the record itself and data[cends[i]:next_start(i)]
+    its line terminator (and anything up to the next record). data[:starts[0]]
+    is whatever precedes the first record (header lines). Lets a writer copy
+    unchanged records verbatim instead of re-encoding them.
+    """
+
+    def __init__(self, data: bytes, starts, cstarts, cends):
+        self.data = data
+        self.starts = starts
+        self.cstarts = cstarts
+        self.cends = cends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def next_start(self, i: int) -> int:
+        return self.starts[i + 1] if i + 1 < len(self.starts) else len(self.data)
+
+    def record_bytes(self, i: int) -> bytes:
+        return self.data[self.cstarts[i]:self.cends[i]]
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """True if digits, '|', CR and LF encode as single ASCII bytes (Big5, UTF-8, cp125x...)."""
+    try:
+        return '0123456789|\r\n '.encode(encoding) == b'0123456789|\r\n '
+    except (LookupError, UnicodeError):
+        return False
+
+
+_FIRST_RECORD = re.compile(rb'(\s*)\d+\|')
+_RECORD_BOUNDARY = re.compile(rb'\n(?=(\s*)\d+\|)')
+
+
+@instrument.traced('gfio.scan_records', cat='io')
+def scan_records(data: bytes) -> RecordSpans:
+    """Index the records of raw file bytes (an Id at the start of a line) without decoding them.
+
+    Only valid for ASCII compatible encodings (digits, '|' and newlines are
+    never Big5 trail bytes); see is_ascii_compatible.
+    """
+    from array import array
+    starts, cstarts, cends = array('q'), array('q'), array('q')
+    # a record starts after a newline followed by optional whitespace and "<digits>|";
+    # only newlines are tried (cheaper than a lazy match over every byte)
+    first = _FIRST_RECORD.match(data)
+    bounds = array('q')
+    if first:
+        starts.append(0)
+        cstarts.append(first.end(1))
+        allowed = first.end(1)
+    else:
+        allowed = 0
+    for m in _RECORD_BOUNDARY.finditer(data):
+        nl = m.start()
+        if nl < allowed:
+            # newline inside the blank lines in front of a record already started
+            continue
+        bounds.append(nl)
+        starts.append(nl + 1)
+        # the record itself starts after the leading whitespace, at the Id
+        allowed = m.end(1)
+        cstarts.append(allowed)
+    bounds.append(len(data))
+    if not first:
+        # the first newline closes the header lines, not a record
+        bounds.pop(0)
+    for cstart, end in zip(cstarts, bounds):
+        # same normalisation as read_pipe_file: no trailing newline (CR/LF)
+        while end > cstart and data[end - 1] in (10, 13):
+            end -= 1
+        cends.append(end)
+    return RecordSpans(data, starts, cstarts, cends)
+
+
+def decode_record(spans: RecordSpans, i: int, encoding: str, expected_fields: int = 93) -> List[str]:
+    """Fields of record i of a scanned file, exactly as read_pipe_file(expected_fields=...) returns them."""
+    fields = spans.data[spans.cstarts[i]:spans.cends[i]].decode(encoding, errors='replace').split('|')
+    fields[0] = fields[0].strip()
+    if len(fields) < expected_fields:
+        fields += [''] * (expected_fields - len(fields))
+    elif len(fields) > expected_fields:
+        fields = fields[:expected_fields]
+    return fields
+
+
+@instrument.traced('gfio.read_pipe_records', cat='io')
+def read_pipe_records(path: str, encoding: Optional[str] = None, expected_fields: int = 93):
+    """Like read_pipe_file(expected_fields=...), but also return the RecordSpans index.
+
+    Records are found on the raw bytes (scan_records) and decoded one by one,
+    so the rows match read_pipe_file. Returns (rows, spans); spans is None for
+    encodings that are not ASCII compatible, where the text path is used.
+    """
+    if encoding is None:
+        encoding = detect_encoding(path)
+    if not is_ascii_compatible(encoding):
+        return read_pipe_file(path, encoding=encoding, expected_fields=expected_fields), None
+    with open(path, 'rb') as f:
+        data = f.read()
+    spans = scan_records(data)
+    rows = [decode_record(spans, i, encoding, expected_fields) for i in range(len(spans))]
+    return rows, spans
+
+
+@instrument.traced('gfio.write_pipe_file', cat='io')
 def write_pipe_file(path: str, rows: List[List[str]], encoding: str = 'utf-8') -> None:
     # use errors='replace' to avoid raising on characters not representable in target encoding
     with open(path, 'w', encoding=encoding, errors='replace', newline='') as f:
         for row in rows:
             f.write('|'.join(row) + '\n')
+
+
+WRITE_CHUNK = 4 * 1024 * 1024
+
+
+def write_bytes_atomic(path: str, data, fsync: bool = False,
+                       progress: Optional[Callable[[int], None]] = None) -> None:
+    """Write data (bytes-like, or a list of bytes-like chunks) to path through a
+    temp file in the same directory and os.replace.
+
+    Readers never see a half-written file and a failed write leaves the old
+    file untouched. fsync=True also flushes the file (and, where supported, the
+    directory entry) to disk before returning. progress(n) is called with the
+    number of bytes written by each chunk.
+    """
+    import os
+    import tempfile
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            for part in (data if isinstance(data, (list, tuple)) else (data,)):
+                view = memoryview(part)
+                for start in range(0, len(view), WRITE_CHUNK):
+                    chunk = view[start:start + WRITE_CHUNK]
+                    fh.write(chunk)
+                    if progress is not None:
+                        progress(len(chunk))
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        try:
+            # keep the permissions of the file being replaced
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        try:
+            dfd = os.open(d, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+        except OSError:
+            pass
+
+
+@instrument.traced('gfio.write_targets', cat='io')
+def write_targets(paths: List[str], data, fsync: bool = False,
+                  progress: Optional[Callable[[int, int], None]] = None) -> None:
+    """Write the same bytes (or chunk list) to every path (e.g. the C_/S_ pair) concurrently, atomically.
+
+    progress(done, total) reports bytes written over all targets; it may be
+    called from writer threads.
+    """
+    import threading
+    paths = [p for p in paths if p]
+    size = sum(len(c) for c in data) if isinstance(data, (list, tuple)) else len(data)
+    total = size * len(paths)
+    done = [0]
+    lock = threading.Lock()
+
+    def _step(n: int) -> None:
+        if progress is None:
+            return
+        with lock:
+            done[0] += n
+            current = done[0]
+        progress(current, total)
+
+    if len(paths) <= 1:
+        for p in paths:
+            write_bytes_atomic(p, data, fsync=fsync, progress=_step)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix='gfeditor_write') as pool:
+        futures = [pool.submit(write_bytes_atomic, p, data, fsync, _step) for p in paths]
+        for f in futures:
+            f.result()
@@ -5,15 +5,31 @@ This provides: open file, show first lines in a table, save (writes back raw pip
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QWidget, QVBoxLayout,
     QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QMessageBox,
-    QListWidget, QSplitter, QLabel, QTextEdit, QScrollArea, QFormLayout, QLineEdit,
-    QGroupBox, QGridLayout, QCheckBox, QSizePolicy, QSpacerItem
+    QListWidget, QSplitter, QLabel, QTextEdit, QProgressBar
 )
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QAction
+from PySide6.QtCore import Qt, QThread, Signal, QSettings, QTimer
+import json
+import os
 import sys
 from pathlib import Path
 from typing import Optional
 import gfio as _gfio
+import instrument
+from modules.registry import ModuleRegistry
+from document import RowDocument
+import backup
+import journal
+import recdiff
+from watcher import FileWatcher
+
+
+# modulos pre-carregados apos o primeiro paint (os mais usados, segundo QSettings modules/usage)
+WARMUP_MODULES = 2
+WARMUP_DELAY_MS = 300
+# journal de edicoes: vira um save de verdade (em background) apos N registros ou X s sem editar
+JOURNAL_COMPACT_RECORDS = 500
+JOURNAL_IDLE_SECONDS = 60
 
 
 class MainWindow(QMainWindow):
@@ -34,16 +50,44 @@ class MainWindow(QMainWindow):
         self.lib_path = self.find_lib()
         self.current_path = None
         self.rows = []
+        # fonte da verdade para salvar: rows + flags de linhas alteradas (a tabela e so a view)
+        self.document: Optional[RowDocument] = None
+        # journal de recuperacao (<arquivo>.journal) das edicoes ainda nao salvas
+        self.journal: Optional[journal.Journal] = None
+        self._journal_timer = QTimer(self)
+        self._journal_timer.setSingleShot(True)
+        self._journal_timer.timeout.connect(self._compact_journal)
+        self._save_worker = None
         self.pair_paths = None
         self._current_worker = None
+        self.header = None
 
-        # module discovery
-        self.modules = []
-        modules_dir = Path(__file__).parent / 'modules'
-        if modules_dir.exists():
-            for p in sorted(modules_dir.iterdir()):
-                if p.is_dir() and (p / '__init__.py').exists():
-                    self.modules.append((p.name.capitalize(), f'modules.{p.name}'))
+        # arquivos abertos (C_/S_ e T_) alterados por outros programas: recarga incremental
+        try:
+            poll_ms = int(QSettings('GFEditor', 'GFEditor').value('watch/poll_ms', 0))
+        except Exception:
+            poll_ms = 0
+        self.watcher = FileWatcher(self, poll_ms=poll_ms)
+        self.watcher.changed.connect(self._on_watched_file_changed)
+        self._reload_worker = None
+        self._reload_again = False
+
+        # stage timing (see instrument.py); GFEDITOR_TRACE env var or setting diagnostics/trace
+        try:
+            settings = QSettings('GFEditor', 'GFEditor')
+            if not instrument.is_enabled() and str(settings.value('diagnostics/trace', 'false')).lower() in ('1', 'true'):
+                instrument.enable(True, dump_path=instrument.DEFAULT_TRACE_FILE)
+        except Exception:
+            pass
+
+        # module discovery: metadata vem do manifest em cache; o codigo do modulo
+        # so e importado quando o painel e aberto (ou no warm-up apos o primeiro paint)
+        self.registry = ModuleRegistry(Path(__file__).parent / 'modules')
+        try:
+            self.registry.discover()
+        except Exception:
+            pass
+        self.modules = [(info.name, info.package) for info in self.registry.infos]
 
         # UI: left module list, right content area
         self.module_list = QListWidget()
@@ -63,6 +107,7 @@ class MainWindow(QMainWindow):
         left_panel.setFixedWidth(150)
 
         self.table = QTableWidget()
+        self.table.itemChanged.connect(self._on_table_item_changed)
         self.intro_panel = self.create_intro_panel()
 
         # selecionar Home por padro
@@ -91,6 +136,61 @@ class MainWindow(QMainWindow):
         central.setLayout(central_layout)
         self.setCentralWidget(central)
 
+        # progresso do salvamento em background (SaveWorker)
+        self.save_progress = QProgressBar()
+        self.save_progress.setMaximumWidth(200)
+        self.save_progress.setRange(0, 100)
+        self.save_progress.hide()
+        self.statusBar().addPermanentWidget(self.save_progress)
+
+        # painel de diagnostico (timings/memoria): criado so quando aberto pelo menu ou F12
+        self.diagnostics_dock = None
+        act_diag = QAction('Diagnostico', self)
+        act_diag.setShortcut('F12')
+        act_diag.triggered.connect(self.toggle_diagnostics)
+        self.menuBar().addMenu('Exibir').addAction(act_diag)
+
+    def _module_usage(self) -> dict:
+        try:
+            usage = json.loads(str(QSettings('GFEditor', 'GFEditor').value('modules/usage', '{}')))
+            return usage if isinstance(usage, dict) else {}
+        except Exception:
+            return {}
+
+    def _count_module_use(self, key: str):
+        try:
+            usage = self._module_usage()
+            usage[key] = int(usage.get(key, 0)) + 1
+            QSettings('GFEditor', 'GFEditor').setValue('modules/usage', json.dumps(usage))
+        except Exception:
+            pass
+
+    def warm_up_modules(self, count: int = WARMUP_MODULES):
+        """Preload the most used modules, one per event-loop turn, so the GUI stays responsive."""
+        usage = self._module_usage()
+        keys = [i.key for i in self.registry.infos]
+        ranked = sorted(keys, key=lambda k: -int(usage.get(k, 0)))
+        todo = [k for k in ranked[:count] if usage.get(k)] or [k for k in ('items',) if k in keys]
+
+        def _next():
+            if not todo:
+                return
+            key = todo.pop(0)
+            with instrument.span('gui.warm_up_module', cat='load', module=key):
+                self.registry.warm_up([key])
+            QTimer.singleShot(0, _next)
+
+        _next()
+
+    def toggle_diagnostics(self):
+        """Show/hide the diagnostics dock, importing and building it on first use."""
+        if self.diagnostics_dock is None:
+            import diagnostics
+            self.diagnostics_dock = diagnostics.DiagnosticsDock(self)
+            self.addDockWidget(Qt.BottomDockWidgetArea, self.diagnostics_dock)
+            return
+        self.diagnostics_dock.setVisible(not self.diagnostics_dock.isVisible())
+
     def create_intro_panel(self) -> QWidget:
         w = QWidget()
         layout = QVBoxLayout()
@@ -145,16 +245,17 @@ class MainWindow(QMainWindow):
         idx = row - 1
         if idx < 0 or idx >= len(self.modules):
             return
-        module_path = self.modules[idx][1]
+        info = self.registry.infos[idx]
+        module_path = info.package
         try:
-            mod = __import__(module_path, fromlist=['panel_widget'])
+            with instrument.span('gui.open_module', cat='build', module=info.key):
+                panel = self.registry.panel(info.key, self)
         except Exception:
             QMessageBox.warning(self, 'Module load error', f'Failed to load {module_path}')
             return
+        self._count_module_use(info.key)
 
-        if hasattr(mod, 'panel_widget'):
-            panel = mod.panel_widget(self)
-        else:
+        if panel is None:
             # simple placeholder if no UI provided
             panel = QWidget()
             l = QVBoxLayout()
@@ -166,8 +267,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'UI error', 'Cannot find layout splitter')
             return
         old = splitter.widget(1)
+        if old is panel:
+            return
         splitter.insertWidget(1, panel)
         if old is not None:
+            # paineis em cache (registry) continuam vivos; os demais sao descartados
             old.setParent(None)
 
     def show_intro(self):
@@ -186,25 +290,21 @@ class MainWindow(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, 'Open file', str(Path.cwd() / 'Assets'))
         if not path:
             return
-        self.current_path = path
-        # try to find client/server pair
+        # try to find client/server pair; current_path / pair_paths are set when the read succeeds
         p = Path(path)
+        server_path = None
         try:
-            if 'Assets{}Client'.format(Path.sep) in str(p).replace('/', Path.sep):
+            if 'Assets{}Client'.format(os.sep) in str(p).replace('/', os.sep):
                 name = p.name
                 if name.startswith('C_'):
                     counterpart = Path(str(p).replace(str(Path('Assets') / 'Client'), str(Path('Assets') / 'Server'))).with_name(name.replace('C_', 'S_', 1))
                     if counterpart.exists():
-                        self.pair_paths = (str(p), str(counterpart))
+                        server_path = str(counterpart)
         except Exception:
-            self.pair_paths = None
+            server_path = None
 
         # read in background
-        if getattr(self, 'pair_paths', None):
-            client_path, server_path = self.pair_paths
-            worker = ReadPairWorker(client_path, server_path, encoding='big5', expected=93)
-        else:
-            worker = ReadPairWorker(self.current_path, None, encoding='big5', expected=93)
+        worker = ReadPairWorker(str(p), server_path, encoding='big5', expected=93)
         worker.result.connect(self._on_read_result)
         worker.error.connect(self._on_read_error)
         self._current_worker = worker
@@ -246,19 +346,128 @@ class MainWindow(QMainWindow):
         if client_rows is None:
             QMessageBox.critical(self, 'Read error', 'Failed to read primary file (no data)')
             return
-        self._show_rows_in_table_panel(header, client_rows)
+        # arquivos abertos: o journal, o watcher, o compare e o save (C_ e S_) usam estes caminhos
+        self.current_path = data.get('client_path')
+        server_path = data.get('server_path') if server_rows is not None else None
+        self.pair_paths = (self.current_path, server_path) if server_path else None
+        # comparar antes de mostrar: o replay do journal altera client_rows
+        identical = server_rows is not None and client_rows == server_rows
+        self._show_rows_in_table_panel(header, client_rows, source=data.get('client_spans'))
+        self._watch_open_files()
         if server_rows is None:
             QMessageBox.information(self, 'Loaded', 'Loaded client file (server mirror not found)')
-        elif client_rows == server_rows:
+        elif identical:
             QMessageBox.information(self, 'Loaded', 'Loaded pair (identical)')
         else:
             QMessageBox.warning(self, 'Pair mismatch', 'Client and server differ (loaded client file).')
 
+    def _watch_open_files(self):
+        """Watch the open C_/S_ pair and the matching T_ translation file."""
+        try:
+            if str(QSettings('GFEditor', 'GFEditor').value('watch/enabled', 'true')).lower() not in ('1', 'true'):
+                self.watcher.clear()
+                return
+        except Exception:
+            pass
+        paths = list(self.pair_paths) if getattr(self, 'pair_paths', None) else [self.current_path]
+        if self.current_path:
+            name = Path(self.current_path).name
+            if name[:2].upper() in ('C_', 'S_'):
+                stem = Path(name).stem[2:]
+                trans_dir = Path(self.lib_path or (Path.cwd() / 'Assets')) / 'Translate'
+                paths += [str(p) for p in trans_dir.glob(f'T_{stem}.*')]
+        self.watcher.watch([p for p in paths if p])
+
+    def _on_watched_file_changed(self, path: str):
+        pair = [str(Path(p).resolve()) for p in (self.pair_paths or [self.current_path]) if p]
+        resolved = str(Path(path).resolve())
+        if pair and resolved == pair[0]:
+            self._reload_changed_records(path)
+        elif resolved in pair:
+            self.statusBar().showMessage(f'{Path(path).name} alterado por outro programa (o par e gravado junto no proximo save)', 8000)
+        else:
+            # T_: as traducoes sao lidas a cada consulta, basta redesenhar o item aberto
+            self._refresh_editor_rows([])
+            self.statusBar().showMessage(f'{Path(path).name} alterado: traducoes recarregadas', 5000)
+
+    def _reload_changed_records(self, path: str):
+        """Re-read a changed client file and patch only the records that differ (ReloadWorker)."""
+        doc = self.document
+        if doc is None:
+            return
+        if self._reload_worker is not None:
+            self._reload_again = True
+            return
+        if doc.source is None:
+            self.statusBar().showMessage(f'{Path(path).name} alterado por outro programa: reabra o arquivo para recarregar', 10000)
+            return
+        worker = ReloadWorker(path, doc.source, encoding=doc.encoding, expected=93)
+        worker.result.connect(lambda info, doc=doc: self._on_reload_result(doc, info))
+        worker.error.connect(self._on_reload_error)
+        self._reload_worker = worker
+        worker.start()
+
+    def _on_reload_result(self, doc, info: dict):
+        self._reload_worker = None
+        if doc is self.document:
+            with instrument.span('gui.apply_reload', cat='load'):
+                delta = info['delta']
+                patched, conflicts = doc.apply_reload(delta, info['decoded'], info['spans'])
+                try:
+                    # a tabela pode ja ter sido descartada (editor detalhado aberto no lugar dela)
+                    if delta.structural:
+                        self.populate_table(self.header)
+                    else:
+                        self._refresh_table_rows(patched)
+                except Exception:
+                    pass
+                self._refresh_editor_rows(None if delta.structural else patched)
+            msg = f'{Path(info["path"]).name} alterado por outro programa: {len(patched)} registro(s) atualizado(s)'
+            if delta.added or delta.removed:
+                msg += f', {len(delta.added)} novo(s), {len(delta.removed)} removido(s)'
+            if conflicts:
+                msg += f', {len(conflicts)} com edicoes locais mantidas'
+            self.statusBar().showMessage(msg, 10000)
+        if self._reload_again:
+            self._reload_again = False
+            if self.current_path:
+                self._reload_changed_records(self.pair_paths[0] if self.pair_paths else self.current_path)
+
+    def _on_reload_error(self, msg: str):
+        self._reload_worker = None
+        self._reload_again = False
+        self.statusBar().showMessage(f'Falha ao recarregar: {msg}', 10000)
+
+    def _refresh_table_rows(self, indices):
+        self.table.blockSignals(True)
+        try:
+            cols = self.table.columnCount()
+            for i in indices:
+                if i >= self.table.rowCount():
+                    continue
+                row = self.rows[i]
+                for j in range(cols):
+                    self.table.setItem(i, j, QTableWidgetItem(row[j] if j < len(row) else ''))
+        finally:
+            self.table.blockSignals(False)
+
+    def _refresh_editor_rows(self, indices):
+        """Let an open item editor redraw the given rows (None: everything)."""
+        splitter = self._find_splitter()
+        view = splitter.widget(1) if splitter is not None else None
+        refresh = getattr(view, 'refresh_rows', None)
+        if refresh is not None:
+            try:
+                refresh(indices)
+            except Exception:
+                pass
+
     def _on_read_error(self, msg: str):
         QApplication.restoreOverrideCursor()
         self._current_worker = None
         QMessageBox.critical(self, 'Read error', f'Failed to read files: {msg}')
 
+    @instrument.traced('gui.populate_table', cat='render')
     def populate_table(self, header: Optional[list] = None):
         if not self.rows:
             self.table.clear()
@@ -273,13 +482,30 @@ class MainWindow(QMainWindow):
                 self.table.setHorizontalHeaderLabels(labels)
             except Exception:
                 pass
-        for i, row in enumerate(self.rows):
-            for j in range(desired_cols):
-                val = row[j] if j < len(row) else ''
-                self.table.setItem(i, j, QTableWidgetItem(val))
+        self.table.blockSignals(True)
+        try:
+            for i, row in enumerate(self.rows):
+                for j in range(desired_cols):
+                    val = row[j] if j < len(row) else ''
+                    self.table.setItem(i, j, QTableWidgetItem(val))
+        finally:
+            self.table.blockSignals(False)
+
+    def _on_table_item_changed(self, item):
+        """Edits typed into the table go to the document (and mark the row dirty)."""
+        if self.document is None:
+            return
+        i, j = item.row(), item.column()
+        if 0 <= i < len(self.document):
+            self.document.set_cell(i, j, item.text())
 
-    def _show_rows_in_table_panel(self, header, rows):
+    @instrument.traced('gui.show_rows_in_table_panel', cat='render')
+    def _show_rows_in_table_panel(self, header, rows, source=None):
         self.rows = rows
+        self.header = header
+        if self.document is None or self.document.rows is not rows:
+            self.document = RowDocument(rows, encoding='big5', source=source)
+            self._attach_journal()
         self.populate_table(header)
         panel = QWidget()
         layout = QVBoxLayout()
@@ -315,6 +541,57 @@ class MainWindow(QMainWindow):
         if old is not None:
             old.setParent(None)
 
+    def _attach_journal(self):
+        """Journal the new document's edits; first offer to replay edits a crash left unsaved."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self._journal_timer.stop()
+        if self.document is None or not self.current_path:
+            return
+        settings = QSettings('GFEditor', 'GFEditor')
+        try:
+            if str(settings.value('journal/enabled', 'true')).lower() not in ('1', 'true'):
+                return
+            fsync = str(settings.value('journal/fsync', 'false')).lower() in ('1', 'true')
+        except Exception:
+            fsync = False
+        jr = journal.Journal(self.current_path, fsync=fsync)
+        records = jr.records()
+        if records:
+            text = f'{len(records)} alteracao(oes) nao salva(s) encontrada(s) em\n{jr.path}\n\nRecuperar?'
+            if jr.base_changed():
+                text += '\n(o arquivo mudou desde entao: campos em conflito ficam com o valor do journal)'
+            answer = QMessageBox.question(self, 'Recuperar edicoes', text,
+                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer == QMessageBox.Yes:
+                with instrument.span('gui.journal_replay', cat='load', records=len(records)):
+                    applied, conflicts = journal.replay(records, self.document)
+                self.statusBar().showMessage(
+                    f'{applied} alteracao(oes) recuperada(s), {conflicts} conflito(s) - salve para gravar', 10000)
+            else:
+                jr.discard()
+        jr.on_append = self._on_journal_append
+        self.journal = jr
+        self.document.journal = jr
+
+    def _on_journal_append(self, count: int):
+        if count >= JOURNAL_COMPACT_RECORDS:
+            self._compact_journal()
+            return
+        try:
+            idle = int(QSettings('GFEditor', 'GFEditor').value('journal/autosave_seconds', JOURNAL_IDLE_SECONDS))
+        except Exception:
+            idle = JOURNAL_IDLE_SECONDS
+        if idle > 0:
+            self._journal_timer.start(idle * 1000)
+
+    def _compact_journal(self):
+        """Turn the journaled edits into a real save, in the background (no dialogs)."""
+        self._journal_timer.stop()
+        if self._save_worker is None and self.document is not None and self.document.is_dirty:
+            self.save_file(quiet=True)
+
     def _handle_edit_item(self):
         client_path, server_path = self._find_client_server_pair('C_Item')
         if client_path is None:
@@ -339,10 +616,12 @@ class MainWindow(QMainWindow):
         QApplication.setOverrideCursor(Qt.WaitCursor)
         worker.start()
 
+    @instrument.traced('gui.open_professional_editor', cat='build')
     def open_professional_editor(self, index: int, header: list):
         try:
             panel_mod = __import__('modules.items.panel', fromlist=['build_professional_editor'])
-            editor = panel_mod.build_professional_editor(self, self.rows, header)
+            pair = self.pair_paths or (self.current_path, None)
+            editor = panel_mod.build_professional_editor(self, self.rows, header, pair=pair)
         except Exception:
             try:
                 pkg = __import__('modules.items', fromlist=['panel_widget'])
@@ -362,29 +641,107 @@ class MainWindow(QMainWindow):
         if old is not None:
             old.setParent(None)
 
-    def save_file(self):
+    def save_file(self, quiet: bool = False):
+        """Write the dirty rows (pair) in a SaveWorker; quiet: status bar only (journal autosave)."""
         if not self.current_path:
-            QMessageBox.warning(self, 'No file', 'No file opened')
+            if not quiet:
+                QMessageBox.warning(self, 'No file', 'No file opened')
+            return
+        if self._save_worker is not None:
+            self.statusBar().showMessage('Salvamento em andamento...', 3000)
+            return
+        doc = self.document
+        if doc is None or not doc.is_dirty:
+            self.statusBar().showMessage('Nada para salvar (sem alteracoes)', 3000)
             return
-        rows = []
-        for i in range(self.table.rowCount()):
-            row = []
-            for j in range(self.table.columnCount()):
-                item = self.table.item(i, j)
-                row.append(item.text() if item else '')
-            rows.append(row)
-        Path(self.current_path + '.bak').write_text('backup', encoding='utf-8')
+        if getattr(self, 'pair_paths', None):
+            paths = list(self.pair_paths)
+        else:
+            paths = [self.current_path]
+        settings = QSettings('GFEditor', 'GFEditor')
         try:
-            if getattr(self, 'pair_paths', None):
-                client_path, server_path = self.pair_paths
-                _gfio.write_pipe_file(client_path, rows, encoding='big5')
-                _gfio.write_pipe_file(server_path, rows, encoding='big5')
-                QMessageBox.information(self, 'Saved', f'Saved pair:\nClient: {client_path}\nServer: {server_path}')
-            else:
-                _gfio.write_pipe_file(self.current_path, rows, encoding='big5')
-                QMessageBox.information(self, 'Saved', 'File saved (backup created)')
-        except Exception as exc:
-            QMessageBox.critical(self, 'Save error', f'Failed to save: {exc}')
+            fsync = str(settings.value('save/fsync', 'false')).lower() in ('1', 'true')
+            keep_backup = str(settings.value('backup/enabled', 'true')).lower() in ('1', 'true')
+        except Exception:
+            fsync, keep_backup = False, True
+        # backup deduplicado dos arquivos atuais (backup.py) antes de sobrescrever
+        store = backup.BackupStore(backup.default_store_for(paths[0])) if keep_backup else None
+        # snapshot no GUI thread; backup + encode + escrita (C_ e S_ em paralelo) no worker
+        job = doc.snapshot()
+        worker = SaveWorker(job, paths, fsync=fsync, backup_store=store)
+        worker.progress.connect(self._on_save_progress)
+        worker.result.connect(lambda info, job=job: self._on_save_result(job, info, quiet))
+        worker.error.connect(lambda msg: self._on_save_error(msg, quiet))
+        self._save_worker = worker
+        # nossos proprios writes nao contam como alteracao externa
+        self.watcher.suspend()
+        self.save_progress.setValue(0)
+        self.save_progress.show()
+        self.statusBar().showMessage(f'Salvando {len(job.marks)} linha(s) alterada(s)...')
+        worker.start()
+
+    def _on_save_progress(self, done: int, total: int):
+        self.save_progress.setValue(int(done * 100 / total) if total else 100)
+
+    def _finish_save(self):
+        worker, self._save_worker = self._save_worker, None
+        self.watcher.resume(worker.paths if worker is not None else ())
+        self.save_progress.hide()
+        self.statusBar().clearMessage()
+
+    def _on_save_result(self, job, info: dict, quiet: bool = False):
+        self._finish_save()
+        if self.document is not None:
+            self.document.commit(job)
+            if self.journal is not None:
+                # so sobram no journal as linhas editadas durante o save
+                try:
+                    self.journal.compact(self.document.dirty)
+                except Exception:
+                    pass
+        if quiet:
+            self.statusBar().showMessage(f'Salvo automaticamente ({len(job.marks)} linha(s))', 5000)
+            return
+        paths = info.get('paths') or []
+        changed = len(job.marks)
+        snap = info.get('backup')
+        note = f'\nBackup: {snap}' if snap else ''
+        if len(paths) > 1:
+            QMessageBox.information(self, 'Saved', f'Saved pair ({changed} changed rows):\nClient: {paths[0]}\nServer: {paths[1]}{note}')
+        else:
+            QMessageBox.information(self, 'Saved', f'File saved ({changed} changed rows){note}')
+
+    def _on_save_error(self, msg: str, quiet: bool = False):
+        self._finish_save()
+        if quiet:
+            # o journal continua com as edicoes; nova tentativa no proximo autosave
+            self.statusBar().showMessage(f'Falha no salvamento automatico: {msg}', 10000)
+            return
+        QMessageBox.critical(self, 'Save error', f'Failed to save: {msg}')
+
+    def closeEvent(self, event):
+        """Wait for running save / reload / read workers before the window goes away.
+
+        Destroying a running QThread aborts the process, and a save killed
+        half way can leave C_ replaced and S_ not; the save progress bar keeps
+        updating while we wait.
+        """
+        self._journal_timer.stop()
+        workers = [w for w in (self._save_worker, self._reload_worker, self._current_worker)
+                   if w is not None and w.isRunning()]
+        if workers:
+            if self._save_worker is not None:
+                self.statusBar().showMessage('Aguardando o salvamento terminar antes de fechar...')
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                for worker in workers:
+                    while not worker.wait(50):
+                        # progresso do save + sinais de resultado (commit, compactacao do journal)
+                        QApplication.processEvents()
+                QApplication.processEvents()
+            finally:
+                QApplication.restoreOverrideCursor()
+        super().closeEvent(event)
 
 
 def run_gui():
@@ -399,12 +756,15 @@ def run_gui():
     w = MainWindow()
     w.resize(1000, 600)
     w.show()
+    QTimer.singleShot(WARMUP_DELAY_MS, w.warm_up_modules)
     return app.exec()
 
 
 class ReadPairWorker(QThread):
     """QThread worker that reads a client file and an optional server file
-    using gfio.read_pipe_file and emits the result as a dict: {'client': rows, 'server': rows}
+    using gfio.read_pipe_records / read_pipe_file and emits the result as a dict:
+    {'client': rows, 'client_spans': gfio.RecordSpans or None, 'server': rows,
+     'client_path': str, 'server_path': str or None}
     """
     result = Signal(object)
     error = Signal(str)
@@ -418,15 +778,96 @@ class ReadPairWorker(QThread):
 
     def run(self):
         try:
-            data = {}
-            if self.client_path:
-                data['client'] = _gfio.read_pipe_file(self.client_path, encoding=self.encoding, expected_fields=self.expected)
-            else:
-                data['client'] = None
-            if self.server_path:
-                data['server'] = _gfio.read_pipe_file(self.server_path, encoding=self.encoding, expected_fields=self.expected)
-            else:
-                data['server'] = None
+            data = {'client_path': self.client_path, 'server_path': self.server_path}
+            with instrument.span('ReadPairWorker.run', cat='load'):
+                if self.client_path:
+                    with instrument.span('read client', cat='load', path=self.client_path) as sp:
+                        # spans: offsets dos registros no arquivo, para o save copiar os nao editados byte a byte
+                        data['client'], data['client_spans'] = _gfio.read_pipe_records(
+                            self.client_path, encoding=self.encoding, expected_fields=self.expected)
+                        sp.set(rows=len(data['client']))
+                else:
+                    data['client'] = None
+                if self.server_path:
+                    with instrument.span('read server', cat='load', path=self.server_path) as sp:
+                        data['server'] = _gfio.read_pipe_file(self.server_path, encoding=self.encoding, expected_fields=self.expected)
+                        sp.set(rows=len(data['server']))
+                else:
+                    data['server'] = None
             self.result.emit(data)
         except Exception as e:
             self.error.emit(str(e))
+
+
+class ReloadWorker(QThread):
+    """Re-read a file changed on disk and diff it against the loaded version.
+
+    Records are indexed and hashed on the raw bytes (recdiff); only the changed
+    and added ones are decoded. Emits result({'path', 'spans', 'delta', 'decoded'}).
+    """
+    result = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, path: str, source, encoding: str = 'big5', expected: int = 93):
+        super().__init__()
+        self.path = path
+        self.source = source
+        self.encoding = encoding
+        self.expected = expected
+
+    def run(self):
+        try:
+            with instrument.span('ReloadWorker.run', cat='load', path=self.path) as sp:
+                with open(self.path, 'rb') as fh:
+                    data = fh.read()
+                spans = _gfio.scan_records(data)
+                delta = recdiff.diff_records(self.source, spans)
+                todo = [j for _, j in delta.changed] + delta.added
+                decoded = {j: _gfio.decode_record(spans, j, self.encoding, self.expected) for j in todo}
+                sp.set(changed=len(delta.changed), added=len(delta.added), removed=len(delta.removed))
+            self.result.emit({'path': self.path, 'spans': spans, 'delta': delta, 'decoded': decoded})
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class SaveWorker(QThread):
+    """QThread worker that encodes a RowDocument SaveJob once and writes it to every
+    target (C_/S_ pair) with gfio.write_targets (atomic temp + rename, optional fsync).
+
+    With a backup.BackupStore, the current files are snapshotted first.
+    Emits progress(done_bytes, total_bytes) and result({'paths', 'bytes', 'seconds', 'backup'}).
+    """
+    progress = Signal(int, int)
+    result = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, job, paths, fsync: bool = False, backup_store=None):
+        super().__init__()
+        self.job = job
+        self.paths = list(paths)
+        self.fsync = fsync
+        self.backup_store = backup_store
+        self._last_pct = -1
+
+    def _report(self, done: int, total: int):
+        # called from the writer threads; only emit when the percentage moves
+        pct = int(done * 100 / total) if total else 100
+        if pct != self._last_pct:
+            self._last_pct = pct
+            self.progress.emit(done, total)
+
+    def run(self):
+        import time
+        try:
+            t0 = time.perf_counter()
+            snap_id = None
+            with instrument.span('SaveWorker.run', cat='save', targets=len(self.paths)):
+                if self.backup_store is not None:
+                    manifest = self.backup_store.snapshot(self.paths, label='save')
+                    snap_id = manifest['id'] if manifest else None
+                chunks = self.job.encode()
+                _gfio.write_targets(self.paths, chunks, fsync=self.fsync, progress=self._report)
+            self.result.emit({'paths': self.paths, 'bytes': self.job.size, 'seconds': time.perf_counter() - t0,
+                              'backup': snap_id})
+        except Exception as e:
+            self.error.emit(str(e))
@@ -0,0 +1,246 @@
+"""Lightweight stage timing for GF Editor (spans in a ring buffer, Chrome trace export).
+
+Usage:
+
+    import instrument
+
+    with instrument.span('read client', path=p):
+        ...
+
+    @instrument.traced('items.populate_table')
+    def populate_table(...):
+        ...
+
+Tracing is off by default and costs one attribute check per call when off.
+It is enabled by the environment variable GFEDITOR_TRACE (or
+`instrument.enable()`, e.g. from the QSettings key 'diagnostics/trace'):
+
+    GFEDITOR_TRACE=1              record spans, dump gfeditor_trace.json at exit
+    GFEDITOR_TRACE=path/to.json   same, dump to that file
+
+The dump is Chrome trace JSON: open it in chrome://tracing or
+https://ui.perfetto.dev to see which stage (read, parse, table fill, editor
+build, tab updates) an operation spends its time in. Only the last
+GFEDITOR_TRACE_SPANS spans (default 20000) are kept.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_CAPACITY = 20000
+DEFAULT_TRACE_FILE = 'gfeditor_trace.json'
+
+_enabled = False
+_spans = deque(maxlen=DEFAULT_CAPACITY)
+_lock = threading.Lock()
+_dump_path: Optional[str] = None
+_atexit_registered = False
+_listeners: List[Callable[[dict], None]] = []
+# perf_counter origin so trace timestamps start near 0
+_T0 = time.perf_counter()
+
+
+def enable(on: bool = True, capacity: Optional[int] = None, dump_path: Optional[str] = None) -> None:
+    """Turn recording on/off. dump_path: write a Chrome trace there at interpreter exit."""
+    global _enabled, _spans, _dump_path, _atexit_registered
+    with _lock:
+        if capacity is not None and capacity != _spans.maxlen:
+            _spans = deque(_spans, maxlen=max(1, int(capacity)))
+        _enabled = bool(on)
+        if dump_path is not None:
+            _dump_path = dump_path
+    if on and _dump_path and not _atexit_registered:
+        _atexit_registered = True
+        atexit.register(_dump_at_exit)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_listener(fn: Callable[[dict], None]) -> None:
+    """Call fn(span_dict) for every finished span (from the recording thread)."""
+    _listeners.append(fn)
+
+
+def remove_listener(fn: Callable[[dict], None]) -> None:
+    try:
+        _listeners.remove(fn)
+    except ValueError:
+        pass
+
+
+def _record(name: str, cat: str, start: float, end: float, args: Optional[dict]) -> None:
+    ev = {
+        'name': name,
+        'cat': cat,
+        'ts': (start - _T0) * 1e6,
+        'dur': (end - start) * 1e6,
+        'tid': threading.get_ident(),
+        'thread': threading.current_thread().name,
+    }
+    if args:
+        ev['args'] = args
+    with _lock:
+        _spans.append(ev)
+    for fn in list(_listeners):
+        try:
+            fn(ev)
+        except Exception:
+            pass
+
+
+class _Span:
+    __slots__ = ('name', 'cat', 'args', 'start')
+
+    def __init__(self, name: str, cat: str, args: Optional[dict]):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        _record(self.name, self.cat, self.start, time.perf_counter(), args)
+        return False
+
+    def set(self, **args) -> None:
+        """Attach extra arguments (e.g. a row count known only at the end)."""
+        self.args = dict(self.args or {}, **args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, cat: str = 'app', **args):
+    """Context manager timing a block; a shared no-op object when tracing is off."""
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(name, cat, {k: _jsonable(v) for k, v in args.items()} or None)
+
+
+def traced(name: Optional[str] = None, cat: str = 'app'):
+    """Decorator recording a span for every call of the function."""
+    def deco(fn):
+        label = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            start = time.perf_counter()
+            failed = None
+            try:
+                return fn(*a, **kw)
+            except BaseException as exc:
+                failed = type(exc).__name__
+                raise
+            finally:
+                _record(label, cat, start, time.perf_counter(), {'error': failed} if failed else None)
+        return wrapper
+    return deco
+
+
+def _jsonable(v):
+    if isinstance(v, (int, float, str, bool)) or v is None:
+        return v
+    return str(v)
+
+
+def spans() -> List[dict]:
+    """A snapshot of the recorded spans (oldest first)."""
+    with _lock:
+        return list(_spans)
+
+
+def clear() -> None:
+    with _lock:
+        _spans.clear()
+
+
+def summary() -> Dict[str, dict]:
+    """Per span name: count, total/max/last duration in milliseconds."""
+    out: Dict[str, dict] = {}
+    for ev in spans():
+        s = out.setdefault(ev['name'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+        ms = ev['dur'] / 1000.0
+        s['count'] += 1
+        s['total_ms'] += ms
+        s['max_ms'] = max(s['max_ms'], ms)
+        s['last_ms'] = ms
+    return out
+
+
+def chrome_trace() -> dict:
+    """The recorded spans as a Chrome trace ('X' complete events plus thread names)."""
+    pid = os.getpid()
+    events = []
+    threads = {}
+    for ev in spans():
+        threads[ev['tid']] = ev['thread']
+        out = {'name': ev['name'], 'cat': ev['cat'], 'ph': 'X', 'ts': round(ev['ts'], 3),
+               'dur': round(ev['dur'], 3), 'pid': pid, 'tid': ev['tid']}
+        if 'args' in ev:
+            out['args'] = ev['args']
+        events.append(out)
+    for tid, tname in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': tname}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def dump_chrome_trace(path: Optional[str] = None) -> str:
+    """Write the Chrome trace JSON and return its path."""
+    path = path or _dump_path or DEFAULT_TRACE_FILE
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(chrome_trace(), fh)
+    return path
+
+
+def _dump_at_exit() -> None:
+    if not _spans:
+        return
+    try:
+        path = dump_chrome_trace()
+        print(f'[gfeditor] trace written to {path} ({len(_spans)} spans)', file=sys.stderr)
+    except Exception:
+        pass
+
+
+def _init_from_env() -> None:
+    value = os.environ.get('GFEDITOR_TRACE', '').strip()
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return
+    try:
+        capacity = int(os.environ.get('GFEDITOR_TRACE_SPANS', DEFAULT_CAPACITY))
+    except ValueError:
+        capacity = DEFAULT_CAPACITY
+    path = DEFAULT_TRACE_FILE if value.lower() in ('1', 'true', 'yes', 'on') else value
+    enable(True, capacity=capacity, dump_path=path)
+
+
+_init_from_env()
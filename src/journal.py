@@ -0,0 +1,256 @@
+"""Append-only edit journal: crash recovery for unsaved edits.
+
+Every field change made through RowDocument (table edits, the item editor's
+save_current) is appended to `<data file>.journal` right away, so a crash or a
+killed process loses nothing between full saves. On the next load the GUI
+offers to replay the journal onto the freshly read rows; after a save the
+journal is compacted to the records of rows that are still unsaved (and
+removed when there are none).
+
+File layout (little endian):
+
+    header   b'GFJ1' | u64 size | u64 mtime_ns     of the data file the journal applies to
+    record   u32 payload length | u32 crc32(payload) | payload
+    payload  u32 row index | u16 column | str id | str old | str new
+    str      u32 length | utf-8 bytes
+
+A torn last record (crash in the middle of a write) fails its length or CRC
+check and is dropped; everything before it is kept.
+"""
+from collections import namedtuple
+import os
+from pathlib import Path
+import struct
+import tempfile
+import zlib
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    from . import instrument
+except ImportError:
+    import instrument
+
+MAGIC = b'GFJ1'
+SUFFIX = '.journal'
+_HEADER = struct.Struct('<4sQQ')
+_RECORD = struct.Struct('<II')
+_FIELD = struct.Struct('<IH')
+_STR = struct.Struct('<I')
+
+Record = namedtuple('Record', 'index id col old new')
+
+
+class JournalError(Exception):
+    pass
+
+
+def journal_path_for(data_path) -> str:
+    return str(data_path) + SUFFIX
+
+
+def _fingerprint(path) -> Tuple[int, int]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return 0, 0
+
+
+def _pack_str(s: str) -> bytes:
+    b = s.encode('utf-8', errors='surrogatepass')
+    return _STR.pack(len(b)) + b
+
+
+def encode_record(rec: Record) -> bytes:
+    payload = (_FIELD.pack(rec.index, rec.col) + _pack_str(rec.id) + _pack_str(rec.old) + _pack_str(rec.new))
+    return _RECORD.pack(len(payload), zlib.crc32(payload) & 0xFFFFFFFF) + payload
+
+
+def _decode_payload(payload: bytes) -> Record:
+    index, col = _FIELD.unpack_from(payload, 0)
+    pos = _FIELD.size
+    out = []
+    for _ in range(3):
+        (n,) = _STR.unpack_from(payload, pos)
+        pos += _STR.size
+        if pos + n > len(payload):
+            raise ValueError('string past end of record')
+        out.append(payload[pos:pos + n].decode('utf-8', errors='surrogatepass'))
+        pos += n
+    return Record(index, out[0], col, out[1], out[2])
+
+
+def read_journal(path) -> Tuple[Optional[Tuple[int, int]], List[Record], int]:
+    """(base fingerprint, records, offset after the last valid record); (None, [], 0) if missing/foreign."""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None, [], 0
+    if len(data) < _HEADER.size:
+        return None, [], 0
+    magic, size, mtime = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        return None, [], 0
+    records = []
+    pos = _HEADER.size
+    while pos + _RECORD.size <= len(data):
+        n, crc = _RECORD.unpack_from(data, pos)
+        start = pos + _RECORD.size
+        payload = data[start:start + n]
+        if len(payload) != n or zlib.crc32(payload) & 0xFFFFFFFF != crc:
+            break
+        try:
+            records.append(_decode_payload(payload))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            break
+        pos = start + n
+    return (size, mtime), records, pos
+
+
+class Journal:
+    """Edit journal of one data file; opened lazily on the first append."""
+
+    def __init__(self, data_path, path=None, fsync: bool = False):
+        self.data_path = str(data_path)
+        self.path = str(path) if path else journal_path_for(data_path)
+        self.fsync = fsync
+        self.count = 0              # records in the file
+        self.on_append: Optional[Callable[[int], None]] = None
+        self._fh = None
+
+    # --- reading / recovery ---------------------------------------------
+    def records(self) -> List[Record]:
+        return read_journal(self.path)[1]
+
+    def base_changed(self) -> bool:
+        """True if the data file changed since the journal was started (replay may conflict)."""
+        base = read_journal(self.path)[0]
+        return base is not None and tuple(base) != _fingerprint(self.data_path)
+
+    # --- writing ----------------------------------------------------------
+    def _open(self):
+        if self._fh is not None:
+            return self._fh
+        base, records, valid = read_journal(self.path)
+        if base is None:
+            fh = open(self.path, 'wb')
+            fh.write(_HEADER.pack(MAGIC, *_fingerprint(self.data_path)))
+            self.count = 0
+        else:
+            fh = open(self.path, 'r+b')
+            # drop a torn tail so new records follow the last valid one
+            fh.truncate(valid)
+            fh.seek(valid)
+            self.count = len(records)
+        self._fh = fh
+        return fh
+
+    def append(self, index: int, row_id: str, col: int, old: str, new: str) -> None:
+        self.extend([Record(index, row_id, col, old, new)])
+
+    def append_row(self, index: int, before: Sequence[str], after: Sequence[str]) -> int:
+        """Append one record per field that differs between two versions of a row. Returns the count."""
+        row_id = before[0] if before else (after[0] if after else '')
+        recs = []
+        for col in range(max(len(before), len(after))):
+            old = before[col] if col < len(before) else ''
+            new = after[col] if col < len(after) else ''
+            if old != new:
+                recs.append(Record(index, row_id, col, old, new))
+        self.extend(recs)
+        return len(recs)
+
+    def extend(self, records: Sequence[Record]) -> None:
+        if not records:
+            return
+        with instrument.span('journal.append', cat='io', records=len(records)):
+            fh = self._open()
+            fh.write(b''.join(encode_record(r) for r in records))
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+            self.count += len(records)
+        if self.on_append is not None:
+            self.on_append(self.count)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+
+    def discard(self) -> None:
+        """Close and delete the journal file."""
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self.count = 0
+
+    def compact(self, keep_indices) -> int:
+        """After a save: keep only the records of rows still unsaved, rebased on the new data file.
+
+        Deletes the file when nothing is left. Returns the number of records kept.
+        """
+        keep_indices = set(keep_indices)
+        records = [r for r in self.records() if r.index in keep_indices] if keep_indices else []
+        self.close()
+        if not records:
+            self.discard()
+            return 0
+        with instrument.span('journal.compact', cat='io', records=len(records)):
+            parent = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    fh.write(_HEADER.pack(MAGIC, *_fingerprint(self.data_path)))
+                    fh.write(b''.join(encode_record(r) for r in records))
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        self.count = len(records)
+        return self.count
+
+
+def replay(records: Sequence[Record], document) -> Tuple[int, int]:
+    """Apply journal records to a RowDocument (marking rows dirty). Returns (applied, conflicts).
+
+    A record finds its row by index when the Id still matches, else by Id; a
+    conflict is a field whose current value is neither the journaled old nor
+    new value (the file changed under the journal) - the journaled value wins.
+    Records whose row no longer exists are skipped.
+    """
+    rows = document.rows
+    by_id = None
+    applied = conflicts = 0
+    saved, document.journal = getattr(document, 'journal', None), None
+    try:
+        for rec in records:
+            i = rec.index
+            if not (0 <= i < len(rows) and rows[i] and rows[i][0] == rec.id):
+                if by_id is None:
+                    by_id = {}
+                    for k, r in enumerate(rows):
+                        if r:
+                            by_id.setdefault(r[0], k)
+                i = by_id.get(rec.id, -1)
+                if i < 0:
+                    continue
+            row = rows[i]
+            current = row[rec.col] if rec.col < len(row) else ''
+            if current not in (rec.old, rec.new):
+                conflicts += 1
+            document.set_cell(i, rec.col, rec.new)
+            if rec.col == 0 and by_id is not None:
+                by_id.setdefault(rec.new, i)
+            applied += 1
+    finally:
+        document.journal = saved
+    return applied, conflicts
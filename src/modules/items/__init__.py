@@ -11,6 +11,24 @@ Public symbols:
 from .model import Item
 from .reader import read_items, read_items_pair
 from .writer import write_items_pair
-from .panel import panel_widget
 
-__all__ = ["Item", "read_items", "read_items_pair", "write_items_pair", "panel_widget"]
+__all__ = ["Item", "read_items", "read_items_pair", "write_items_pair", "panel_widget", "register"]
+
+
+def register():
+    """Module metadata for the registry (modules/registry.py)."""
+    return {
+        "name": "Items",
+        "patterns": ["C_Item*.ini", "S_Item*.ini", "T_Item*.ini", "C_Item*.txt", "S_Item*.txt"],
+        "capabilities": ["panel", "read", "write", "translate", "icons", "query"],
+        "warmup": ["modules.items.panel"],
+    }
+
+
+def __getattr__(name):
+    # panel pulls in PySide6; load it only when the GUI asks for panel_widget
+    # so read/write helpers (and the CLI) stay Qt-free.
+    if name == "panel_widget":
+        from .panel import panel_widget
+        return panel_widget
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
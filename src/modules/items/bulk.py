@@ -0,0 +1,230 @@
+"""Bulk edits of an item table: `set <column> = <expr> [, ...] [where <cond>]`.
+
+    set SysPrice = SysPrice * 1.15 where ItemType in (7, 8) and ItemQuality >= 5
+    set OpFlags |= NoTrade where ItemGroup == 12
+    set Name = 'test', SysPrice = 0 where Id == 1005
+
+The right-hand sides and the `where` condition use the query language of
+query.py and are evaluated on whole NumPy columns, against the table as it
+was before the edit (all assignments see the same input, like SQL UPDATE).
+Augmented operators (+=, -=, *=, /=, //=, %=, |=, &=, ^=, <<=, >>=) work on
+the target column.
+
+`plan()` computes every changed cell without touching the rows: for each
+assignment the row indices, old and new strings. The plan is the preview,
+`apply()` writes it (through RowDocument.set_cells when a document is given,
+so rows are marked dirty and the whole edit is journaled in one append, after
+every cell is written) and `plan.inverse()` is the undo.
+
+Values are written back in the format of the column: integer columns stay
+integers (results are rounded), a cell is only changed when its value
+actually differs (an empty cell read as 0 that stays 0 is left empty).
+A numeric column only takes numeric results (`set SysPrice = Name` is an error).
+"""
+import ast
+from dataclasses import dataclass, field
+import io
+import tokenize
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .query import QueryError, compute, evaluate
+from .table import ItemTable
+
+
+@dataclass
+class Assignment:
+    column: str
+    expr: ast.Expression        # value expression (augmented forms already expanded)
+    text: str
+
+
+@dataclass
+class BulkEdit:
+    statement: str
+    assignments: List[Assignment]
+    where: Optional[str] = None
+
+
+@dataclass
+class ColumnChange:
+    """Changed cells of one column: rows[k] goes from old[k] to new[k]."""
+    column: str
+    col: int
+    rows: np.ndarray
+    old: List[str]
+    new: List[str]
+
+
+@dataclass
+class BulkPlan:
+    edit: BulkEdit
+    matched: int = 0
+    changes: List[ColumnChange] = field(default_factory=list)
+
+    @property
+    def cells(self) -> int:
+        return sum(len(c.rows) for c in self.changes)
+
+    def rows(self) -> List[int]:
+        """Sorted indices of the rows with at least one changed cell."""
+        if not self.changes:
+            return []
+        return np.unique(np.concatenate([c.rows for c in self.changes])).tolist()
+
+    def preview(self, limit: int = 0) -> Iterator[Tuple[int, str, str, str]]:
+        """(row, column, old, new) per changed cell, in row order."""
+        cells = sorted((int(r), k, j) for k, c in enumerate(self.changes) for j, r in enumerate(c.rows))
+        for n, (r, k, j) in enumerate(cells):
+            if limit and n >= limit:
+                return
+            c = self.changes[k]
+            yield r, c.column, c.old[j], c.new[j]
+
+    def inverse(self) -> 'BulkPlan':
+        """The plan that undoes this one."""
+        return BulkPlan(self.edit, self.matched,
+                        [ColumnChange(c.column, c.col, c.rows, c.new, c.old) for c in self.changes])
+
+
+def _split_top_level(text: str, stop_word: str = 'where') -> Tuple[List[str], Optional[str]]:
+    """Split 'a = 1, b = f(x, y) where c' into (['a = 1', 'b = f(x, y)'], 'c')."""
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError) as exc:
+        raise QueryError(f'invalid statement: {exc}')
+    parts, where = [], None
+    depth, start = 0, 0
+    for tok in tokens:
+        pos = tok.start[1]
+        if tok.type == tokenize.OP and tok.string in '([{':
+            depth += 1
+        elif tok.type == tokenize.OP and tok.string in ')]}':
+            depth -= 1
+        elif depth == 0 and tok.type == tokenize.OP and tok.string == ',':
+            parts.append(text[start:pos])
+            start = tok.end[1]
+        elif depth == 0 and tok.type == tokenize.NAME and tok.string.lower() == stop_word:
+            where = text[tok.end[1]:].strip()
+            text = text[:pos]
+            break
+    parts.append(text[start:])
+    return [p.strip() for p in parts], where
+
+
+def parse_statement(statement: str) -> BulkEdit:
+    """Parse 'set COL = EXPR [, COL op= EXPR ...] [where COND]'. Raises QueryError."""
+    text = ' '.join(statement.strip().splitlines())
+    head, _, rest = text.partition(' ')
+    if head.lower() != 'set' or not rest.strip():
+        raise QueryError("a bulk edit reads 'set <column> = <expr> [where <condition>]'")
+    parts, where = _split_top_level(rest)
+    if where is not None and not where:
+        raise QueryError('empty where condition')
+    assignments = []
+    for part in parts:
+        try:
+            node = ast.parse(part, mode='exec').body
+        except SyntaxError as exc:
+            raise QueryError(f'invalid assignment {part!r}: {exc.msg}')
+        if len(node) != 1:
+            raise QueryError(f'invalid assignment {part!r}')
+        node = node[0]
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            column, value = node.targets[0].id, node.value
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            column = node.target.id
+            value = ast.BinOp(left=ast.Name(id=column, ctx=ast.Load()), op=node.op, right=node.value)
+        else:
+            raise QueryError(f'invalid assignment {part!r} (expected <column> = <expr>)')
+        if any(a.column == column for a in assignments):
+            raise QueryError(f'{column} is assigned twice')
+        assignments.append(Assignment(column, ast.fix_missing_locations(ast.Expression(body=value)), part))
+    return BulkEdit(statement.strip(), assignments, where)
+
+
+def _float_text(v: float) -> str:
+    text = f'{v:.6f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _format(values: np.ndarray, target: np.ndarray) -> List[str]:
+    """New cell strings for `values`, in the format of the `target` column."""
+    if values.dtype.kind in 'biu' or (target.dtype.kind in 'iu' and values.dtype.kind == 'f'):
+        return [str(v) for v in values.astype(np.int64).tolist()]
+    if values.dtype.kind == 'f':
+        return [_float_text(v) for v in values.tolist()]
+    return [str(v) for v in values.tolist()]
+
+
+def plan(table: ItemTable, edit) -> BulkPlan:
+    """Changed cells of a bulk edit (a BulkEdit or its text) over `table`, without applying it."""
+    if isinstance(edit, str):
+        edit = parse_statement(edit)
+    for a in edit.assignments:
+        if a.column not in table:
+            raise QueryError(f'unknown column: {a.column}')
+        if a.column == table.header[0]:
+            raise QueryError(f'{a.column} is the record key and cannot be bulk edited')
+    mask = evaluate(table, edit.where) if edit.where else np.ones(len(table), dtype=bool)
+    result = BulkPlan(edit, int(mask.sum()))
+    if not result.matched:
+        return result
+    # every right-hand side sees the table before the edit
+    computed = [(a, compute(table, a.expr)) for a in edit.assignments]
+    idx_all = np.flatnonzero(mask)
+    for a, values in computed:
+        target = table.column(a.column)
+        if len(values) != len(table):
+            raise QueryError(f'{a.text}: expected one value per row')
+        idx, new_values = idx_all, values[idx_all]
+        if target.dtype != object and new_values.dtype.kind not in 'biuf':
+            raise QueryError(f'{a.text}: {a.column} is numeric and the result is not a number')
+        if new_values.dtype.kind == 'f':
+            if not np.isfinite(new_values).all():
+                raise QueryError(f'{a.text}: result is not a finite number for some rows')
+            if target.dtype.kind in 'iu':
+                new_values = np.rint(new_values)
+        if target.dtype != object:
+            # numeric column: compare values (an empty cell reads as 0)
+            differ = target[idx] != new_values
+            idx, new_values = idx[differ], new_values[differ]
+            new = _format(new_values, target)
+        else:
+            new = _format(new_values, target)
+            raw = table.raw(a.column)
+            keep = [k for k, i in enumerate(idx.tolist()) if raw[i] != new[k]]
+            idx = idx[keep]
+            new = [new[k] for k in keep]
+        if not len(idx):
+            continue
+        col = table.index_of(a.column)
+        rows = table.rows
+        result.changes.append(ColumnChange(a.column, col, idx, [rows[i][col] for i in idx.tolist()], new))
+    return result
+
+
+def apply(bulk_plan: BulkPlan, rows: List[List[str]], document=None) -> Tuple[int, int]:
+    """Write a plan into rows (through document.set_cells when given).
+
+    A cell that no longer holds the plan's old value (edited since the
+    preview, or since the edit for an undo) is skipped. Returns (written, skipped).
+    """
+    cells = []
+    skipped = 0
+    for c in bulk_plan.changes:
+        col = c.col
+        for i, old, new in zip(c.rows.tolist(), c.old, c.new):
+            row = rows[i]
+            if (row[col] if col < len(row) else '') != old:
+                skipped += 1
+                continue
+            cells.append((i, col, new))
+    if document is not None:
+        # one batch: journaled in a single append once every cell is written
+        document.set_cells(cells)
+    else:
+        for i, col, new in cells:
+            rows[i][col] = new
+    return len(cells), skipped
@@ -0,0 +1,216 @@
+"""Bulk edit dialog: `set COL = EXPR [where COND]` over the loaded item rows.
+
+Preview computes the plan (bulk.plan, vectorized) in a worker thread and
+lists every changed cell; Apply writes that plan through the MainWindow's
+RowDocument (rows marked dirty and journaled, saved with the usual Save);
+Undo reverts the last applied edit. Cells edited after the preview / after
+the edit are left alone (and counted as skipped).
+"""
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QThread, Signal
+from PySide6.QtWidgets import (
+    QDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QMessageBox, QPushButton, QTableView, QVBoxLayout
+)
+
+import instrument
+from . import bulk as item_bulk
+from .table import ItemTable
+
+EXAMPLES = ('set SysPrice = SysPrice * 1.15 where ItemType in (7, 8) and ItemQuality >= 5',
+            'set OpFlags |= NoTrade where ItemGroup == 12')
+
+
+class PlanWorker(QThread):
+    """Compute a bulk edit plan off the GUI thread. Emits result(BulkPlan, seconds) or error(str)."""
+    result = Signal(object, float)
+    error = Signal(str)
+
+    def __init__(self, rows, header, statement: str):
+        super().__init__()
+        self.rows = rows
+        self.header = header
+        self.statement = statement
+
+    def run(self):
+        try:
+            import time
+            t0 = time.perf_counter()
+            with instrument.span('BulkEdit.plan', cat='edit', rows=len(self.rows)):
+                plan = item_bulk.plan(ItemTable(self.header, self.rows), self.statement)
+            self.result.emit(plan, time.perf_counter() - t0)
+        except item_bulk.QueryError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            self.error.emit(f'{type(e).__name__}: {e}')
+
+
+class ChangesTableModel(QAbstractTableModel):
+    """Changed cells of a plan: Id, Name, column, old, new."""
+    HEADER = ('Id', 'Name', 'Coluna', 'Antes', 'Depois')
+
+    def __init__(self, rows, header, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.col_name = header.index('Name') if 'Name' in header else 9
+        self.cells: List = []
+
+    def set_plan(self, plan) -> None:
+        self.beginResetModel()
+        self.cells = list(plan.preview()) if plan is not None else []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cells)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADER)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADER[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        r, col, old, new = self.cells[index.row()]
+        c = index.column()
+        if c == 0:
+            return self.rows[r][0]
+        if c == 1:
+            row = self.rows[r]
+            return row[self.col_name] if self.col_name < len(row) else ''
+        return (col, old, new)[c - 2]
+
+
+class BulkEditDialog(QDialog):
+    """Non-modal; on_applied(row indices) lets the editor redraw the changed rows."""
+
+    def __init__(self, parent, rows, header, document=None, on_applied: Optional[Callable[[List[int]], None]] = None):
+        super().__init__(parent)
+        self.setWindowTitle('Edicao em massa')
+        self.setMinimumSize(900, 550)
+        self.rows = rows
+        self.header = list(header)
+        self.document = document if document is not None and document.rows is rows else None
+        self.on_applied = on_applied
+        self.worker = None
+        self.plan = None        # previewed, not applied yet
+        self.undo_plan = None   # inverse of the last applied edit
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.statement = QLineEdit()
+        self.statement.setPlaceholderText(EXAMPLES[0])
+        self.statement.setToolTip('\n'.join(EXAMPLES))
+        self.btn_preview = QPushButton('Preview')
+        top.addWidget(self.statement, 1)
+        top.addWidget(self.btn_preview)
+        layout.addLayout(top)
+
+        self.summary = QLabel('')
+        layout.addWidget(self.summary)
+        self.model = ChangesTableModel(rows, self.header, self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.verticalHeader().setVisible(False)
+        self.view.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.view.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+        layout.addWidget(self.view, 1)
+
+        buttons = QHBoxLayout()
+        self.btn_apply = QPushButton('Aplicar')
+        self.btn_undo = QPushButton('Desfazer')
+        self.btn_apply.setEnabled(False)
+        self.btn_undo.setEnabled(False)
+        buttons.addStretch()
+        buttons.addWidget(self.btn_apply)
+        buttons.addWidget(self.btn_undo)
+        layout.addLayout(buttons)
+
+        self.btn_preview.clicked.connect(self.preview)
+        self.statement.returnPressed.connect(self.preview)
+        self.statement.textEdited.connect(lambda _t: self._set_plan(None))
+        self.btn_apply.clicked.connect(self.apply)
+        self.btn_undo.clicked.connect(self.undo)
+
+    def _set_plan(self, plan, text: str = ''):
+        self.plan = plan
+        self.model.set_plan(plan)
+        self.btn_apply.setEnabled(plan is not None and plan.cells > 0)
+        self.summary.setText(text)
+
+    def preview(self):
+        text = self.statement.text().strip()
+        if self.worker is not None or not text:
+            return
+        self.btn_preview.setEnabled(False)
+        self._set_plan(None, 'Calculando...')
+        worker = PlanWorker(self.rows, self.header, text)
+        worker.result.connect(self._on_plan)
+        worker.error.connect(self._on_error)
+        self.worker = worker
+        worker.start()
+
+    def _on_plan(self, plan, seconds: float):
+        self.worker = None
+        self.btn_preview.setEnabled(True)
+        self._set_plan(plan, f'{plan.matched} registro(s) atendem a condicao, {plan.cells} campo(s) mudam '
+                             f'em {len(plan.rows())} registro(s)  -  {seconds:.2f}s')
+
+    def _on_error(self, msg: str):
+        self.worker = None
+        self.btn_preview.setEnabled(True)
+        self._set_plan(None, f'Erro: {msg}')
+
+    def _write(self, plan) -> tuple:
+        # autosave (journal on_append) only once the edit is applied and the views redrawn
+        jr = getattr(self.document, 'journal', None)
+        hook = jr.on_append if jr is not None else None
+        if jr is not None:
+            jr.on_append = None
+        try:
+            written, skipped = item_bulk.apply(plan, self.rows, self.document)
+            if self.on_applied is not None:
+                try:
+                    self.on_applied(plan.rows())
+                except Exception:
+                    pass
+        finally:
+            if jr is not None:
+                jr.on_append = hook
+        if hook is not None and written:
+            hook(jr.count)
+        return written, skipped
+
+    def apply(self):
+        plan = self.plan
+        if plan is None or not plan.cells:
+            return
+        written, skipped = self._write(plan)
+        self.undo_plan = plan.inverse()
+        self.btn_undo.setEnabled(True)
+        self._set_plan(None, f'{written} campo(s) alterado(s)' +
+                       (f', {skipped} ignorado(s) (editados depois do preview)' if skipped else '') +
+                       '  -  use Save para gravar')
+
+    def undo(self):
+        plan = self.undo_plan
+        if plan is None:
+            return
+        if QMessageBox.question(self, 'Desfazer', f'Desfazer a ultima edicao em massa ({plan.cells} campo(s))?') \
+                != QMessageBox.Yes:
+            return
+        written, skipped = self._write(plan)
+        self.undo_plan = None
+        self.btn_undo.setEnabled(False)
+        self._set_plan(None, f'{written} campo(s) restaurado(s)' +
+                       (f', {skipped} mantido(s) (editados depois da edicao em massa)' if skipped else ''))
+
+
+def show_bulk_dialog(parent, rows, header, on_applied=None) -> BulkEditDialog:
+    """Open the bulk edit dialog for rows loaded in the MainWindow `parent` (non-modal)."""
+    dlg = BulkEditDialog(parent, rows, header, document=getattr(parent, 'document', None), on_applied=on_applied)
+    dlg.show()
+    return dlg
@@ -0,0 +1,132 @@
+"""Vectorized index over the 128-bit RestrictClass column.
+
+RestrictClass is a hex mask over server class IDs (bit N = class with
+CLASS_IDS value N, see `flags.class_names_to_mask`). `ClassIndex` parses
+the column once (each distinct cell only once) into two uint64 NumPy
+columns, `lo` (bits 0-63) and `hi` (bits 64-127), so per-class queries and
+count reports over a whole table are a handful of array operations.
+
+A mask of 0 means "no class restriction"; `usable_by` includes those rows
+unless asked not to.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import flags as item_flags
+
+_LO_BITS = (1 << 64) - 1
+
+ClassRef = Union[str, int]
+
+
+def class_bit(cls: ClassRef) -> int:
+    """Bit position (server class ID) for a class name or ID."""
+    if isinstance(cls, str):
+        cid = item_flags.CLASS_IDS.get(cls)
+        if cid is None:
+            try:
+                cid = int(cls)
+            except ValueError:
+                raise KeyError(f'unknown class: {cls}')
+    else:
+        cid = int(cls)
+    if not 0 <= cid < 128:
+        raise KeyError(f'class id out of range: {cid}')
+    return cid
+
+
+def split_mask(mask: int) -> Tuple[np.uint64, np.uint64]:
+    """Split a 128-bit mask into (lo, hi) uint64 words."""
+    return np.uint64(mask & _LO_BITS), np.uint64((mask >> 64) & _LO_BITS)
+
+
+def _bit_counts(words: np.ndarray) -> np.ndarray:
+    """Per-bit set counts (length 64) over a uint64 column."""
+    if not len(words):
+        return np.zeros(64, dtype=np.int64)
+    as_bytes = words.astype('<u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder='little').sum(axis=0, dtype=np.int64)
+
+
+class ClassIndex:
+    """RestrictClass masks of a table as lo/hi uint64 columns."""
+
+    def __init__(self, values: Iterable):
+        values = ['' if v is None else str(v) for v in values]
+        uniq, inverse = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+        lo_u = np.empty(len(uniq), dtype=np.uint64)
+        hi_u = np.empty(len(uniq), dtype=np.uint64)
+        for i, text in enumerate(uniq.tolist()):
+            lo_u[i], hi_u[i] = split_mask(item_flags.parse_restrict_class(text))
+        self.lo = lo_u[inverse] if len(values) else np.zeros(0, dtype=np.uint64)
+        self.hi = hi_u[inverse] if len(values) else np.zeros(0, dtype=np.uint64)
+        self.size = len(values)
+
+    @classmethod
+    def from_rows(cls, rows, header: Optional[Sequence[str]] = None) -> 'ClassIndex':
+        try:
+            col = list(header).index('RestrictClass')
+        except (TypeError, ValueError):
+            col = 23
+        return cls(r[col] if col < len(r) else '' for r in rows)
+
+    def mask(self, row: int) -> int:
+        """The full 128-bit mask of one row."""
+        return (int(self.hi[row]) << 64) | int(self.lo[row])
+
+    def unrestricted(self) -> np.ndarray:
+        """Rows with no class restriction (mask 0)."""
+        return (self.lo == 0) & (self.hi == 0)
+
+    def has_class(self, cls: ClassRef) -> np.ndarray:
+        """Rows whose mask has the class bit set."""
+        bit = class_bit(cls)
+        words, bit = (self.lo, bit) if bit < 64 else (self.hi, bit - 64)
+        return (words >> np.uint64(bit)) & np.uint64(1) == 1
+
+    def usable_by(self, cls: ClassRef, include_unrestricted: bool = True) -> np.ndarray:
+        """Rows a class may use: its bit is set, or (by default) the item has no restriction."""
+        m = self.has_class(cls)
+        if include_unrestricted:
+            m |= self.unrestricted()
+        return m
+
+    def exactly(self, classes: Iterable[ClassRef]) -> np.ndarray:
+        """Rows restricted to exactly this class set."""
+        mask = 0
+        for c in classes:
+            mask |= 1 << class_bit(c)
+        lo, hi = split_mask(mask)
+        return (self.lo == lo) & (self.hi == hi)
+
+    def any_of(self, classes: Iterable[ClassRef]) -> np.ndarray:
+        """Rows whose mask has at least one of the classes."""
+        mask = 0
+        for c in classes:
+            mask |= 1 << class_bit(c)
+        lo, hi = split_mask(mask)
+        return ((self.lo & lo) != 0) | ((self.hi & hi) != 0)
+
+    def class_count_per_row(self) -> np.ndarray:
+        """Number of classes allowed by each row's mask (0 for unrestricted)."""
+        lo = self.lo.astype('<u8').view(np.uint8).reshape(-1, 8)
+        hi = self.hi.astype('<u8').view(np.uint8).reshape(-1, 8)
+        return (np.unpackbits(lo, axis=1).sum(axis=1, dtype=np.int64)
+                + np.unpackbits(hi, axis=1).sum(axis=1, dtype=np.int64))
+
+    def bit_counts(self) -> np.ndarray:
+        """Rows with each of the 128 bits set."""
+        return np.concatenate([_bit_counts(self.lo), _bit_counts(self.hi)])
+
+    def counts(self) -> Dict[str, int]:
+        """Items explicitly restricted to (among others) each known class, by class name."""
+        bits = self.bit_counts()
+        return {item_flags.ID_TO_CLASS[b]: int(bits[b]) for b in sorted(item_flags.ID_TO_CLASS)}
+
+    def report(self) -> List[Tuple[int, str, int, int]]:
+        """Per-class rows (class id, name, explicit items, usable items incl. unrestricted)."""
+        bits = self.bit_counts()
+        free = int(np.count_nonzero(self.unrestricted()))
+        return [(b, item_flags.ID_TO_CLASS[b], int(bits[b]), int(bits[b]) + free)
+                for b in sorted(item_flags.ID_TO_CLASS)]
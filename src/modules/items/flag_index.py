@@ -0,0 +1,189 @@
+"""Bulk decoding and bitmap index for OpFlags / OpFlagsPlus columns.
+
+`decode_flags` decodes one value at a time, which is fine for the editor
+form but not for questions like "every NoTrade + BindOnEquip item" over a
+whole table. `FlagIndex` parses a column once into a NumPy array and keeps
+one packed bitset per flag over the row positions (n/8 bytes each), so
+combination queries and per-flag counts are a few vectorized AND/popcount
+operations instead of a Python loop per row.
+
+Flag semantics match `flags.decode_flags` / `decode_flags_plus`: a flag is
+set when all of its bits are set (so composite names such as 'Only' or
+'Replaceable' need every bit), and the skip lists are honoured.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from . import flags as item_flags
+
+# bits set per byte value, for popcounts over packed bitsets
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def int_column(values: Iterable, default: int = 0) -> np.ndarray:
+    """Parse a column of numeric strings into an int64 array.
+
+    Empty or non-numeric cells become `default`; negative values are kept
+    (callers that treat them as bit masks use `as_mask`).
+    """
+    values = list(values)
+    try:
+        # fast path: every cell is a clean integer literal
+        return np.array(values, dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        pass
+    out = np.full(len(values), default, dtype=np.int64)
+    for i, v in enumerate(values):
+        try:
+            out[i] = int(str(v).strip())
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return out
+
+
+def as_mask(values: np.ndarray) -> np.ndarray:
+    """View signed values as unsigned 64-bit masks (-1 becomes all bits set)."""
+    return np.asarray(values, dtype=np.int64).view(np.uint64)
+
+
+def popcount(packed: np.ndarray) -> int:
+    """Number of set bits in a packed (np.packbits) bitset."""
+    return int(_POPCOUNT[packed].sum(dtype=np.int64))
+
+
+class FlagIndex:
+    """Per-flag packed bitsets over one OpFlags or OpFlagsPlus column."""
+
+    def __init__(self, values, table: Optional[Sequence] = None):
+        """values: column cells (strings or ints); table: (name, value) pairs in decode order."""
+        if table is None:
+            table = item_flags.DECODE_FLAGS
+        self.table = list(table)
+        self.values = as_mask(int_column(values) if not isinstance(values, np.ndarray) else values)
+        self.size = len(self.values)
+        self._bitmaps: Dict[str, np.ndarray] = {}
+        for name, flag_value in self.table:
+            fv = np.uint64(flag_value)
+            self._bitmaps[name] = np.packbits((self.values & fv) == fv)
+
+    @classmethod
+    def from_rows(cls, rows, column: int, table: Optional[Sequence] = None) -> 'FlagIndex':
+        return cls([r[column] if column < len(r) else '' for r in rows], table)
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self.table]
+
+    def __contains__(self, name) -> bool:
+        return name in self._bitmaps
+
+    def bitmap(self, name: str) -> np.ndarray:
+        """Packed bitset of the rows with `name` set (raises KeyError for unknown flags)."""
+        return self._bitmaps[name]
+
+    def mask(self, name: str) -> np.ndarray:
+        """Boolean array over the rows with `name` set."""
+        return np.unpackbits(self._bitmaps[name], count=self.size).astype(bool)
+
+    def count(self, name: str) -> int:
+        return popcount(self._bitmaps[name])
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per flag, in decode order."""
+        return {name: self.count(name) for name, _ in self.table}
+
+    def select_bits(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+                    none_of: Iterable[str] = ()) -> np.ndarray:
+        """Packed bitset of rows having every `all_of`, at least one `any_of` and no `none_of` flag."""
+        nbytes = (self.size + 7) // 8
+        bits = np.full(nbytes, 0xFF, dtype=np.uint8)
+        for name in all_of:
+            bits &= self._bitmaps[name]
+        any_of = list(any_of)
+        if any_of:
+            acc = np.zeros(nbytes, dtype=np.uint8)
+            for name in any_of:
+                acc |= self._bitmaps[name]
+            bits &= acc
+        for name in none_of:
+            bits &= ~self._bitmaps[name]
+        if self.size % 8:
+            # clear the padding bits of the last byte
+            bits[-1] &= np.uint8((0xFF << (8 - self.size % 8)) & 0xFF)
+        return bits
+
+    def select(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+               none_of: Iterable[str] = ()) -> np.ndarray:
+        """Row positions matching the flag combination (see `select_bits`)."""
+        bits = self.select_bits(all_of, any_of, none_of)
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+    def decode(self, row: int) -> List[str]:
+        """Flag names for one row (same result as decode_flags on its value)."""
+        v = int(self.values[row])
+        return [name for name, fv in self.table if v & fv == fv]
+
+    def decode_all(self) -> List[List[str]]:
+        """Flag names for every row; each distinct value is decoded once."""
+        uniq, inverse = np.unique(self.values, return_inverse=True)
+        decoded = []
+        for v in uniq.tolist():
+            decoded.append([name for name, fv in self.table if v & fv == fv])
+        return [decoded[i] for i in inverse.tolist()]
+
+
+class ItemFlagIndex:
+    """OpFlags and OpFlagsPlus indexes of one item table, queried by flag name."""
+
+    def __init__(self, rows, header: Optional[Sequence[str]] = None):
+        col = self._column(header, 'OpFlags', 12)
+        col_plus = self._column(header, 'OpFlagsPlus', 13)
+        self.size = len(rows)
+        self.flags = FlagIndex.from_rows(rows, col, item_flags.DECODE_FLAGS)
+        self.flags_plus = FlagIndex.from_rows(rows, col_plus, item_flags.DECODE_FLAGS_PLUS)
+
+    @staticmethod
+    def _column(header, name, default):
+        try:
+            return list(header).index(name)
+        except (TypeError, ValueError):
+            return default
+
+    def _owner(self, name: str) -> FlagIndex:
+        if name in self.flags:
+            return self.flags
+        if name in self.flags_plus:
+            return self.flags_plus
+        raise KeyError(f'unknown flag: {name}')
+
+    def bitmap(self, name: str) -> np.ndarray:
+        return self._owner(name).bitmap(name)
+
+    def mask(self, name: str) -> np.ndarray:
+        return self._owner(name).mask(name)
+
+    def count(self, name: str) -> int:
+        return self._owner(name).count(name)
+
+    def counts(self) -> Dict[str, int]:
+        out = self.flags.counts()
+        out.update(self.flags_plus.counts())
+        return out
+
+    def select(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+               none_of: Iterable[str] = ()) -> np.ndarray:
+        """Row positions matching a combination of OpFlags and OpFlagsPlus names."""
+        nbytes = (self.size + 7) // 8
+        bits = np.full(nbytes, 0xFF, dtype=np.uint8)
+        for name in all_of:
+            bits &= self.bitmap(name)
+        any_of = list(any_of)
+        if any_of:
+            acc = np.zeros(nbytes, dtype=np.uint8)
+            for name in any_of:
+                acc |= self.bitmap(name)
+            bits &= acc
+        for name in none_of:
+            bits &= ~self.bitmap(name)
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
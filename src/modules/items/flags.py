@@ -313,22 +313,26 @@ def get_class_name(idv: int) -> str:
     return ID_TO_CLASS.get(idv)
 
 
+# Values never reported by decode_flags / decode_flags_plus:
+# 16 is shared by OnlyStartBit and NoEnhance (ambiguous), 21 is a bit
+# position (ReplaceableStartBit), not a mask; 384 and 6144 are sums of
+# two FlagsPlus bits (ISRideCombine, ISChairCombine).
+FLAGS_SKIP = (16, 21)
+FLAGS_PLUS_SKIP = (384, 6144)
+
+# (name, value) pairs in decode order, skip lists already applied
+DECODE_FLAGS = [(n, v) for n, v in FLAGS.items() if v not in FLAGS_SKIP]
+DECODE_FLAGS_PLUS = [(n, v) for n, v in FLAGS_PLUS.items() if v not in FLAGS_PLUS_SKIP]
+
+
 def decode_flags(value: int) -> list:
     """Decode integer flags into list of flag names."""
-    flags = []
-    for name, flag_value in FLAGS.items():
-        if value & flag_value == flag_value and flag_value not in [16, 21]:  # Skip duplicates
-            flags.append(name)
-    return flags
+    return [name for name, flag_value in DECODE_FLAGS if value & flag_value == flag_value]
 
 
 def decode_flags_plus(value: int) -> list:
     """Decode integer FlagPlus into list of flag names."""
-    flags = []
-    for name, flag_value in FLAGS_PLUS.items():
-        if value & flag_value == flag_value and flag_value not in [384, 6144]:  # Skip sum values
-            flags.append(name)
-    return flags
+    return [name for name, flag_value in DECODE_FLAGS_PLUS if value & flag_value == flag_value]
 
 
 def encode_flags(flag_names: list) -> int:
@@ -437,6 +441,41 @@ def class_names_to_hex(class_names) -> str:
     return ids_to_hex(ids)
 
 
+def parse_restrict_class(text) -> int:
+    """Parse a RestrictClass cell into its integer mask (server class IDs as bit positions).
+
+    The value is always hexadecimal; accepts '0xHEX', '0xHEX / DEC' (the
+    form written by the editor) or plain hex digits. Invalid text gives 0.
+    """
+    t = str(text).strip() if text is not None else ''
+    if not t:
+        return 0
+    if '/' in t:
+        parts = [p.strip() for p in t.split('/')]
+        hex_part = next((p for p in parts if p.lower().startswith('0x')), parts[0])
+        try:
+            return int(hex_part, 16)
+        except ValueError:
+            # fallback: parse the entire string as hex (without 0x)
+            try:
+                return int(t.replace('/', '').replace(' ', ''), 16)
+            except ValueError:
+                return 0
+    try:
+        return int(t, 16)
+    except ValueError:
+        return 0
+
+
+# server class IDs in bit order, for decoding RestrictClass masks
+_CLASS_BITS = sorted(ID_TO_CLASS)
+
+
+def mask_to_class_names(mask: int) -> list:
+    """Class names (ordered by server ID) whose bit is set in a RestrictClass mask."""
+    return [ID_TO_CLASS[b] for b in _CLASS_BITS if (mask >> b) & 1]
+
+
 def class_names_to_mask(class_names) -> int:
     """Return integer mask using server-class-ID positions for given class names."""
     n = 0
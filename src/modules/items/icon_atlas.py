@@ -0,0 +1,272 @@
+"""Packed icon atlas: every item icon in one memory-mapped RGBA file.
+
+Opening tens of thousands of small thumbnail PNGs is dominated by
+filesystem overhead, so `build_atlas` packs the decoded icons (scaled down
+to fit `cell` x `cell`) into fixed-size pages of raw RGBA8888 pixels:
+
+    <name>.atlas       pages back to back, each page_width * page_height * 4 bytes
+                       (the last page is cut after its last used row)
+    <name>.atlas.json  {"version", "page_width", "page_height", "pages", "last_rows", "cell",
+                        "icon_dir", "entries": {file name: [page, x, y, w, h, mtime_ns, size, scaled]}}
+
+Icons are placed with a simple shelf packer in input order. `IconAtlas`
+maps the file read-only and hands out zero-copy views (offset + stride) that
+Qt can wrap in a QImage directly; entries whose source icon changed since
+the build (mtime/size) are reported as missing so callers fall back to the
+regular thumbnail cache.
+
+Qt-free so the CLI (and worker processes) can build it.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .icon_cache import decode_icon, scale_rgba
+
+ATLAS_VERSION = 1
+ATLAS_CELL = 64
+PAGE_SIZE = 2048
+
+
+class AtlasError(ValueError):
+    """Raised for a missing, truncated or incompatible atlas."""
+
+
+def atlas_path_for(cache_root, icon_dir) -> Path:
+    """Atlas file for an icon directory inside a cache root (one atlas per directory)."""
+    key = hashlib.sha1(os.path.normcase(str(Path(icon_dir).resolve())).encode('utf-8', errors='replace')).hexdigest()
+    return Path(cache_root) / 'atlas' / f'{key[:16]}.atlas'
+
+
+def decode_thumb(icon_path: str, cell: int = ATLAS_CELL) -> Tuple[str, int, int, Optional[bytes], bool, Optional[str]]:
+    """Decode one icon and scale it down to fit cell x cell.
+
+    Module-level so it can run in a ProcessPoolExecutor worker. Returns
+    (icon_path, w, h, rgba or None, scaled, error message or None).
+    """
+    try:
+        w, h, rgba = decode_icon(icon_path)
+        scaled = w > cell or h > cell
+        if scaled:
+            w, h, rgba = scale_rgba(w, h, rgba, cell)
+        return icon_path, w, h, rgba, scaled, None
+    except Exception as exc:
+        return icon_path, 0, 0, None, False, str(exc)
+
+
+def _atomic_write(target: Path, payload_writer: Callable) -> None:
+    fd, tmp = tempfile.mkstemp(prefix='.atlas_', suffix='.tmp', dir=str(target.parent))
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            payload_writer(fh)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def build_atlas(icon_paths: Iterable, out_path, cell: int = ATLAS_CELL, page_size: int = PAGE_SIZE,
+                icon_dir=None, mapper: Callable = map,
+                progress: Optional[Callable[[int, str, Optional[str]], None]] = None) -> dict:
+    """Decode icon_paths and pack them into an atlas at out_path. Returns build stats.
+
+    `mapper(fn, paths, cells)` may be a process pool's map for parallel
+    decoding; results are consumed in order and written one page at a time,
+    so memory stays at one page regardless of the icon count.
+    """
+    cell = int(cell)
+    page_size = max(int(page_size), cell)
+    paths = [str(p) for p in icon_paths]
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    entries: Dict[str, list] = {}
+    failed = []
+    page = np.zeros((page_size, page_size, 4), dtype=np.uint8)
+    pages = 0
+    last_rows = 0
+    x = y = shelf_h = 0
+
+    def write_atlas(fh):
+        nonlocal pages, last_rows, x, y, shelf_h
+        count = 0
+        for path, w, h, rgba, scaled, err in mapper(decode_thumb, paths, [cell] * len(paths)):
+            count += 1
+            if rgba is None:
+                failed.append((path, err))
+                if progress is not None:
+                    progress(count, path, err)
+                continue
+            if x + w > page_size:
+                # next shelf
+                x, y, shelf_h = 0, y + shelf_h, 0
+            if y + h > page_size:
+                fh.write(page.tobytes())
+                pages += 1
+                page[:] = 0
+                x = y = shelf_h = 0
+            page[y:y + h, x:x + w] = np.frombuffer(rgba, dtype=np.uint8).reshape(h, w, 4)
+            try:
+                st = os.stat(path)
+                stamp = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                stamp = [0, 0]
+            entries[os.path.basename(path).lower()] = [pages, x, y, w, h] + stamp + [int(scaled)]
+            x += w
+            shelf_h = max(shelf_h, h)
+            if progress is not None:
+                progress(count, path, None)
+        if x or y:
+            last_rows = y + shelf_h
+            fh.write(page[:last_rows].tobytes())
+            pages += 1
+        elif pages:
+            last_rows = page_size
+
+    _atomic_write(out_path, write_atlas)
+    meta = {
+        'version': ATLAS_VERSION,
+        'page_width': page_size,
+        'page_height': page_size,
+        'pages': pages,
+        'last_rows': last_rows,
+        'cell': cell,
+        'icon_dir': str(icon_dir) if icon_dir is not None else '',
+        'entries': entries,
+    }
+    index_path = Path(str(out_path) + '.json')
+    _atomic_write(index_path, lambda fh: fh.write(json.dumps(meta, separators=(',', ':')).encode('utf-8')))
+    size = (max(pages - 1, 0) * page_size + last_rows) * page_size * 4
+    return {'icons': len(entries), 'failed': failed, 'pages': pages, 'bytes': size, 'path': str(out_path)}
+
+
+class IconAtlas:
+    """Read-only, memory-mapped view of an atlas built by `build_atlas`."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        index_path = Path(str(self.path) + '.json')
+        try:
+            meta = json.loads(index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as exc:
+            raise AtlasError(f'cannot read atlas index {index_path}: {exc}')
+        if meta.get('version') != ATLAS_VERSION:
+            raise AtlasError(f'unsupported atlas version {meta.get("version")}')
+        self.page_width = int(meta['page_width'])
+        self.page_height = int(meta['page_height'])
+        self.cell = int(meta.get('cell', ATLAS_CELL))
+        self.entries: Dict[str, list] = meta.get('entries', {})
+        self.page_bytes = self.page_width * self.page_height * 4
+        self._by_stem = {}
+        for name in self.entries:
+            self._by_stem.setdefault(os.path.splitext(name)[0], name)
+        self._checked: Dict[str, bool] = {}
+
+        pages = int(meta.get('pages', 0))
+        expected = (max(pages - 1, 0) * self.page_height + int(meta.get('last_rows', 0))) * self.page_width * 4
+        self._fh = open(self.path, 'rb')
+        try:
+            size = os.fstat(self._fh.fileno()).st_size
+            if size < expected:
+                raise AtlasError(f'atlas {self.path} is truncated ({size} < {expected} bytes)')
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except Exception:
+            self._fh.close()
+            raise
+        self._buf = memoryview(self._mm) if self._mm is not None else memoryview(b'')
+
+    def close(self) -> None:
+        try:
+            self._buf.release()
+            if self._mm is not None:
+                self._mm.close()
+        except (BufferError, ValueError):
+            # QImage views still reference the mapping; the OS unmaps at exit
+            pass
+        self._fh.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name) -> bool:
+        return self.key_for(name) is not None
+
+    def key_for(self, name) -> Optional[str]:
+        """Entry key for an icon file name or IconFilename value (case-insensitive, extension optional)."""
+        if not name:
+            return None
+        n = str(name).strip().replace('\\', '/').rsplit('/', 1)[-1].lower()
+        if n in self.entries:
+            return n
+        stem, ext = os.path.splitext(n)
+        return self._by_stem.get(stem if ext else n)
+
+    def is_current(self, key: str, icon_path) -> bool:
+        """True if the entry was built from the current version of icon_path (memoized stat)."""
+        ok = self._checked.get(key)
+        if ok is None:
+            try:
+                st = os.stat(icon_path)
+                e = self.entries[key]
+                ok = (e[5], e[6]) == (st.st_mtime_ns, st.st_size)
+            except (OSError, KeyError, IndexError):
+                ok = False
+            self._checked[key] = ok
+        return ok
+
+    def is_scaled(self, name) -> bool:
+        """True if the icon was shrunk to fit the cell (the atlas copy is not full resolution)."""
+        key = self.key_for(name)
+        try:
+            return bool(self.entries[key][7])
+        except (KeyError, IndexError):
+            return True
+
+    def forget_checks(self) -> None:
+        """Re-stat sources on the next lookup (after the icon directory changed)."""
+        self._checked.clear()
+
+    def view(self, name, icon_path=None) -> Optional[Tuple[memoryview, int, int, int]]:
+        """Return (buffer, width, height, bytes_per_line) for an icon, without copying.
+
+        buffer starts at the icon's first pixel inside the mapped page; rows
+        are bytes_per_line apart (the page width). With icon_path given, a
+        stale entry returns None.
+        """
+        key = self.key_for(name)
+        if key is None:
+            return None
+        if icon_path is not None and not self.is_current(key, icon_path):
+            return None
+        page, x, y, w, h = self.entries[key][:5]
+        stride = self.page_width * 4
+        start = page * self.page_bytes + y * stride + x * 4
+        end = start + (h - 1) * stride + w * 4
+        return self._buf[start:end], w, h, stride
+
+    def rgba(self, name, icon_path=None) -> Optional[Tuple[int, int, bytes]]:
+        """Return (width, height, tightly packed RGBA bytes) for an icon (a copy)."""
+        v = self.view(name, icon_path)
+        if v is None:
+            return None
+        buf, w, h, stride = v
+        return w, h, b''.join(bytes(buf[r * stride:r * stride + w * 4]) for r in range(h))
+
+
+def open_atlas(path) -> Optional[IconAtlas]:
+    """Open an atlas if one exists and is valid, else None."""
+    try:
+        if not Path(path).exists():
+            return None
+        return IconAtlas(path)
+    except (AtlasError, OSError, ValueError):
+        return None
@@ -0,0 +1,277 @@
+"""Persistent on-disk cache of item icon thumbnails.
+
+Thumbnails are stored as PNG files pre-scaled to fit THUMB_SIZE x THUMB_SIZE
+(keeping aspect ratio), keyed by the source icon path plus its mtime and
+size, so a DDS icon is converted once per change instead of once per
+session. The cache directory has a size cap; when it is exceeded the least
+recently used thumbnails are evicted (recency is tracked through the
+thumbnail file mtime, which is refreshed on every hit).
+
+This module is Qt-free so the CLI (and worker processes) can fill the cache.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from . import dds as item_dds
+
+THUMB_SIZE = 200
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory (LOCALAPPDATA on Windows, XDG cache elsewhere)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = str(Path.home() / '.cache')
+    return Path(base) / 'GFEditor' / 'icon_cache'
+
+
+def scale_rgba(width: int, height: int, data: bytes, size: int = THUMB_SIZE) -> Tuple[int, int, bytes]:
+    """Bilinear resize of an RGBA8888 buffer to fit size x size, keeping aspect ratio.
+
+    Interpolation is done on premultiplied alpha so transparent edges do not
+    bleed dark fringes into the thumbnail.
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError('empty image')
+    ratio = min(size / width, size / height)
+    tw = max(1, int(round(width * ratio)))
+    th = max(1, int(round(height * ratio)))
+    src = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4).astype(np.float32)
+    if (tw, th) == (width, height):
+        return width, height, bytes(data)
+
+    alpha = src[:, :, 3:4] / 255.0
+    src[:, :, :3] *= alpha
+
+    # sample positions (pixel centres) in source coordinates
+    ys = np.clip((np.arange(th) + 0.5) * (height / th) - 0.5, 0, height - 1)
+    xs = np.clip((np.arange(tw) + 0.5) * (width / tw) - 0.5, 0, width - 1)
+    y0 = np.floor(ys).astype(np.intp)
+    x0 = np.floor(xs).astype(np.intp)
+    y1 = np.minimum(y0 + 1, height - 1)
+    x1 = np.minimum(x0 + 1, width - 1)
+    wy = (ys - y0)[:, None, None]
+    wx = (xs - x0)[None, :, None]
+
+    top = src[y0][:, x0] * (1 - wx) + src[y0][:, x1] * wx
+    bottom = src[y1][:, x0] * (1 - wx) + src[y1][:, x1] * wx
+    out = top * (1 - wy) + bottom * wy
+
+    a = out[:, :, 3:4]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[:, :, :3] = np.where(a > 0, out[:, :, :3] * 255.0 / a, 0)
+    out = np.clip(np.rint(out), 0, 255).astype(np.uint8)
+    return tw, th, out.tobytes()
+
+
+def encode_png(width: int, height: int, data: bytes, level: int = 6) -> bytes:
+    """Encode an RGBA8888 buffer as a PNG file (no filtering, zlib level `level`)."""
+    def chunk(tag: bytes, payload: bytes) -> bytes:
+        return struct.pack('>I', len(payload)) + tag + payload + struct.pack('>I', zlib.crc32(tag + payload) & 0xFFFFFFFF)
+
+    rows = np.frombuffer(data, dtype=np.uint8).reshape(height, width * 4)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rows
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), level)) + chunk(b'IEND', b''))
+
+
+def decode_icon(path) -> Tuple[int, int, bytes]:
+    """Decode an icon file to (width, height, rgba). DDS uses dds.py, other formats Pillow."""
+    if item_dds.is_dds(path):
+        return item_dds.load_dds(path)
+    from PIL import Image
+    with Image.open(str(path)) as im:
+        im = im.convert('RGBA')
+        return im.size[0], im.size[1], im.tobytes('raw', 'RGBA')
+
+
+class IconCache:
+    """Size-capped, LRU-evicting directory of PNG icon thumbnails.
+
+    Counters `hits`, `misses` and `evictions` are kept for the lifetime of
+    the instance; see `stats()`.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 thumb_size: int = THUMB_SIZE):
+        self.root = Path(root) if root else default_cache_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.thumb_size = int(thumb_size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    # ---- keys ----
+    def key_for(self, icon_path) -> Optional[str]:
+        """Cache key for a source icon (path + mtime + size + thumbnail size)."""
+        try:
+            p = Path(icon_path)
+            st = p.stat()
+        except OSError:
+            return None
+        raw = f'{os.path.normcase(str(p.resolve()))}|{st.st_mtime_ns}|{st.st_size}|{self.thumb_size}'
+        return hashlib.sha1(raw.encode('utf-8', errors='replace')).hexdigest()
+
+    def path_for_key(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.png'
+
+    # ---- lookup / store ----
+    def lookup(self, icon_path) -> Optional[Path]:
+        """Return the cached thumbnail for icon_path, or None on a miss."""
+        key = self.key_for(icon_path)
+        thumb = self.path_for_key(key) if key else None
+        if thumb is not None and thumb.exists():
+            try:
+                # refresh recency for LRU eviction
+                os.utime(thumb, None)
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            return thumb
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, icon_path, width: int, height: int, rgba: bytes, evict: bool = True) -> Optional[Path]:
+        """Scale an already decoded icon to a thumbnail and write it to the cache.
+
+        evict=False skips size accounting and eviction (batch workers leave
+        that to the parent process).
+        """
+        key = self.key_for(icon_path)
+        if key is None:
+            return None
+        tw, th, scaled = scale_rgba(width, height, rgba, self.thumb_size)
+        return self._write(key, encode_png(tw, th, scaled), evict=evict)
+
+    def contains(self, icon_path) -> bool:
+        """True if a thumbnail for the current version of icon_path exists (no counters)."""
+        key = self.key_for(icon_path)
+        return key is not None and self.path_for_key(key).exists()
+
+    def get_or_create(self, icon_path) -> Optional[Path]:
+        """Return a cached thumbnail, decoding and storing the icon on a miss."""
+        thumb = self.lookup(icon_path)
+        if thumb is not None:
+            return thumb
+        try:
+            w, h, rgba = decode_icon(icon_path)
+        except Exception:
+            return None
+        return self.store(icon_path, w, h, rgba)
+
+    def _write(self, key: str, payload: bytes, evict: bool = True) -> Optional[Path]:
+        target = self.path_for_key(key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix='.thumb_', suffix='.tmp', dir=str(target.parent))
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(payload)
+            os.replace(tmp, target)
+        except OSError:
+            return None
+        if not evict:
+            return target
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(payload)
+            over = self._current_bytes() > self.max_bytes
+        if over:
+            self.evict()
+        return target
+
+    # ---- eviction / stats ----
+    def _entries(self):
+        out = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith('.png'):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def _current_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def evict(self, target_bytes: Optional[int] = None, keep=None) -> int:
+        """Delete least recently used thumbnails until the cache fits target_bytes.
+
+        Defaults to 90% of max_bytes so eviction does not run on every store.
+        keep: cache keys that are never evicted (the cache may stay above
+        target_bytes). Returns the number of evicted files.
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        keep = set(keep or ())
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= target_bytes:
+                    break
+                if keep and os.path.basename(path)[:-4] in keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total_bytes = total
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        self.evict(0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'root': str(self.root),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'bytes': self._current_bytes(),
+                'max_bytes': self.max_bytes,
+            }
+
+
+def convert_icon(icon_path: str, root: str, thumb_size: int = THUMB_SIZE) -> Tuple[str, Optional[str]]:
+    """Decode one icon and write its thumbnail into the cache at root.
+
+    Module-level so it can run in a ProcessPoolExecutor worker. Returns
+    (icon_path, error message or None).
+    """
+    try:
+        cache = IconCache(root, thumb_size=thumb_size)
+        w, h, rgba = decode_icon(icon_path)
+        if cache.store(icon_path, w, h, rgba, evict=False) is None:
+            return icon_path, 'could not write thumbnail'
+        return icon_path, None
+    except Exception as exc:
+        return icon_path, str(exc)
@@ -0,0 +1,216 @@
+"""Virtualized icon grid browser for item tables (C_Item / C_ItemMall).
+
+Shows every row as a thumbnail with its Name and Id in a QListView in
+IconMode. The model is lazy: QListView only asks for the decoration of
+visible cells, icons are decoded on the shared IconLoader thread pool, and
+grid-sized pixmaps are kept in a bounded LRU (QSettings
+'icon_grid/memory_mb', default 64 MB), so browsing 100k items stays cheap.
+"""
+from collections import OrderedDict
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QSize, QSortFilterProxyModel, QTimer, Signal
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import (
+    QDialog, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QVBoxLayout
+)
+
+from . import icon_loader as item_icon_loader
+
+GRID_ICON_SIZE = 64
+
+
+class _Notifier(QObject):
+    """Carries 'icon decoded' events from loader worker threads to the GUI thread."""
+    loaded = Signal(str)
+
+
+class IconGridModel(QAbstractListModel):
+    """List model over item rows: DisplayRole is 'Name\\nId', DecorationRole the icon."""
+
+    # requests flushed to the loader per tick; older (scrolled past) requests are dropped
+    MAX_REQUESTS = 256
+
+    def __init__(self, rows, header, loader, icon_size=GRID_ICON_SIZE, memory_bytes=64 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.loader = loader
+        self.icon_size = icon_size
+        self.col_id = header.index('Id') if 'Id' in header else 0
+        self.col_name = header.index('Name') if 'Name' in header else 9
+        self.col_icon = header.index('IconFilename') if 'IconFilename' in header else 1
+        self.capacity = max(64, memory_bytes // (icon_size * icon_size * 4))
+        self._thumbs = OrderedDict()   # icon name -> grid-sized QPixmap
+        self._rows_by_icon = None      # icon name -> [row indices], built on first notification
+        self._requests = OrderedDict()
+        self._notifier = _Notifier()
+        self._notifier.loaded.connect(self._on_loaded)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(30)
+        self._timer.timeout.connect(self._flush_requests)
+
+    def _cell(self, row, col):
+        r = self.rows[row]
+        return r[col] if col < len(r) else ''
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return f"{self._cell(row, self.col_name)}\n{self._cell(row, self.col_id)}"
+        if role == Qt.ToolTipRole:
+            return f"{self._cell(row, self.col_id)} - {self._cell(row, self.col_name)}\n{self._cell(row, self.col_icon)}"
+        if role == Qt.DecorationRole:
+            return self._thumbnail(self._cell(row, self.col_icon))
+        if role == Qt.UserRole:
+            return row
+        return None
+
+    def _thumbnail(self, name):
+        if not name:
+            return None
+        pix = self._thumbs.get(name)
+        if pix is not None:
+            self._thumbs.move_to_end(name)
+            return pix
+        img = None
+        try:
+            # packed atlas first: a zero-copy view, no file open or decode
+            img = self.loader.atlas_image(name)
+        except Exception:
+            img = None
+        if img is None:
+            img = self.loader.peek(name)
+        if img is not None:
+            if img.width() > self.icon_size or img.height() > self.icon_size:
+                img = img.scaled(self.icon_size, self.icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pix = QPixmap.fromImage(img)
+            self._thumbs[name] = pix
+            while len(self._thumbs) > self.capacity:
+                self._thumbs.popitem(last=False)
+            return pix
+        # not decoded yet: queue it; the most recent requests are the visible cells
+        self._requests[name] = None
+        self._requests.move_to_end(name)
+        if not self._timer.isActive():
+            self._timer.start()
+        return None
+
+    def _flush_requests(self):
+        names = list(self._requests)[-self.MAX_REQUESTS:]
+        self._requests.clear()
+        self.loader.prefetch(reversed(names), on_done=self._notifier.loaded.emit)
+
+    def _on_loaded(self, name):
+        if self._rows_by_icon is None:
+            self._rows_by_icon = {}
+            for i, r in enumerate(self.rows):
+                icon = r[self.col_icon] if self.col_icon < len(r) else ''
+                if icon:
+                    self._rows_by_icon.setdefault(icon, []).append(i)
+        for i in self._rows_by_icon.get(name, ()):
+            idx = self.index(i)
+            self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+
+class _FilterProxy(QSortFilterProxyModel):
+    """Case-insensitive substring filter over the 'Name\\nId' text."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ''
+
+    def set_needle(self, text):
+        self._needle = str(text).strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        text = self.sourceModel().data(self.sourceModel().index(source_row), Qt.DisplayRole) or ''
+        return self._needle in text.lower()
+
+
+def show_icon_grid(parent, rows, header, state, on_select=None):
+    """Open a non-modal dialog with the icon grid; double click calls on_select(row_index)."""
+    settings = state.get('settings')
+    loader = state.get('icon_loader')
+    if loader is None:
+        lib_base = Path(getattr(state.get('parent'), 'lib_path', Path.cwd() / 'Assets'))
+        loader = item_icon_loader.get_icon_loader(lib_base / 'itemicon', settings)
+    memory_mb = 64
+    if settings is not None:
+        try:
+            memory_mb = int(settings.value('icon_grid/memory_mb', memory_mb))
+        except Exception:
+            pass
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle(f"Icon Grid - {state.get('source_base') or 'items'} ({len(rows)} items)")
+    dlg.resize(1000, 700)
+    layout = QVBoxLayout()
+
+    filter_row = QHBoxLayout()
+    filter_input = QLineEdit()
+    filter_input.setPlaceholderText('Filter by Name or ID...')
+    filter_row.addWidget(QLabel('Filter:'))
+    filter_row.addWidget(filter_input)
+    layout.addLayout(filter_row)
+
+    model = IconGridModel(rows, header, loader, memory_bytes=memory_mb * 1024 * 1024, parent=dlg)
+    proxy = _FilterProxy(dlg)
+    proxy.setSourceModel(model)
+
+    view = QListView()
+    view.setViewMode(QListView.IconMode)
+    view.setMovement(QListView.Static)
+    view.setResizeMode(QListView.Adjust)
+    view.setIconSize(QSize(GRID_ICON_SIZE, GRID_ICON_SIZE))
+    view.setGridSize(QSize(GRID_ICON_SIZE + 56, GRID_ICON_SIZE + 44))
+    view.setWordWrap(True)
+    # uniform sizes + batched layout keep 100k-item layouts fast
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched)
+    view.setBatchSize(2000)
+    view.setModel(proxy)
+    layout.addWidget(view)
+
+    status = QLabel('')
+    status.setObjectName('icon_grid_status')
+    btn_close = QPushButton('Close')
+    bottom = QHBoxLayout()
+    bottom.addWidget(status)
+    bottom.addStretch()
+    bottom.addWidget(btn_close)
+    layout.addLayout(bottom)
+    dlg.setLayout(layout)
+
+    # debounce filtering so typing over 100k rows stays responsive
+    filter_timer = QTimer(dlg)
+    filter_timer.setSingleShot(True)
+    filter_timer.setInterval(250)
+
+    def apply_filter():
+        proxy.set_needle(filter_input.text())
+        status.setText(f'{proxy.rowCount()} of {len(rows)} items')
+
+    filter_timer.timeout.connect(apply_filter)
+    filter_input.textChanged.connect(lambda _t: filter_timer.start())
+
+    def activate(index):
+        if on_select is None or not index.isValid():
+            return
+        row = proxy.data(index, Qt.UserRole)
+        if row is not None:
+            on_select(int(row))
+
+    view.doubleClicked.connect(activate)
+    btn_close.clicked.connect(dlg.close)
+    apply_filter()
+    dlg.show()
+    return dlg
@@ -0,0 +1,110 @@
+"""Case-insensitive index of the item icon directory (Assets/itemicon).
+
+Resolving an `IconFilename` used to probe the filesystem up to ten times
+(exact name, suffix case variants, seven extensions). The index lists the
+directory once and answers lookups with dict hits; it is rebuilt when the
+directory changes (see `refresh_if_changed`, or a QFileSystemWatcher in the
+GUI). It can also report every missing icon of a table in one call.
+
+Qt-free so the CLI can use it too.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# preferred order when several files share a stem (icon.dds and icon.png)
+ICON_EXTENSIONS = ('.dds', '.png', '.bmp', '.jpg', '.jpeg', '.gif')
+
+
+def _normalize(name: str) -> str:
+    return str(name).strip().replace('\\', '/').rsplit('/', 1)[-1].lower()
+
+
+class IconIndex:
+    """Map normalized icon names and stems to the actual files in a directory."""
+
+    def __init__(self, icon_dir):
+        self.icon_dir = Path(icon_dir)
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, Path] = {}
+        self._by_stem: Dict[str, Path] = {}
+        self._dir_mtime = None
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Rescan the directory. Returns the number of indexed files."""
+        by_name: Dict[str, Path] = {}
+        by_stem: Dict[str, Path] = {}
+        rank: Dict[str, int] = {}
+        mtime = None
+        try:
+            mtime = os.stat(self.icon_dir).st_mtime_ns
+            with os.scandir(self.icon_dir) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    name = entry.name
+                    lname = name.lower()
+                    path = Path(entry.path)
+                    by_name.setdefault(lname, path)
+                    stem, ext = os.path.splitext(lname)
+                    if ext not in ICON_EXTENSIONS:
+                        continue
+                    r = ICON_EXTENSIONS.index(ext)
+                    if stem not in by_stem or r < rank[stem]:
+                        by_stem[stem] = path
+                        rank[stem] = r
+        except OSError:
+            pass
+        with self._lock:
+            self._by_name = by_name
+            self._by_stem = by_stem
+            self._dir_mtime = mtime
+        return len(by_name)
+
+    def refresh_if_changed(self) -> bool:
+        """Rescan only if the directory mtime changed (one stat). Returns True if rescanned."""
+        try:
+            mtime = os.stat(self.icon_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._dir_mtime:
+            return False
+        self.refresh()
+        return True
+
+    def resolve(self, icon_name: str) -> Optional[Path]:
+        """Return the file for an IconFilename value, ignoring case and missing extensions."""
+        if not icon_name:
+            return None
+        n = _normalize(icon_name)
+        with self._lock:
+            hit = self._by_name.get(n)
+            if hit is not None:
+                return hit
+            stem, ext = os.path.splitext(n)
+            return self._by_stem.get(stem if ext else n)
+
+    def __contains__(self, icon_name) -> bool:
+        return self.resolve(icon_name) is not None
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def missing(self, icon_names: Iterable[str]) -> List[str]:
+        """Return the distinct non-empty names that do not resolve, in first-seen order."""
+        seen = set()
+        out = []
+        for name in icon_names:
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            if self.resolve(name) is None:
+                out.append(name)
+        return out
+
+    def files(self) -> List[Path]:
+        """Every indexed icon file with a known image extension."""
+        with self._lock:
+            return sorted(set(self._by_stem.values()))
@@ -0,0 +1,284 @@
+"""Qt-side icon loading for the item editor: in-memory LRU plus background prefetch.
+
+`IconLoader` resolves an `IconFilename` value to a file under
+Assets/itemicon through an IconIndex (one directory scan, refreshed by a
+QFileSystemWatcher), decodes it (through the persistent IconCache) and keeps the
+200x200 results in memory:
+
+- decoded QImages in a thread-safe LRU, filled by a small thread pool
+  (`prefetch`) so neighbouring items are ready before the user gets there;
+- QPixmaps in a GUI-thread LRU, so stepping back and forth never rescales.
+
+When a packed atlas (icon_atlas.py, built by `gfeditor icons-atlas`) exists
+for the directory, icons are read straight from the memory-mapped atlas
+instead of opening one thumbnail file per icon.
+
+QPixmap must only be created on the GUI thread, which is why workers stop at
+QImage and `get()` converts on demand.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import threading
+from typing import Callable, Iterable, Optional, Tuple
+
+from PySide6.QtCore import Qt, QCoreApplication, QFileSystemWatcher
+from PySide6.QtGui import QImage, QPixmap
+
+import instrument
+
+from . import icon_atlas as item_icon_atlas
+from . import icon_cache as item_icon_cache
+from .icon_index import IconIndex
+
+_ICON_CACHE = None
+_LOADERS = {}
+
+
+def get_icon_cache(settings=None):
+    """Return the process-wide IconCache, created on first use.
+
+    QSettings keys 'icon_cache/dir' and 'icon_cache/max_mb' override the
+    default location (per-user cache dir) and the 256 MB size cap.
+    """
+    global _ICON_CACHE
+    if _ICON_CACHE is None:
+        root = None
+        max_mb = 256
+        if settings is not None:
+            try:
+                root = settings.value('icon_cache/dir', '') or None
+                max_mb = int(settings.value('icon_cache/max_mb', max_mb))
+            except Exception:
+                pass
+        _ICON_CACHE = item_icon_cache.IconCache(root, max_bytes=max_mb * 1024 * 1024)
+    return _ICON_CACHE
+
+
+def get_icon_loader(icon_dir, settings=None) -> 'IconLoader':
+    """Return the shared IconLoader for an icon directory (one per directory per process)."""
+    key = str(Path(icon_dir))
+    loader = _LOADERS.get(key)
+    if loader is None:
+        capacity = 256
+        if settings is not None:
+            try:
+                capacity = int(settings.value('icon_cache/memory_items', capacity))
+            except Exception:
+                pass
+        cache = get_icon_cache(settings)
+        loader = IconLoader(icon_dir, cache, capacity=capacity)
+        loader.atlas = item_icon_atlas.open_atlas(item_icon_atlas.atlas_path_for(cache.root, icon_dir))
+        _LOADERS[key] = loader
+        # rebuild the directory index when icons are added, renamed or removed
+        if QCoreApplication.instance() is not None and Path(icon_dir).is_dir():
+            try:
+                loader.watcher = QFileSystemWatcher([key])
+                loader.watcher.directoryChanged.connect(lambda _p, loader=loader: loader.refresh())
+            except Exception:
+                loader.watcher = None
+    return loader
+
+
+def qimage_rgba_bytes(img) -> bytes:
+    """Return the pixels of a QImage as tightly packed RGBA8888 bytes."""
+    img = img.convertToFormat(QImage.Format_RGBA8888)
+    w, h = img.width(), img.height()
+    stride = img.bytesPerLine()
+    buf = bytes(img.constBits())
+    if stride == w * 4:
+        return buf[:w * h * 4]
+    return b''.join(buf[y * stride:y * stride + w * 4] for y in range(h))
+
+
+def load_icon_image(icon_path, icon_cache=None) -> Optional[QImage]:
+    """Return a QImage thumbnail (fits THUMB_SIZE x THUMB_SIZE) for icon_path, or None.
+
+    Looks in the persistent thumbnail cache first; on a miss the icon is
+    decoded (dds.py for DDS, Pillow or Qt for other formats) and the
+    thumbnail stored for the next session. Only uses QImage, so it is safe
+    to call from worker threads.
+    """
+    size = item_icon_cache.THUMB_SIZE
+    if icon_cache is not None:
+        try:
+            thumb = icon_cache.lookup(icon_path)
+            if thumb is not None:
+                img = QImage(str(thumb))
+                if not img.isNull():
+                    return img
+        except Exception:
+            pass
+
+    try:
+        w, h, data = item_icon_cache.decode_icon(icon_path)
+    except Exception:
+        # Pillow missing or unsupported by dds.py: let Qt try its own plugins
+        img = QImage(str(icon_path))
+        if img.isNull():
+            return None
+        w, h, data = img.width(), img.height(), qimage_rgba_bytes(img)
+
+    if icon_cache is not None:
+        try:
+            thumb = icon_cache.store(icon_path, w, h, data)
+            if thumb is not None:
+                img = QImage(str(thumb))
+                if not img.isNull():
+                    return img
+        except Exception:
+            pass
+    # copy() detaches the image from the Python-owned buffer
+    img = QImage(data, w, h, w * 4, QImage.Format_RGBA8888).copy()
+    if img.isNull():
+        return None
+    return img.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+class IconLoader:
+    """Resolve, decode and memoize item icon thumbnails by IconFilename."""
+
+    def __init__(self, icon_dir, icon_cache=None, capacity: int = 256, workers: int = 2):
+        self.icon_dir = Path(icon_dir)
+        self.icon_cache = icon_cache
+        self.capacity = max(1, int(capacity))
+        self.index = IconIndex(self.icon_dir)
+        self.watcher = None
+        self.atlas = None
+        self._lock = threading.Lock()
+        self._images = OrderedDict()   # name -> QImage or None (thread-safe, under _lock)
+        self._pixmaps = OrderedDict()  # name -> QPixmap (GUI thread only)
+        self._pending = set()
+        self._callbacks = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gfeditor_icons')
+
+    def resolve(self, icon_name: str) -> Optional[Path]:
+        """Return the file for an IconFilename value (a dict hit on the directory index)."""
+        return self.index.resolve(icon_name)
+
+    def refresh(self) -> None:
+        """Rescan the icon directory and forget decoded icons (called by the watcher)."""
+        self.index.refresh()
+        if self.atlas is not None:
+            self.atlas.forget_checks()
+        self.invalidate()
+
+    def atlas_image(self, icon_name: str, full_size: bool = False) -> Optional[QImage]:
+        """Return the icon as a QImage view over the mapped atlas, or None.
+
+        The image shares memory with the atlas (no copy); convert it to a
+        QPixmap or copy() it before keeping it. full_size=True rejects icons
+        that were shrunk when the atlas was built. Worker-thread safe.
+        """
+        atlas = self.atlas
+        if atlas is None or not icon_name:
+            return None
+        path = self.resolve(icon_name)
+        if path is None or (full_size and atlas.is_scaled(path.name)):
+            return None
+        v = atlas.view(path.name, path)
+        if v is None:
+            return None
+        buf, w, h, stride = v
+        img = QImage(buf, w, h, stride, QImage.Format_RGBA8888)
+        return None if img.isNull() else img
+
+    @instrument.traced('items.icon_decode', cat='icons')
+    def _load(self, icon_name: str) -> Optional[QImage]:
+        """Resolve and decode one icon into the image LRU (worker-thread safe)."""
+        img = None
+        try:
+            img = self.atlas_image(icon_name, full_size=True)
+        except Exception:
+            img = None
+        if img is not None:
+            size = item_icon_cache.THUMB_SIZE
+            img = img.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            path = self.resolve(icon_name)
+            img = load_icon_image(path, self.icon_cache) if path is not None else None
+        with self._lock:
+            self._images[icon_name] = img
+            self._images.move_to_end(icon_name)
+            while len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+            self._pending.discard(icon_name)
+            callbacks = self._callbacks.pop(icon_name, ())
+        for cb in callbacks:
+            try:
+                cb(icon_name)
+            except Exception:
+                pass
+        return img
+
+    def peek(self, icon_name: str) -> Optional[QImage]:
+        """Return the decoded QImage if it is already in memory, without blocking."""
+        with self._lock:
+            img = self._images.get(icon_name)
+            if img is not None:
+                self._images.move_to_end(icon_name)
+            return img
+
+    def get(self, icon_name: str) -> Tuple[Optional[Path], Optional[QPixmap]]:
+        """Return (path, pixmap) for an IconFilename, decoding synchronously on a miss.
+
+        Must be called on the GUI thread.
+        """
+        if not icon_name:
+            return None, None
+        pix = self._pixmaps.get(icon_name)
+        if pix is not None:
+            self._pixmaps.move_to_end(icon_name)
+            return self.resolve(icon_name), pix
+        with self._lock:
+            cached = icon_name in self._images
+            img = self._images.get(icon_name)
+        if not cached:
+            img = self._load(icon_name)
+        if img is None:
+            return self.resolve(icon_name), None
+        pix = QPixmap.fromImage(img)
+        self._pixmaps[icon_name] = pix
+        while len(self._pixmaps) > self.capacity:
+            self._pixmaps.popitem(last=False)
+        return self.resolve(icon_name), pix
+
+    def prefetch(self, icon_names: Iterable[str], on_done: Optional[Callable[[str], None]] = None) -> int:
+        """Queue background decoding for icons not yet in memory. Returns the number queued.
+
+        on_done(icon_name) is called from the worker thread once an icon is
+        decoded; GUI code should forward it through a queued signal.
+        """
+        queued = 0
+        ready = []
+        for name in icon_names:
+            if not name or (on_done is None and name in self._pixmaps):
+                continue
+            with self._lock:
+                if name in self._images:
+                    # decoded between the caller's peek() and now
+                    if on_done is not None and self._images[name] is not None:
+                        ready.append(name)
+                    continue
+                if on_done is not None:
+                    self._callbacks.setdefault(name, []).append(on_done)
+                if name in self._pending:
+                    continue
+                self._pending.add(name)
+            self._pool.submit(self._load, name)
+            queued += 1
+        for name in ready:
+            on_done(name)
+        return queued
+
+    def invalidate(self, icon_name: Optional[str] = None) -> None:
+        """Drop one (or every) decoded icon from memory so it is decoded again."""
+        with self._lock:
+            if icon_name is None:
+                self._images.clear()
+            else:
+                self._images.pop(icon_name, None)
+        if icon_name is None:
+            self._pixmaps.clear()
+        else:
+            self._pixmaps.pop(icon_name, None)
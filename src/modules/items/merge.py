@@ -0,0 +1,245 @@
+"""Three-way merge of item tables (base / ours / theirs), by record and field.
+
+Records are keyed by Id (duplicate Ids pair up in file order, as in
+recdiff) and compared by the hash of their raw bytes, so the common cases
+cost no decoding: a record changed on one side only is copied byte for byte
+from that side. Only records changed on both sides are decoded and merged
+field by field; a field changed differently on both sides is a conflict
+(resolved with `prefer`, and reported per Id and column).
+
+The inputs are memory-mapped and indexed with gfio.scan_records; memory is
+the record index (offsets, hashes, Ids), not the decoded rows, and every pass
+is linear. The output keeps ours' order and line endings; records added only
+by theirs are placed after the record that precedes them in theirs.
+
+    result = merge_files('base.ini', 'ours.ini', 'theirs.ini')
+    write_encoded_pair(result.chunks, 'C_Item.ini', 'S_Item.ini')
+"""
+from dataclasses import dataclass, field
+import mmap
+import os
+from typing import Dict, List
+
+try:
+    from ... import gfio as _gfio
+    from ... import instrument
+    from ... import recdiff
+except ImportError:
+    import gfio as _gfio
+    import instrument
+    import recdiff
+
+from .reader import DEFAULT_HEADER
+
+
+@dataclass
+class Conflict:
+    """kind: 'field' (both changed the column), 'add/add', 'modify/delete' or 'delete/modify'."""
+    id: str
+    column: str
+    kind: str
+    base: str = ''
+    ours: str = ''
+    theirs: str = ''
+
+
+@dataclass
+class MergeResult:
+    chunks: List = field(default_factory=list)      # output file, bytes / memoryview chunks
+    conflicts: List[Conflict] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=dict)
+    _maps: List = field(default_factory=list, repr=False)
+
+    @property
+    def size(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+    def close(self) -> None:
+        """Release the memory maps of the inputs (after the output was written)."""
+        self.chunks = []
+        for m in self._maps:
+            try:
+                m.close()
+            except (BufferError, ValueError):
+                pass
+        self._maps = []
+
+
+def _map_file(path: str, copy: bool = False):
+    """Read-only memory map of path (plain bytes for empty files or when copy=True)."""
+    with open(path, 'rb') as fh:
+        if copy or os.fstat(fh.fileno()).st_size == 0:
+            return fh.read()
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _fields(spans, i: int, encoding: str) -> List[str]:
+    return bytes(spans.data[spans.cstarts[i]:spans.cends[i]]).decode(encoding, errors='replace').split('|')
+
+
+def _col(fields: List[str], c: int) -> str:
+    return fields[c] if c < len(fields) else ''
+
+
+def _column_name(c: int) -> str:
+    return DEFAULT_HEADER[c] if c < len(DEFAULT_HEADER) else f'col{c}'
+
+
+def _newline_of(spans) -> bytes:
+    if len(spans):
+        end = spans.next_start(0)
+        term = bytes(spans.data[spans.cends[0]:end])
+        if term.startswith(b'\r\n'):
+            return b'\r\n'
+    return b'\n'
+
+
+def merge_spans(base, ours, theirs, encoding: str = 'big5', prefer: str = 'ours') -> MergeResult:
+    """Merge three scanned files (gfio.RecordSpans). prefer: side whose value wins a conflict."""
+    if prefer not in ('ours', 'theirs'):
+        raise ValueError(f'prefer must be ours or theirs, not {prefer!r}')
+    result = MergeResult()
+    conflicts = result.conflicts
+    stats = {'unchanged': 0, 'ours': 0, 'theirs': 0, 'merged': 0, 'added': 0, 'deleted': 0, 'conflicts': 0}
+    newline = _newline_of(ours)
+
+    with instrument.span('merge.index', cat='merge'):
+        bh, oh, th = recdiff.record_hashes(base), recdiff.record_hashes(ours), recdiff.record_hashes(theirs)
+        bkeys, okeys, tkeys = recdiff.record_keys(base), recdiff.record_keys(ours), recdiff.record_keys(theirs)
+        bmap = {k: i for i, k in enumerate(bkeys)}
+        tmap = {k: i for i, k in enumerate(tkeys)}
+        oset = set(okeys)
+
+    # theirs-only records: placed after the preceding theirs record that ours has;
+    # records theirs deleted are found in the ours pass (missing from tmap)
+    inserts: Dict[object, List[int]] = {}
+    anchor = None
+    for j, k in enumerate(tkeys):
+        if k in oset:
+            anchor = k
+            continue
+        b = bmap.get(k)
+        if b is None:
+            inserts.setdefault(anchor, []).append(j)
+            stats['added'] += 1
+        elif th[j] != bh[b]:
+            # ours deleted a record theirs modified: keep theirs' version
+            conflicts.append(Conflict(recdiff.key_id(k), '*', 'delete/modify'))
+            inserts.setdefault(anchor, []).append(j)
+        else:
+            stats['deleted'] += 1
+
+    out = result.chunks
+    oview = memoryview(ours.data)
+    run = [0, ours.starts[0] if len(ours) else len(ours.data)]   # header lines before the first record
+
+    def flush_run():
+        if run[1] > run[0]:
+            _append(out, oview[run[0]:run[1]], newline)
+        run[0] = run[1]
+
+    def emit_theirs(j: int):
+        flush_run()
+        _append(out, memoryview(theirs.data)[theirs.cstarts[j]:theirs.cends[j]], newline, record=True)
+
+    def emit_body(i: int, body: bytes):
+        """Record i of ours with another body (keeps ours' leading blank lines and terminator)."""
+        flush_run()
+        data = ours.data
+        _append(out, bytes(data[ours.starts[i]:ours.cstarts[i]]) + body +
+                bytes(data[ours.cends[i]:ours.next_start(i)]), newline)
+        run[0] = run[1] = ours.next_start(i)
+
+    def keep_ours(i: int):
+        a, b = ours.starts[i], ours.next_start(i)
+        if run[1] != a:
+            flush_run()
+            run[0] = a
+        run[1] = b
+
+    def skip_ours(i: int):
+        flush_run()
+        run[0] = run[1] = ours.next_start(i)
+
+    with instrument.span('merge.emit', cat='merge', records=len(ours)):
+        for j in inserts.get(None, ()):
+            emit_theirs(j)
+        for i, k in enumerate(okeys):
+            b = bmap.get(k)
+            t = tmap.get(k)
+            if t is None:
+                if b is None:
+                    keep_ours(i)            # added by ours
+                    stats['added'] += 1
+                elif oh[i] == bh[b]:
+                    skip_ours(i)            # theirs deleted it, ours did not touch it
+                    stats['deleted'] += 1
+                else:
+                    conflicts.append(Conflict(recdiff.key_id(k), '*', 'modify/delete'))
+                    keep_ours(i)
+            elif oh[i] == th[t] or (b is not None and th[t] == bh[b]):
+                keep_ours(i)
+                stats['unchanged' if oh[i] == th[t] and (b is None or oh[i] == bh[b]) else 'ours'] += 1
+            elif b is not None and oh[i] == bh[b]:
+                # only theirs changed it
+                emit_body(i, bytes(theirs.data[theirs.cstarts[t]:theirs.cends[t]]))
+                stats['theirs'] += 1
+            else:
+                # changed on both sides (or added on both): merge field by field
+                fo, ft = _fields(ours, i, encoding), _fields(theirs, t, encoding)
+                fb = _fields(base, b, encoding) if b is not None else None
+                merged = []
+                for c in range(max(len(fo), len(ft), len(fb) if fb else 0)):
+                    vo, vt = _col(fo, c), _col(ft, c)
+                    vb = _col(fb, c) if fb is not None else None
+                    if vo == vt or vt == vb:
+                        merged.append(vo)
+                    elif vo == vb:
+                        merged.append(vt)
+                    else:
+                        conflicts.append(Conflict(recdiff.key_id(k), _column_name(c),
+                                                  'field' if fb is not None else 'add/add',
+                                                  vb or '', vo, vt))
+                        merged.append(vo if prefer == 'ours' else vt)
+                # no trailing empty columns beyond the longest side
+                while len(merged) > max(len(fo), len(ft)) and merged[-1] == '':
+                    merged.pop()
+                emit_body(i, '|'.join(merged).encode(encoding, errors='replace'))
+                stats['merged'] += 1
+            for j in inserts.get(k, ()):
+                emit_theirs(j)
+        flush_run()
+    stats['conflicts'] = len(conflicts)
+    result.stats = stats
+    return result
+
+
+def _append(out: List, chunk, newline: bytes, record: bool = False) -> None:
+    """Add a chunk; a record copied from theirs gets ours' line ending, and a
+    previous chunk without a final newline gets one before more records follow."""
+    if not len(chunk):
+        return
+    if out:
+        last = out[-1]
+        if len(last) and last[-1] != 10:
+            out.append(newline)
+    out.append(chunk)
+    if record:
+        out.append(newline)
+
+
+def merge_files(base_path: str, ours_path: str, theirs_path: str, encoding: str = 'big5',
+                prefer: str = 'ours', output_paths=()) -> MergeResult:
+    """Merge three files. output_paths: files about to be overwritten (inputs among them are read, not mapped)."""
+    outs = [os.path.abspath(p) for p in output_paths if p]
+
+    def load(path):
+        copy = any(os.path.exists(o) and os.path.samefile(path, o) for o in outs)
+        return _map_file(path, copy=copy)
+
+    with instrument.span('merge.files', cat='merge'):
+        maps = [load(p) for p in (base_path, ours_path, theirs_path)]
+        base, ours, theirs = (_gfio.scan_records(m) for m in maps)
+        result = merge_spans(base, ours, theirs, encoding=encoding, prefer=prefer)
+    result._maps = [m for m in maps if isinstance(m, mmap.mmap)]
+    return result
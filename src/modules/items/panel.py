@@ -6,14 +6,13 @@ from PySide6.QtWidgets import (
     QTableWidgetItem, QComboBox, QMessageBox, QSpinBox, QTabWidget,
     QDoubleSpinBox, QTableWidget, QHeaderView, QAbstractItemView, QDialog, QFileDialog
 )
-from PySide6.QtCore import Qt, QCoreApplication, QSettings
-from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtCore import Qt, QSettings
+from PySide6.QtGui import QPixmap
 from pathlib import Path
-import io
-import subprocess
-import shutil
-import tempfile
 import gfio
+import instrument
+from . import icon_loader as item_icon_loader
+from . import icon_grid as item_icon_grid
 from . import flags as item_flags
 from . import translate as item_translate
 import re
@@ -92,7 +91,7 @@ def panel_widget(parent):
         except Exception:
             header = [f'col{i}' for i in range(93)]
 
-        editor = build_professional_editor(parent, client_rows, header, base)
+        editor = build_professional_editor(parent, client_rows, header, base, pair=(client_path, server_path))
 
         splitter = parent._find_splitter()
         if splitter is None:
@@ -110,8 +109,12 @@ def panel_widget(parent):
     return w
 
 
-def build_professional_editor(parent, rows, header, source_base=None):
-    """Build a professional multi-tab item editor."""
+@instrument.traced('items.build_professional_editor', cat='build')
+def build_professional_editor(parent, rows, header, source_base=None, pair=None):
+    """Build a professional multi-tab item editor.
+
+    pair: (client path, server path or None) the rows were read from, for the compare view.
+    """
     container = QWidget()
     # Normalize header: if header doesn't match expected DEFAULT_HEADER length,
     # prefer the canonical DEFAULT_HEADER to keep field-to-widget mapping stable.
@@ -138,19 +141,24 @@ def build_professional_editor(parent, rows, header, source_base=None):
     except Exception:
         state['settings'] = None
 
-    # create a per-run cache directory for converted icons (DDS -> PNG)
+    # persistent icon thumbnail cache (DDS -> 200x200 PNG) shared across sessions,
+    # plus the in-memory loader that prefetches neighbouring icons in the background
     try:
-        icon_cache_dir = Path(tempfile.mkdtemp(prefix='gfeditor_icons_'))
-        state['icon_cache_dir'] = str(icon_cache_dir)
-        app = QCoreApplication.instance()
-        if app is not None:
-            # remove cache when application quits
-            try:
-                app.aboutToQuit.connect(lambda: shutil.rmtree(icon_cache_dir, ignore_errors=True))
-            except Exception:
-                pass
+        icon_cache = item_icon_loader.get_icon_cache(state['settings'])
+        state['icon_cache'] = icon_cache
+        state['icon_cache_dir'] = str(icon_cache.root)
     except Exception:
+        state['icon_cache'] = None
         state['icon_cache_dir'] = None
+    try:
+        lib_base = Path(getattr(parent, 'lib_path', Path.cwd() / 'Assets'))
+        state['icon_loader'] = item_icon_loader.get_icon_loader(lib_base / 'itemicon', state['settings'])
+    except Exception:
+        state['icon_loader'] = None
+    try:
+        state['icon_prefetch'] = int(state['settings'].value('icon_cache/prefetch', 8)) if state['settings'] is not None else 8
+    except Exception:
+        state['icon_prefetch'] = 8
 
     # ============= TOP CONTROLS =============
     ctrl_row = QHBoxLayout()
@@ -168,6 +176,7 @@ def build_professional_editor(parent, rows, header, source_base=None):
     btn_prev = QPushButton('< Prev')
     btn_next = QPushButton('Next >')
     btn_search = QPushButton('Search Item')
+    btn_grid = QPushButton('Icon Grid')
     btn_csv = QPushButton('View CSV')
     
     ctrl_row.addWidget(QLabel('Item:'))
@@ -175,6 +184,7 @@ def build_professional_editor(parent, rows, header, source_base=None):
     ctrl_row.addWidget(selector)
     ctrl_row.addWidget(btn_next)
     ctrl_row.addWidget(btn_search)
+    ctrl_row.addWidget(btn_grid)
     ctrl_row.addWidget(btn_csv)
     # debug/info label to help trace which source was used to build this editor
     info_label = QLabel('')
@@ -220,15 +230,31 @@ def build_professional_editor(parent, rows, header, source_base=None):
     btn_save_close = QPushButton('Save and Close')
     btn_save_disk = QPushButton('Save to Disk')
     btn_compare = QPushButton('Compare')
+    btn_bulk = QPushButton('Bulk Edit')
     
     btn_row.addWidget(btn_save)
     btn_row.addWidget(btn_save_close)
     btn_row.addWidget(btn_save_disk)
     btn_row.addWidget(btn_compare)
+    btn_row.addWidget(btn_bulk)
     btn_row.addStretch()
     main_layout.addLayout(btn_row)
 
     # ============= LOAD LOGIC =============
+    icon_col = header.index('IconFilename') if 'IconFilename' in header else 1
+
+    def prefetch_icons(indices):
+        """Decode icons for the given row indices in the background (nearest first)."""
+        loader = state.get('icon_loader')
+        if loader is None:
+            return
+        names = [rows[i][icon_col] for i in indices if 0 <= i < len(rows) and icon_col < len(rows[i])]
+        try:
+            loader.prefetch(names)
+        except Exception:
+            pass
+
+    @instrument.traced('items.load_index', cat='render')
     def load_index(idx):
         if idx < 0 or idx >= len(rows):
             return
@@ -246,10 +272,14 @@ def build_professional_editor(parent, rows, header, source_base=None):
             item_translate.update_tab_translate(tab_translate, rows[idx], header, state)
         except Exception:
             pass
+        # warm up the icons of the next/previous K items while the user reads this one
+        k = state.get('icon_prefetch', 8)
+        prefetch_icons(i for d in range(1, k + 1) for i in (idx + d, idx - d))
 
     def save_current(close_after=False, write_disk=False):
         idx = state['index']
         r = rows[idx]
+        before = list(r)
         while len(r) <= 92:
             r.append('')
 
@@ -260,14 +290,28 @@ def build_professional_editor(parent, rows, header, source_base=None):
         save_tab_enchant_special(tab_enchant, r, header)
         save_tab_advanced(tab_advanced, r, header)
 
+        # marcar a linha como alterada no documento do MainWindow (save so reescreve o que mudou;
+        # os campos alterados vao para o journal de recuperacao)
+        if r != before:
+            try:
+                doc = getattr(parent, 'document', None)
+                if doc is not None and doc.rows is rows:
+                    doc.mark_dirty(idx, before=before)
+            except Exception:
+                pass
+
         # Update parent table
         try:
             table = getattr(parent, 'table', None)
-            if table is not None:
-                sel_row = table.currentRow() if hasattr(table, 'currentRow') else 0
-                for col in range(table.columnCount()):
-                    val = r[col] if col < len(r) else ''
-                    table.setItem(sel_row, col, QTableWidgetItem(val))
+            if table is not None and idx < table.rowCount():
+                # a tabela e so a view: o documento ja tem o valor, nao reenviar via itemChanged
+                table.blockSignals(True)
+                try:
+                    for col in range(table.columnCount()):
+                        val = r[col] if col < len(r) else ''
+                        table.setItem(idx, col, QTableWidgetItem(val))
+                finally:
+                    table.blockSignals(False)
         except Exception:
             pass
 
@@ -285,6 +329,27 @@ def build_professional_editor(parent, rows, header, source_base=None):
             except Exception:
                 pass
 
+    def refresh_rows(indices=None):
+        """Rows changed on disk (MainWindow reload): relabel them and redraw the item on screen.
+
+        indices=None: rows were added/removed, rebuild the selector.
+        """
+        if indices is None:
+            selector.blockSignals(True)
+            try:
+                selector.clear()
+                for i in range(len(rows)):
+                    selector.addItem(_display_label_for_row(i))
+            finally:
+                selector.blockSignals(False)
+            load_index(max(0, min(state['index'], len(rows) - 1)))
+            return
+        for i in indices:
+            if 0 <= i < selector.count():
+                selector.setItemText(i, _display_label_for_row(i))
+        if not indices or state['index'] in indices:
+            load_index(state['index'])
+
     # ============= CONNECTIONS =============
     btn_prev.clicked.connect(lambda: load_index(max(0, state['index'] - 1)))
     btn_next.clicked.connect(lambda: load_index(min(len(rows) - 1, state['index'] + 1)))
@@ -292,8 +357,48 @@ def build_professional_editor(parent, rows, header, source_base=None):
     btn_save.clicked.connect(lambda: save_current(False, False))
     btn_save_close.clicked.connect(lambda: save_current(True, False))
     btn_save_disk.clicked.connect(lambda: save_current(True, True))
-    btn_search.clicked.connect(lambda: show_search_dialog(rows, load_index))
-    btn_compare.clicked.connect(lambda: QMessageBox.info(parent, 'Compare', 'Compare feature coming soon!'))
+    btn_search.clicked.connect(lambda: show_search_dialog(rows, load_index, prefetch_icons))
+
+    def show_icon_grid():
+        # non-modal; keep a reference so the dialog is not garbage collected
+        try:
+            state['icon_grid'] = item_icon_grid.show_icon_grid(container, rows, header, state, on_select=load_index)
+        except Exception as e:
+            QMessageBox.warning(parent, 'Icon Grid', f'Could not open icon grid: {e}')
+    btn_grid.clicked.connect(show_icon_grid)
+
+    def show_compare():
+        # non-modal, like the icon grid; keep a reference
+        try:
+            import compare
+            client_path, server_path = pair or (None, None)
+            state['compare_dialog'] = compare.show_compare_dialog(parent, rows, header, on_select=load_index,
+                                                                  current_path=client_path, server_path=server_path)
+        except Exception as e:
+            QMessageBox.warning(parent, 'Compare', f'Could not open compare view: {e}')
+    btn_compare.clicked.connect(show_compare)
+
+    def on_bulk_applied(indices):
+        # linhas alteradas pela edicao em massa: atualizar a tabela do MainWindow e o editor
+        try:
+            parent._refresh_table_rows(indices)
+        except Exception:
+            pass
+        refresh_rows(indices)
+
+    def show_bulk_edit():
+        # reaproveita o dialogo aberto: o undo da ultima edicao fica nele
+        dlg = state.get('bulk_dialog')
+        if dlg is not None:
+            dlg.show()
+            dlg.raise_()
+            return
+        try:
+            from . import bulk_dialog
+            state['bulk_dialog'] = bulk_dialog.show_bulk_dialog(parent, rows, header, on_applied=on_bulk_applied)
+        except Exception as e:
+            QMessageBox.warning(parent, 'Bulk Edit', f'Could not open bulk edit: {e}')
+    btn_bulk.clicked.connect(show_bulk_edit)
     # CSV viewer: show all rows as CSV in a dialog
     def show_csv():
         try:
@@ -354,6 +459,7 @@ def build_professional_editor(parent, rows, header, source_base=None):
     scroll = QScrollArea()
     scroll.setWidgetResizable(True)
     scroll.setWidget(container)
+    scroll.refresh_rows = refresh_rows
     return scroll
 
 
@@ -426,6 +532,7 @@ def create_tab_basic(rows, header, state):
     return tab
 
 
+@instrument.traced('items.update_tab_basic', cat='render')
 def update_tab_basic(tab, row, header, state):
     for key, widget in tab.widgets_basic.items():
         try:
@@ -449,6 +556,8 @@ def update_tab_basic(tab, row, header, state):
                 widget.setPlainText(val)
             else:
                 # If Name is empty, try Translate files as fallback (T_Item or T_ItemMall)
+                if key == 'Name':
+                    tab.name_fallback = None
                 if key == 'Name' and (val is None or str(val).strip() == ''):
                     try:
                         src = state.get('source_base') or ''
@@ -460,6 +569,7 @@ def update_tab_basic(tab, row, header, state):
                         tr = item_translate.get_translation(translate_name, row[0] if len(row) > 0 else '', lib_base=lib_base)
                         if tr and tr[0]:
                             widget.setText(tr[0])
+                            tab.name_fallback = tr[0]
                         else:
                             widget.setText(val)
                     except Exception:
@@ -486,181 +596,20 @@ def update_tab_basic(tab, row, header, state):
                     except Exception:
                         icon_name = ''
 
-                lib_base = Path(getattr(state.get('parent'), 'lib_path', Path.cwd() / 'Assets'))
-                icon_dir = lib_base / 'itemicon'
-                icon_path = None
-
-                # resolve icon path: respect provided filename, try common extensions and case variants
-                if icon_name:
-                    tentative = icon_dir / icon_name
-                    if tentative.exists():
-                        icon_path = tentative
-                    else:
-                        # if icon_name already has an extension, try common case variants
-                        suffix = Path(icon_name).suffix
-                        if suffix:
-                            # try lowercase/uppercase replacement
-                            for ext in (suffix.lower(), suffix.upper()):
-                                p2 = icon_dir / (Path(icon_name).stem + ext)
-                                if p2.exists():
-                                    icon_path = p2
-                                    break
-                        # try adding common extensions if none matched
-                        if icon_path is None:
-                            for ext in ('.dds', '.DDS', '.png', '.bmp', '.jpg', '.jpeg', '.gif'):
-                                p2 = icon_dir / (icon_name + ext) if not Path(icon_name).suffix else icon_dir / (Path(icon_name).stem + ext)
-                                if p2.exists():
-                                    icon_path = p2
-                                    break
-
-                # if we found a candidate file, try to load it; prefer QPixmap, but use Pillow or external tools for DDS
-                if icon_path and icon_path.exists():
-                    loaded = False
-                    # prepare cache path (use mtime to invalidate when file changes)
-                    cache_png = None
-                    try:
-                        cache_root = state.get('icon_cache_dir')
-                        if cache_root:
-                            cache_root = Path(cache_root)
-                            cache_png = cache_root / f"{icon_path.stem}_{icon_path.stat().st_mtime_ns}.png"
-                    except Exception:
-                        cache_png = None
-
-                    # if cached PNG exists, load it quickly
-                    if cache_png is not None and cache_png.exists():
-                        try:
-                            pix = QPixmap(str(cache_png))
-                            if not pix.isNull():
-                                tab.icon_label.setPixmap(pix.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                tab.icon_label.setToolTip(str(cache_png))
-                                loaded = True
-                        except Exception:
-                            loaded = False
-                    try:
-                        pix = QPixmap(str(icon_path))
-                        if not pix.isNull():
-                            tab.icon_label.setPixmap(pix.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                            tab.icon_label.setToolTip(str(icon_path))
-                            loaded = True
-                    except Exception:
-                        loaded = False
-
-                    if not loaded:
-                        # Try Pillow as a robust fallback (supports DDS with plugin)
-                        try:
-                            from PIL import Image
-                            im = Image.open(str(icon_path))
-                            im = im.convert('RGBA')
-                            w, h = im.size
-                            # raw bytes in RGBA order
-                            data = im.tobytes('raw', 'RGBA')
-                            # try preferred Qt formats; fall back safely
-                            try:
-                                qimg = QImage(data, w, h, QImage.Format_RGBA8888)
-                            except Exception:
-                                try:
-                                    qimg = QImage(data, w, h, QImage.Format_RGBA8888_Premultiplied)
-                                except Exception:
-                                    # last resort: use ARGB32 (may require byte order adjustments depending on platform)
-                                    qimg = QImage(data, w, h, QImage.Format_ARGB32)
-                            pix2 = QPixmap.fromImage(qimg)
-                            if not pix2.isNull():
-                                # save converted PNG to cache if available
-                                try:
-                                    if cache_png is not None:
-                                        im.save(str(cache_png), format='PNG')
-                                        tab.icon_label.setToolTip(str(cache_png))
-                                    else:
-                                        tab.icon_label.setToolTip(str(icon_path))
-                                except Exception:
-                                    tab.icon_label.setToolTip(str(icon_path))
-                                tab.icon_label.setPixmap(pix2.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                loaded = True
-                        except Exception:
-                            loaded = False
-                            # Pillow failed to open (likely DDS unsupported). Try external converters if present.
-                            try:
-                                # Prefer ImageMagick 'magick' which can output PNG to stdout
-                                magick = shutil.which('magick')
-                                if magick:
-                                    # write direct to cache_png when possible
-                                    if cache_png is not None:
-                                        try:
-                                            subprocess.run([magick, str(icon_path), str(cache_png)], check=True)
-                                            if cache_png.exists():
-                                                pix2 = QPixmap(str(cache_png))
-                                                if not pix2.isNull():
-                                                    tab.icon_label.setPixmap(pix2.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                                    tab.icon_label.setToolTip(str(cache_png) + ' (converted via magick)')
-                                                    loaded = True
-                                        except Exception:
-                                            loaded = False
-                                    else:
-                                        proc = subprocess.run([magick, str(icon_path), 'png:-'], capture_output=True, check=True)
-                                        if proc.stdout:
-                                            from PIL import Image
-                                            im = Image.open(io.BytesIO(proc.stdout))
-                                            im = im.convert('RGBA')
-                                            w, h = im.size
-                                            data = im.tobytes('raw', 'RGBA')
-                                            try:
-                                                qimg = QImage(data, w, h, QImage.Format_RGBA8888)
-                                            except Exception:
-                                                qimg = QImage(data, w, h, QImage.Format_ARGB32)
-                                            pix2 = QPixmap.fromImage(qimg)
-                                            if not pix2.isNull():
-                                                tab.icon_label.setPixmap(pix2.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                                tab.icon_label.setToolTip(str(icon_path) + ' (converted via magick)')
-                                                loaded = True
-                                # fallback to texconv (DirectXTex) if available
-                                if not loaded:
-                                    texconv = shutil.which('texconv')
-                                    if texconv:
-                                        tmpd = tempfile.mkdtemp(prefix='gfeditor_texconv_')
-                                        try:
-                                            # texconv will write PNG(s) to the output dir; if cache available, use it
-                                            out_dir = tmpd
-                                            if cache_png is not None:
-                                                out_dir = str(cache_root)
-                                            subprocess.run([texconv, '-ft', 'PNG', '-o', out_dir, str(icon_path)], check=True)
-                                            pngs = list(Path(out_dir).glob('*.png'))
-                                            if pngs:
-                                                first_png = pngs[0]
-                                                # if using tmpd, move to cache name
-                                                target_png = cache_png if (cache_png is not None) else first_png
-                                                if cache_png is not None and str(first_png) != str(cache_png):
-                                                    try:
-                                                        shutil.move(str(first_png), str(cache_png))
-                                                        first_png = cache_png
-                                                    except Exception:
-                                                        pass
-                                                from PIL import Image
-                                                im = Image.open(str(first_png))
-                                                im = im.convert('RGBA')
-                                                w, h = im.size
-                                                data = im.tobytes('raw', 'RGBA')
-                                                try:
-                                                    qimg = QImage(data, w, h, QImage.Format_RGBA8888)
-                                                except Exception:
-                                                    qimg = QImage(data, w, h, QImage.Format_ARGB32)
-                                                pix2 = QPixmap.fromImage(qimg)
-                                                if not pix2.isNull():
-                                                    tab.icon_label.setPixmap(pix2.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                                    tab.icon_label.setToolTip(str(first_png) + ' (converted via texconv)')
-                                                    loaded = True
-                                        finally:
-                                            try:
-                                                shutil.rmtree(tmpd)
-                                            except Exception:
-                                                pass
-                            except Exception:
-                                # external conversion failed  keep loaded = False
-                                loaded = False
-
-                    if not loaded:
-                        # cannot load  clear preview and hint to user about Pillow requirement
-                        tab.icon_label.setPixmap(QPixmap())
-                        tab.icon_label.setToolTip('Icone nao encontrado ou formato nao suportado. Para DDS instale Pillow + plugin DDS (ex: pillow-dds).')
+                # resolve + decode through the shared loader (memory LRU, then the
+                # persistent thumbnail cache, then dds.py / Qt / Pillow)
+                loader = state.get('icon_loader')
+                if loader is None:
+                    lib_base = Path(getattr(state.get('parent'), 'lib_path', Path.cwd() / 'Assets'))
+                    loader = item_icon_loader.get_icon_loader(lib_base / 'itemicon', state.get('settings'))
+                icon_path, pix = loader.get(icon_name) if icon_name else (None, None)
+                if pix is not None:
+                    tab.icon_label.setPixmap(pix)
+                    tab.icon_label.setToolTip(str(icon_path))
+                elif icon_path is not None:
+                    # cannot load - clear preview and hint to user
+                    tab.icon_label.setPixmap(QPixmap())
+                    tab.icon_label.setToolTip('Icone nao encontrado ou formato nao suportado (DDS: DXT1/DXT3/DXT5 ou RGB/RGBA sem compressao).')
                 else:
                     # clear pixmap if not found or no name provided
                     tab.icon_label.setPixmap(QPixmap())
@@ -668,6 +617,40 @@ def update_tab_basic(tab, row, header, state):
                 pass
 
 
+def _shown_number(text, widget=None) -> int:
+    """The number the editor shows for a cell ('' or not a number: 0), clamped to a spin box's range."""
+    try:
+        n = int(str(text).strip())
+    except ValueError:
+        n = 0
+    if widget is not None:
+        n = min(max(n, widget.minimum()), widget.maximum())
+    return n
+
+
+def _save_number(row, idx, value: int, shown: int) -> None:
+    """row[idx] = value, unless the editor still shows what it loaded from the cell.
+
+    An unchanged save then keeps blanks and texts like '007' as they are and
+    the row stays clean (not marked dirty, nothing journaled or autosaved).
+    """
+    while len(row) <= idx:
+        row.append('')
+    if value != shown:
+        row[idx] = str(value)
+
+
+def _save_spin(widget, row, idx) -> None:
+    _save_number(row, idx, widget.value(), _shown_number(row[idx] if idx < len(row) else '', widget))
+
+
+COMBO_VALUES = {
+    'ItemType': item_flags.get_item_type_value,
+    'ItemQuality': item_flags.get_quality_value,
+    'Target': item_flags.get_target_value,
+}
+
+
 def save_tab_basic(tab, row, header):
     for key, widget in tab.widgets_basic.items():
         try:
@@ -676,20 +659,26 @@ def save_tab_basic(tab, row, header):
                 row.append('')
             
             if isinstance(widget, QSpinBox):
-                row[idx] = str(widget.value())
+                _save_spin(widget, row, idx)
             elif isinstance(widget, QComboBox):
-                if key == 'ItemType':
-                    val = item_flags.get_item_type_value(widget.currentText())
-                elif key == 'ItemQuality':
-                    val = item_flags.get_quality_value(widget.currentText())
-                elif key == 'Target':
-                    val = item_flags.get_target_value(widget.currentText())
+                if key in COMBO_VALUES and not widget.currentText():
+                    # valor fora do mapa (combo em branco): manter o original em vez do default
+                    continue
+                if key in COMBO_VALUES:
+                    val = COMBO_VALUES[key](widget.currentText())
+                    text = row[idx].strip()
+                    if text.isdigit() and int(text) == val:
+                        # mesmo valor: manter o texto original ('07' etc.)
+                        continue
                 else:
                     val = widget.currentText()
                 row[idx] = str(val) if val else ''
             elif isinstance(widget, QTextEdit):
                 row[idx] = widget.toPlainText()
             else:
+                if key == 'Name' and not row[idx].strip() and widget.text() == getattr(tab, 'name_fallback', None):
+                    # nome vindo do T_ (Name vazio): so exibido, nao gravado
+                    continue
                 row[idx] = widget.text()
         except:
             pass
@@ -848,6 +837,7 @@ def create_tab_parameters(rows, header, state):
     return tab
 
 
+@instrument.traced('items.update_tab_parameters', cat='render')
 def update_tab_parameters(tab, row, header, state):
     for key, widget in tab.widgets_params.items():
         try:
@@ -874,7 +864,7 @@ def save_tab_parameters(tab, row, header):
             while len(row) <= idx:
                 row.append('')
             if isinstance(widget, QSpinBox):
-                row[idx] = str(widget.value())
+                _save_spin(widget, row, idx)
             elif isinstance(widget, QLineEdit):
                 row[idx] = widget.text()
             else:
@@ -1039,33 +1029,10 @@ def create_tab_flags_restrictions(rows, header, state):
     # apply numeric input value to checkboxes (accept hex 0x.. or decimal)
     def apply_restrict_from_input(text):
         try:
-            t = str(text).strip()
-            # Always interpret RestrictClass input as hexadecimal.
-            # Accept '0x..', '0x.. / ..' or plain hex digits (even if they look numeric).
-            if '/' in t:
-                parts = [p.strip() for p in t.split('/')]
-                hex_part = next((p for p in parts if p.lower().startswith('0x')), parts[0])
-                try:
-                    v = int(hex_part, 16)
-                except Exception:
-                    # fallback: try parse entire string as hex (without 0x)
-                    try:
-                        v = int(t.replace('/', '').replace(' ', ''), 16)
-                    except Exception:
-                        v = 0
-            else:
-                try:
-                    v = int(t, 16)
-                except Exception:
-                    v = 0
-
+            # Always interpret RestrictClass input as hexadecimal (see flags.parse_restrict_class)
+            v = item_flags.parse_restrict_class(text)
             # always decode using server IDs -> map bits to server ID numbers
-            decoded_names = []
-            for bit in range(0, 128):
-                if v & (1 << bit):
-                    name = item_flags.ID_TO_CLASS.get(bit)
-                    if name:
-                        decoded_names.append(name)
+            decoded_names = set(item_flags.mask_to_class_names(v))
             for cname, cb in tab.widgets_classes.items():
                 try:
                     cb.blockSignals(True)
@@ -1111,6 +1078,7 @@ def create_tab_flags_restrictions(rows, header, state):
     return tab
 
 
+@instrument.traced('items.update_tab_flags_restrictions', cat='render')
 def update_tab_flags_restrictions(tab, row, header, state):
     # Update flags
     try:
@@ -1158,36 +1126,10 @@ def update_tab_flags_restrictions(tab, row, header, state):
         raw_val = row[idx] if idx < len(row) else ''
         # Always interpret RestrictClass as hexadecimal server-ID bitmask.
         # Accept formats like '0xHEX', '0xHEX / DEC' or plain hex digits.
-        val = 0
-        try:
-            t = str(raw_val).strip()
-            if not t:
-                val = 0
-            elif '/' in t:
-                parts = [p.strip() for p in t.split('/')]
-                hex_part = next((p for p in parts if p.lower().startswith('0x')), parts[0])
-                try:
-                    val = int(hex_part, 16)
-                except Exception:
-                    try:
-                        val = int(t.replace('/', '').replace(' ', ''), 16)
-                    except Exception:
-                        val = 0
-            else:
-                try:
-                    val = int(t, 16)
-                except Exception:
-                    val = 0
-        except Exception:
-            val = 0
+        val = item_flags.parse_restrict_class(raw_val)
 
         # decode using server IDs
-        decoded_names = []
-        for bit in range(0, 128):
-            if val & (1 << bit):
-                name = item_flags.ID_TO_CLASS.get(bit)
-                if name:
-                    decoded_names.append(name)
+        decoded_names = set(item_flags.mask_to_class_names(val))
         # set checkboxes without emitting signals to avoid intermediate recompute
         for cname, cb in tab.widgets_classes.items():
             try:
@@ -1214,7 +1156,8 @@ def save_tab_flags_restrictions(tab, row, header):
         while len(row) <= idx:
             row.append('')
         checked = [name for name, cb in tab.widgets_flags.items() if cb.isChecked()]
-        row[idx] = str(item_flags.encode_flags(checked))
+        text = row[idx].strip()
+        _save_number(row, idx, item_flags.encode_flags(checked), int(text) if text.isdigit() else 0)
     except:
         pass
 
@@ -1224,7 +1167,8 @@ def save_tab_flags_restrictions(tab, row, header):
         while len(row) <= idx:
             row.append('')
         checked = [name for name, cb in tab.widgets_flags_plus.items() if cb.isChecked()]
-        row[idx] = str(item_flags.encode_flags_plus(checked))
+        text = row[idx].strip()
+        _save_number(row, idx, item_flags.encode_flags_plus(checked), int(text) if text.isdigit() else 0)
     except:
         pass
 
@@ -1234,7 +1178,7 @@ def save_tab_flags_restrictions(tab, row, header):
             idx = header.index(key)
             while len(row) <= idx:
                 row.append('')
-            row[idx] = str(widget.value())
+            _save_spin(widget, row, idx)
         except:
             pass
 
@@ -1247,6 +1191,9 @@ def save_tab_flags_restrictions(tab, row, header):
         # always save using server-class-ID positions
         mask = item_flags.class_names_to_mask(checked)
         # write canonical form: hex / decimal so it's explicit and round-trippable
+        # (se a mascara nao mudou, manter o texto original - vazio inclusive - para nao sujar a linha)
+        if item_flags.parse_restrict_class(row[idx]) == mask:
+            return
         row[idx] = f"0x{mask:X} / {mask}"
     except Exception:
         pass
@@ -1287,6 +1234,7 @@ def create_tab_enchant_special(rows, header, state):
     return tab
 
 
+@instrument.traced('items.update_tab_enchant_special', cat='render')
 def update_tab_enchant_special(tab, row, header, state):
     for key, widget in tab.widgets_enchant.items():
         try:
@@ -1303,7 +1251,7 @@ def save_tab_enchant_special(tab, row, header):
             idx = header.index(key)
             while len(row) <= idx:
                 row.append('')
-            row[idx] = str(widget.value())
+            _save_spin(widget, row, idx)
         except:
             pass
 
@@ -1338,6 +1286,7 @@ def create_tab_advanced(rows, header, state):
     return tab
 
 
+@instrument.traced('items.update_tab_advanced', cat='render')
 def update_tab_advanced(tab, row, header, state):
     for key, widget in tab.widgets_advanced.items():
         try:
@@ -1354,13 +1303,17 @@ def save_tab_advanced(tab, row, header):
             idx = header.index(key)
             while len(row) <= idx:
                 row.append('')
-            row[idx] = str(widget.value())
+            _save_spin(widget, row, idx)
         except:
             pass
 
 
-def show_search_dialog(rows, on_select):
-    """Show a search dialog to find items."""
+def show_search_dialog(rows, on_select, prefetch=None):
+    """Show a search dialog to find items.
+
+    If given, prefetch(indices) is called with the first matching row
+    indices so their icons are decoded before one is selected.
+    """
     dialog = QWidget()
     dialog.setWindowTitle('Search Items')
     layout = QVBoxLayout()
@@ -1376,6 +1329,7 @@ def show_search_dialog(rows, on_select):
     def perform_search():
         query = search_input.text().lower()
         results_table.setRowCount(0)
+        matches = []
         
         for i, row in enumerate(rows):
             item_id = row[0] if len(row) > 0 else ''
@@ -1387,6 +1341,13 @@ def show_search_dialog(rows, on_select):
                 results_table.setItem(row_idx, 0, QTableWidgetItem(str(item_id)))
                 results_table.setItem(row_idx, 1, QTableWidgetItem(str(item_name)))
                 results_table.setItem(row_idx, 2, QTableWidgetItem(str(i)))
+                matches.append(i)
+
+        if prefetch is not None and query:
+            try:
+                prefetch(matches[:32])
+            except Exception:
+                pass
 
     def select_item():
         if results_table.currentRow() >= 0:
@@ -0,0 +1,321 @@
+"""Vectorized query expressions and group-by statistics over an ItemTable.
+
+Expressions are Python syntax, parsed with `ast` and evaluated on whole
+NumPy columns (never row by row), e.g.
+
+    ItemType == 7 and SysPrice > 1000
+    (OpFlags & NoTrade) and not (OpFlags & BindOnEquip)
+    flag('NoTrade', 'BindOnEquip') and usable_by('Mago')
+    contains(Name, 'Sword') or isin(ItemQuality, [6, 7])
+
+Names resolve to columns first, then to OpFlags / OpFlagsPlus flag names
+(their integer value). `and` / `or` / `not` work element-wise. Only the
+node types and functions listed here are accepted; anything else raises
+QueryError, so an expression can never run arbitrary code.
+"""
+import ast
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import flags as item_flags
+from .table import ItemTable
+
+
+class QueryError(ValueError):
+    """Raised for invalid or unsupported query expressions."""
+
+
+_BINOPS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide, ast.Mod: np.mod, ast.BitAnd: np.bitwise_and,
+    ast.BitOr: np.bitwise_or, ast.BitXor: np.bitwise_xor, ast.LShift: np.left_shift,
+    ast.RShift: np.right_shift,
+}
+_CMPOPS = {
+    ast.Eq: np.equal, ast.NotEq: np.not_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+    ast.Gt: np.greater, ast.GtE: np.greater_equal,
+}
+
+
+def flag_constants() -> Dict[str, int]:
+    """Names usable as constants in expressions (OpFlags and OpFlagsPlus values)."""
+    out = dict(item_flags.FLAGS)
+    out.update(item_flags.FLAGS_PLUS)
+    return out
+
+
+def _truth(v) -> np.ndarray:
+    v = np.asarray(v)
+    if v.dtype == object:
+        return np.array([bool(x) for x in v.tolist()], dtype=bool) if v.ndim else np.asarray(bool(v.item()))
+    return v.astype(bool)
+
+
+def _strings(v) -> np.ndarray:
+    v = np.asarray(v)
+    return v.astype(str) if v.dtype != object else np.array([str(x) for x in v.tolist()])
+
+
+class _Evaluator:
+    def __init__(self, table: ItemTable):
+        self.table = table
+        self.constants = flag_constants()
+        self._flag_index = None
+        self._class_index = None
+        self.functions: Dict[str, Callable] = {
+            'contains': self._fn_contains,
+            'startswith': self._fn_startswith,
+            'endswith': self._fn_endswith,
+            'isin': self._fn_isin,
+            'abs': np.abs,
+            'len': lambda v: np.char.str_len(_strings(v)),
+            'flag': self._fn_flag,
+            'usable_by': self._fn_usable_by,
+            'has_class': self._fn_has_class,
+        }
+
+    # ---- functions ----
+    def _fn_contains(self, col, needle):
+        return np.char.find(np.char.lower(_strings(col)), str(needle).lower()) >= 0
+
+    def _fn_startswith(self, col, prefix):
+        return np.char.startswith(_strings(col), str(prefix))
+
+    def _fn_endswith(self, col, suffix):
+        return np.char.endswith(_strings(col), str(suffix))
+
+    def _fn_isin(self, col, values):
+        return np.isin(col, np.asarray(values))
+
+    def _fn_flag(self, *names):
+        """Rows having every named flag (OpFlags or OpFlagsPlus, bitmap index)."""
+        if self._flag_index is None:
+            from .flag_index import ItemFlagIndex
+            self._flag_index = ItemFlagIndex(self.table.rows, self.table.header)
+        mask = np.ones(len(self.table), dtype=bool)
+        for name in names:
+            try:
+                mask &= self._flag_index.mask(str(name))
+            except KeyError as exc:
+                raise QueryError(str(exc))
+        return mask
+
+    def _classes(self):
+        if self._class_index is None:
+            from .class_index import ClassIndex
+            self._class_index = ClassIndex.from_rows(self.table.rows, self.table.header)
+        return self._class_index
+
+    def _fn_usable_by(self, cls):
+        try:
+            return self._classes().usable_by(cls)
+        except KeyError as exc:
+            raise QueryError(str(exc))
+
+    def _fn_has_class(self, cls):
+        try:
+            return self._classes().has_class(cls)
+        except KeyError as exc:
+            raise QueryError(str(exc))
+
+    # ---- nodes ----
+    def eval(self, node):
+        method = getattr(self, '_eval_' + type(node).__name__, None)
+        if method is None:
+            raise QueryError(f'unsupported syntax: {type(node).__name__}')
+        return method(node)
+
+    def _eval_Expression(self, node):
+        return self.eval(node.body)
+
+    def _eval_Constant(self, node):
+        if not isinstance(node.value, (int, float, str, bool)):
+            raise QueryError(f'unsupported constant: {node.value!r}')
+        return node.value
+
+    def _eval_List(self, node):
+        return [self.eval(e) for e in node.elts]
+
+    _eval_Tuple = _eval_List
+
+    def _eval_Name(self, node):
+        if node.id in self.table:
+            return self.table.column(node.id)
+        if node.id in self.constants:
+            return self.constants[node.id]
+        if node.id in ('True', 'False'):
+            return node.id == 'True'
+        raise QueryError(f'unknown name: {node.id}')
+
+    def _eval_UnaryOp(self, node):
+        v = self.eval(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ~_truth(v)
+        if isinstance(node.op, ast.USub):
+            return np.negative(v)
+        if isinstance(node.op, ast.UAdd):
+            return v
+        if isinstance(node.op, ast.Invert):
+            return np.invert(v)
+        raise QueryError(f'unsupported operator: {type(node.op).__name__}')
+
+    def _eval_BinOp(self, node):
+        op = _BINOPS.get(type(node.op))
+        if op is None:
+            raise QueryError(f'unsupported operator: {type(node.op).__name__}')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            try:
+                return op(self.eval(node.left), self.eval(node.right))
+            except TypeError as exc:
+                raise QueryError(str(exc))
+
+    def _eval_BoolOp(self, node):
+        values = [_truth(self.eval(v)) for v in node.values]
+        out = values[0]
+        for v in values[1:]:
+            out = (out & v) if isinstance(node.op, ast.And) else (out | v)
+        return out
+
+    def _eval_Compare(self, node):
+        left = self.eval(node.left)
+        out = None
+        for op, comp in zip(node.ops, node.comparators):
+            right = self.eval(comp)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                res = np.isin(left, np.asarray(right))
+                if isinstance(op, ast.NotIn):
+                    res = ~res
+            else:
+                fn = _CMPOPS.get(type(op))
+                if fn is None:
+                    raise QueryError(f'unsupported comparison: {type(op).__name__}')
+                try:
+                    res = fn(left, right)
+                except TypeError as exc:
+                    raise QueryError(str(exc))
+            res = np.asarray(res, dtype=bool)
+            out = res if out is None else (out & res)
+            left = right
+        return out
+
+    def _eval_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in self.functions:
+            raise QueryError(f'unknown function: {ast.dump(node.func)}')
+        if node.keywords:
+            raise QueryError('keyword arguments are not supported')
+        args = [self.eval(a) for a in node.args]
+        try:
+            return self.functions[node.func.id](*args)
+        except QueryError:
+            raise
+        except (TypeError, ValueError) as exc:
+            raise QueryError(f'{node.func.id}(): {exc}')
+
+
+def _parse(expr) -> ast.AST:
+    if isinstance(expr, ast.AST):
+        return expr
+    try:
+        return ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as exc:
+        raise QueryError(f'invalid expression: {exc.msg}')
+
+
+def compute(table: ItemTable, expr) -> np.ndarray:
+    """Evaluate an expression (text or parsed `ast` node) into one value per row.
+
+    Used for the right-hand side of bulk edits (bulk.py); a constant
+    expression is broadcast to every row.
+    """
+    values = np.asarray(_Evaluator(table).eval(_parse(expr)))
+    if values.ndim == 0:
+        values = np.full(len(table), values.item(), dtype=values.dtype if values.dtype != object else object)
+    return values
+
+
+def evaluate(table: ItemTable, expr: str) -> np.ndarray:
+    """Evaluate a query expression into a boolean row mask."""
+    result = _Evaluator(table).eval(_parse(expr))
+    mask = _truth(result)
+    if mask.ndim == 0:
+        # constant expression: applies to every row
+        mask = np.full(len(table), bool(mask))
+    return mask
+
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+
+def parse_aggs(spec: str) -> List[Tuple[str, str]]:
+    """Parse 'SysPrice:mean,Attack:max,count' into [(column, agg), ...]."""
+    out = []
+    for part in [p.strip() for p in spec.split(',') if p.strip()]:
+        col, _, agg = part.partition(':')
+        if not agg:
+            col, agg = ('', 'count') if col == 'count' else (col, 'sum')
+        if agg not in AGGREGATES:
+            raise QueryError(f'unknown aggregate {agg!r} (use one of {", ".join(AGGREGATES)})')
+        out.append((col, agg))
+    return out
+
+
+def group_stats(table: ItemTable, by: Sequence[str], aggs: Sequence[Tuple[str, str]],
+                mask: Optional[np.ndarray] = None) -> Tuple[List[str], List[list]]:
+    """Group rows by the `by` columns and aggregate. Returns (header, rows) sorted by key.
+
+    Grouping uses np.unique codes per key column; counts and sums are
+    np.bincount, min/max a reduceat over the rows sorted by group.
+    """
+    rows_idx = np.flatnonzero(mask) if mask is not None else np.arange(len(table))
+    n = len(rows_idx)
+    key_values = []
+    codes = np.zeros(n, dtype=np.int64)
+    for name in by:
+        uniq, inv = np.unique(table.column(name)[rows_idx], return_inverse=True)
+        key_values.append(uniq)
+        codes = codes * len(uniq) + inv.reshape(-1)
+    if by:
+        group_codes, gid = np.unique(codes, return_inverse=True)
+        gid = gid.reshape(-1)
+    else:
+        group_codes, gid = np.zeros(1 if n else 0, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    ngroups = len(group_codes)
+    counts = np.bincount(gid, minlength=ngroups)
+
+    order = np.argsort(gid, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]) if ngroups else np.zeros(0, dtype=np.int64)
+
+    header = list(by)
+    columns = []
+    for col, agg in aggs:
+        header.append('count' if agg == 'count' else f'{col}:{agg}')
+        if agg == 'count':
+            columns.append(counts)
+            continue
+        values = table.column(col)[rows_idx]
+        if values.dtype == object:
+            raise QueryError(f'column {col} is not numeric')
+        if agg in ('sum', 'mean'):
+            sums = np.bincount(gid, weights=values.astype(np.float64), minlength=ngroups)
+            if agg == 'mean':
+                columns.append(sums / np.maximum(counts, 1))
+            elif values.dtype.kind in 'iu':
+                columns.append(sums.astype(np.int64))
+            else:
+                columns.append(sums)
+        else:
+            fn = np.minimum if agg == 'min' else np.maximum
+            columns.append(fn.reduceat(values[order], starts) if n else np.zeros(0, dtype=values.dtype))
+
+    out_rows = []
+    for g in range(ngroups):
+        key = []
+        code = int(group_codes[g])
+        for uniq in reversed(key_values):
+            code, k = divmod(code, len(uniq))
+            v = uniq[k]
+            key.append(v.item() if isinstance(v, np.generic) else v)
+        key.reverse()
+        out_rows.append(key + [c[g].item() if isinstance(c[g], np.generic) else c[g] for c in columns])
+    return header, out_rows
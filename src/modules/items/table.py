@@ -0,0 +1,127 @@
+"""Columnar, Qt-free loader for pipe-delimited item tables (C_/S_ Item files).
+
+`load_table` reads a whole file in one go, splits it into logical records
+(a record starts at a line beginning with digits + '|', so multi-line Tip
+fields stay in their record, same rule as `gfio.read_pipe_file`) and keeps
+the rows as lists of strings. `ItemTable.column(name)` converts one column
+to a NumPy array on first use and caches it:
+
+- int64 when every non-empty cell is an integer (empty cells become 0);
+- float64 when every non-empty cell is a number;
+- object (the original strings) otherwise.
+
+Used by the CLI `query` / `stats` commands, which must run on a server box
+without the GUI.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .reader import DEFAULT_HEADER
+
+# a logical record begins where a line starts with an Id followed by '|'
+_RECORD_START = re.compile(r'\r?\n(?=[ \t]*\d+\|)')
+_FIRST_RECORD = re.compile(r'(?m)^[ \t]*\d+\|')
+
+
+def split_records(text: str) -> Tuple[Optional[str], List[str]]:
+    """Split file text into (first non-record line or None, logical records)."""
+    m = _FIRST_RECORD.search(text)
+    if m is None:
+        return None, []
+    head = text[:m.start()].strip()
+    records = [rec.rstrip('\r\n') for rec in _RECORD_START.split(text[m.start():])]
+    return (head.splitlines()[0] if head else None), [rec for rec in records if rec]
+
+
+def infer_column(values: Sequence[str]) -> np.ndarray:
+    """Convert a column of strings to int64, float64 or object (see module doc)."""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        pass
+    cleaned = [v.strip() or '0' for v in values]
+    for dtype in (np.int64, np.float64):
+        try:
+            return np.array(cleaned, dtype=dtype)
+        except (ValueError, TypeError, OverflowError):
+            continue
+    return np.array(values, dtype=object)
+
+
+class ItemTable:
+    """Rows of an item file plus lazily built typed NumPy columns."""
+
+    def __init__(self, header: Sequence[str], rows: List[List[str]], path: Optional[str] = None):
+        self.header = list(header)
+        self.rows = rows
+        self.path = path
+        self._pos = {name: i for i, name in enumerate(self.header)}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, name) -> bool:
+        return name in self._pos
+
+    def index_of(self, name: str) -> int:
+        try:
+            return self._pos[name]
+        except KeyError:
+            raise KeyError(f'unknown column: {name}')
+
+    def raw(self, name: str) -> List[str]:
+        """The column as the original strings."""
+        i = self.index_of(name)
+        return [r[i] for r in self.rows]
+
+    def column(self, name: str) -> np.ndarray:
+        """The column as a typed NumPy array (cached)."""
+        col = self._columns.get(name)
+        if col is None:
+            col = infer_column(self.raw(name))
+            self._columns[name] = col
+        return col
+
+    def value(self, row: int, name: str):
+        """One cell, typed like its column (int/float/str)."""
+        col = self.column(name)
+        v = col[row]
+        return v.item() if isinstance(v, np.generic) else v
+
+
+def load_table(path: str, encoding: str = 'big5', header: Optional[Sequence[str]] = None) -> ItemTable:
+    """Read a pipe-delimited item file into an ItemTable.
+
+    The header is, in order: the `header` argument; the file's first line
+    when it is not a record and has as many fields as most records;
+    DEFAULT_HEADER for 93-column files; otherwise generic names c0..cN.
+    """
+    with open(path, 'rb') as f:
+        text = f.read().decode(encoding, errors='replace')
+
+    file_header, records = split_records(text)
+    rows = [rec.split('|') for rec in records]
+    # most common field count; stray trailing '|' on a few records must not change the layout
+    width = Counter(len(r) for r in rows).most_common(1)[0][0] if rows else 0
+
+    if header is None and file_header is not None:
+        fields = file_header.split('|')
+        if len(fields) == width:
+            header = [f.strip() for f in fields]
+    if header is None:
+        header = DEFAULT_HEADER if width == len(DEFAULT_HEADER) else [f'c{i}' for i in range(width)]
+    width = len(header)
+
+    for r in rows:
+        if len(r) < width:
+            r.extend([''] * (width - len(r)))
+        elif len(r) > width:
+            del r[width:]
+        # the Id may carry the indentation of its line
+        if r[0][:1] in (' ', '\t'):
+            r[0] = r[0].strip()
+    return ItemTable(header, rows, path)
@@ -0,0 +1,61 @@
+"""Tests for bulk edits (set ... where ...)."""
+
+import pytest
+
+from document import RowDocument
+from journal import Journal
+from modules.items import bulk
+from modules.items.query import QueryError
+from modules.items.table import ItemTable
+
+HEADER = ['Id', 'Name', 'ItemType', 'ItemQuality', 'SysPrice', 'OpFlags', 'Rate']
+
+
+def _rows():
+    return [
+        ['1', 'Sword', '7', '5', '1000', '0', '0.5'],
+        ['2', 'Bow', '8', '3', '200', '4', '1'],
+        ['3', 'Ring', '8', '6', '', '0', ''],
+        ['4', 'Cap', '2', '9', '50', '0', '2'],
+    ]
+
+
+def test_plan_formats_by_column_and_skips_unchanged_cells():
+    rows = _rows()
+    p = bulk.plan(ItemTable(HEADER, rows), 'set SysPrice = SysPrice * 1.15 where ItemType in (7, 8) and ItemQuality >= 5')
+    # the empty price reads as 0 and stays 0: not touched; integer column stays integer
+    assert list(p.preview()) == [(0, 'SysPrice', '1000', '1150')]
+    assert p.matched == 2 and rows[0][4] == '1000'
+
+    p = bulk.plan(ItemTable(HEADER, rows), "set OpFlags |= NoTrade, Rate = Rate * 3, Name = 'X' where ItemType == 8")
+    # OpFlags of row 1 already has NoTrade (4); the empty Rate of row 2 stays 0
+    assert sorted(p.preview()) == [(1, 'Name', 'Bow', 'X'), (1, 'Rate', '1', '3'),
+                                   (2, 'Name', 'Ring', 'X'), (2, 'OpFlags', '0', '4')]
+    assert p.rows() == [1, 2]
+
+    with pytest.raises(QueryError):
+        bulk.plan(ItemTable(HEADER, rows), 'set Nope = 1')
+    with pytest.raises(QueryError):
+        bulk.parse_statement('SysPrice = 1')
+    for statement in ("set SysPrice = 'abc'", 'set SysPrice = Name'):
+        with pytest.raises(QueryError):
+            bulk.plan(ItemTable(HEADER, rows), statement)
+
+
+def test_apply_marks_rows_dirty_and_inverse_undoes(tmp_path):
+    rows = _rows()
+    doc = RowDocument(rows)
+    doc.journal = Journal(tmp_path / 'C_Item.ini')
+    seen = []
+    # the autosave hook runs once, with every cell of the edit already written
+    doc.journal.on_append = lambda count: seen.append((count, [r[4] for r in rows]))
+    p = bulk.plan(ItemTable(HEADER, rows), 'set SysPrice += 10, Rate = Rate / 4 where ItemQuality > 4')
+    assert bulk.apply(p, rows, doc) == (5, 0)
+    assert seen == [(5, ['1010', '200', '10', '60'])]
+    doc.journal.on_append = None
+    assert [r[4] for r in rows] == ['1010', '200', '10', '60'] and rows[3][6] == '0.5'
+    assert sorted(doc.dirty) == [0, 2, 3]
+
+    doc.set_cell(3, 4, '99')            # edited after the bulk edit: the undo keeps it
+    assert bulk.apply(p.inverse(), rows, doc) == (4, 1)
+    assert [r[4] for r in rows] == ['1000', '200', '', '99'] and rows[3][6] == '2'
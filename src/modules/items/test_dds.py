@@ -0,0 +1,72 @@
+"""Tests for the built-in DDS decoder."""
+
+import struct
+
+import pytest
+
+from dds import decode_dds, DDSError, DDPF_FOURCC, DDPF_RGB, DDPF_ALPHAPIXELS
+
+
+def make_dds(width, height, payload, fourcc=b'', pf_flags=DDPF_FOURCC, bitcount=0, masks=(0, 0, 0, 0), pitch=0):
+    """Build a minimal DDS file around a raw surface payload."""
+    header = struct.pack('<7I', 124, 0x1007, height, width, pitch, 0, 1) + b'\0' * 44
+    pixel_format = struct.pack('<II4sI4I', 32, pf_flags, fourcc.ljust(4, b'\0'), bitcount, *masks)
+    caps = struct.pack('<4I', 0x1000, 0, 0, 0) + b'\0' * 4
+    return b'DDS ' + header + pixel_format + caps + payload
+
+
+def pixels(data):
+    return [tuple(data[i:i + 4]) for i in range(0, len(data), 4)]
+
+
+def test_dxt1_four_colour_block():
+    # c0 = pure red, c1 = pure blue, row 0 uses codes 0,1,2,3; other rows code 0
+    block = struct.pack('<HHI', 0xF800, 0x001F, 0b11100100)
+    w, h, data = decode_dds(make_dds(4, 4, block, b'DXT1'))
+    px = pixels(data)
+    assert (w, h) == (4, 4)
+    assert px[0] == (255, 0, 0, 255)
+    assert px[1] == (0, 0, 255, 255)
+    assert px[2] == (170, 0, 85, 255)
+    assert px[3] == (85, 0, 170, 255)
+    assert px[4] == (255, 0, 0, 255)
+
+
+def test_dxt1_transparent_mode():
+    # c0 <= c1 selects 3-colour mode where code 3 is transparent black
+    block = struct.pack('<HHI', 0x001F, 0xF800, 0xFFFFFFFF)
+    _, _, data = decode_dds(make_dds(4, 4, block, b'DXT1'))
+    assert set(pixels(data)) == {(0, 0, 0, 0)}
+
+
+def test_dxt5_alpha_and_crop():
+    # 2x2 image still uses a full block; alpha code 1 everywhere -> a1
+    alpha = bytes([255, 64]) + (0x249249249249).to_bytes(6, 'little')
+    colour = struct.pack('<HHI', 0xFFFF, 0x0000, 0)
+    w, h, data = decode_dds(make_dds(2, 2, alpha + colour, b'DXT5'))
+    assert (w, h) == (2, 2)
+    assert pixels(data) == [(255, 255, 255, 64)] * 4
+
+
+def test_dxt3_explicit_alpha():
+    alpha = (0xF).to_bytes(8, 'little')
+    colour = struct.pack('<HHI', 0x07E0, 0x0000, 0)
+    _, _, data = decode_dds(make_dds(4, 4, alpha + colour, b'DXT3'))
+    px = pixels(data)
+    assert px[0] == (0, 255, 0, 255)
+    assert px[1] == (0, 255, 0, 0)
+
+
+def test_uncompressed_bgra():
+    masks = (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)
+    payload = bytes([1, 2, 3, 4]) * 4  # stored B, G, R, A
+    w, h, data = decode_dds(make_dds(2, 2, payload, pf_flags=DDPF_RGB | DDPF_ALPHAPIXELS,
+                                     bitcount=32, masks=masks, pitch=8))
+    assert pixels(data) == [(3, 2, 1, 4)] * 4
+
+
+def test_rejects_non_dds():
+    with pytest.raises(DDSError):
+        decode_dds(b'PNG not a dds' + b'\0' * 200)
+    with pytest.raises(DDSError):
+        decode_dds(make_dds(4, 4, b'\0' * 8, b'ATI2'))
@@ -1,10 +1,14 @@
 """Examples and tests for item flags decoding."""
 
+import numpy as np
+
 from flags import (
     decode_flags, decode_flags_plus, encode_flags, encode_flags_plus,
     get_quality_name, get_item_type_name, get_target_name,
     FLAGS, FLAGS_PLUS, QUALITY, ITEM_TYPE, TARGET
 )
+from modules.items.flag_index import ItemFlagIndex
+from modules.items.class_index import ClassIndex
 
 
 def test_decode_flags():
@@ -54,6 +58,38 @@ def test_target():
         print(f"Target {target_id}: {name}")
 
 
+def test_flag_index_matches_scalar_decode():
+    """Bulk bitmaps agree with decode_flags / decode_flags_plus."""
+    values = [0, 133, 2031616 | 4, 16 | 21, -1, 7, 384 | 512]
+    rows = [[str(i)] + [''] * 11 + [str(v), str(v & 0xFFFFFF)] for i, v in enumerate(values)]
+    rows[3][12] = 'bad'
+    index = ItemFlagIndex(rows)
+    assert index.flags.decode_all()[:3] == [decode_flags(0), decode_flags(133), decode_flags(2031616 | 4)]
+    assert index.flags.decode(3) == []
+    assert index.flags_plus.decode_all()[6] == decode_flags_plus(384 | 512)
+    assert index.select(all_of=['NoTrade', 'BindOnEquip']).tolist() == [1, 4]
+    assert index.select(any_of=['Only'], none_of=['UnBindItem']).tolist() == [2]
+    assert index.select(all_of=['VIP', 'CanUse']).tolist() == [4]
+    assert index.count('NoTrade') == 4 and index.counts()['CanUse'] == 3
+
+
+def test_class_index_queries_and_counts():
+    """RestrictClass masks over 128 bits: usable_by / exactly / per-class counts."""
+    from flags import class_names_to_mask, parse_restrict_class
+    both = class_names_to_mask(['Lutador', 'Cronos'])
+    values = ['', f'0x{both:X} / {both}', '2', 'zz', hex(1 << 100)[2:], '0x2']
+    assert parse_restrict_class(values[1]) == both
+    index = ClassIndex(values)
+    assert index.mask(1) == both and index.mask(4) == 1 << 100
+    assert np.flatnonzero(index.usable_by('Lutador')).tolist() == [0, 1, 2, 3, 5]
+    assert np.flatnonzero(index.usable_by(61, include_unrestricted=False)).tolist() == [1]
+    assert np.flatnonzero(index.exactly(['Lutador'])).tolist() == [2, 5]
+    assert np.flatnonzero(index.has_class(100)).tolist() == [4]
+    counts = index.counts()
+    assert counts['Lutador'] == 3 and counts['Cronos'] == 1 and counts['Mago'] == 0
+    assert index.class_count_per_row().tolist() == [0, 2, 1, 0, 1, 1]
+
+
 def print_all_flags():
     """Print all available flags."""
     print("\n=== ALL FLAGS ===")
@@ -0,0 +1,112 @@
+"""Tests for the persistent icon thumbnail cache, the icon directory index and the atlas."""
+
+import os
+import struct
+import zlib
+
+from modules.items.icon_cache import IconCache, scale_rgba, encode_png
+from modules.items.icon_atlas import IconAtlas, build_atlas
+from modules.items.icon_index import IconIndex
+
+
+def write_icon(path, colour=(255, 0, 0, 255), size=8):
+    """Write an uncompressed 32-bit DDS icon filled with one colour."""
+    header = struct.pack('<7I', 124, 0x100F, size, size, size * 4, 0, 1) + b'\0' * 44
+    pf = struct.pack('<II4sI4I', 32, 0x41, b'\0' * 4, 32, 0xFF, 0xFF00, 0xFF0000, 0xFF000000)
+    caps = struct.pack('<4I', 0x1000, 0, 0, 0) + b'\0' * 4
+    path.write_bytes(b'DDS ' + header + pf + caps + bytes(colour) * size * size)
+
+
+def test_scale_keeps_aspect_and_colour():
+    w, h, data = scale_rgba(4, 2, bytes([10, 20, 30, 255]) * 8, size=200)
+    assert (w, h) == (200, 100)
+    assert set(data[i:i + 4] for i in range(0, len(data), 4)) == {bytes([10, 20, 30, 255])}
+
+
+def test_encode_png_is_valid():
+    png = encode_png(2, 1, bytes([1, 2, 3, 4, 5, 6, 7, 8]))
+    assert png.startswith(b'\x89PNG\r\n\x1a\n')
+    idat = png[png.index(b'IDAT') + 4:png.index(b'IEND') - 8]
+    assert zlib.decompress(idat) == bytes([0, 1, 2, 3, 4, 5, 6, 7, 8])
+
+
+def test_hit_miss_and_invalidation(tmp_path):
+    icon = tmp_path / 'a.dds'
+    write_icon(icon)
+    cache = IconCache(tmp_path / 'cache')
+    assert cache.lookup(icon) is None
+    thumb = cache.get_or_create(icon)
+    assert thumb is not None and thumb.exists()
+    assert cache.lookup(icon) == thumb
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # a changed icon (new mtime/size) gets a new key
+    write_icon(icon, size=16)
+    st = icon.stat()
+    os.utime(icon, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.lookup(icon) is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = IconCache(tmp_path / 'cache', max_bytes=10 ** 9)
+    icons = []
+    for i in range(4):
+        icon = tmp_path / f'{i}.dds'
+        write_icon(icon)
+        icons.append(icon)
+        thumb = cache.get_or_create(icon)
+        os.utime(thumb, (1000 + i, 1000 + i))
+    # a hit on the oldest thumbnail makes it the most recently used
+    one = cache.lookup(icons[0]).stat().st_size
+    removed = cache.evict(target_bytes=one * 2)
+    assert removed == 2
+    assert cache.lookup(icons[0]) is not None
+    assert cache.lookup(icons[3]) is not None
+    assert cache.lookup(icons[1]) is None
+    assert cache.stats()['evictions'] == 2
+    # kept keys survive even when the cache stays over the target
+    assert cache.evict(target_bytes=0, keep=[cache.key_for(icons[3])]) == 1
+    assert cache.contains(icons[3]) and cache.stats()['bytes'] == one
+
+
+def test_index_resolves_case_and_extension(tmp_path):
+    (tmp_path / 'Sword01.DDS').write_bytes(b'x')
+    (tmp_path / 'sword01.png').write_bytes(b'x')
+    (tmp_path / 'shield.png').write_bytes(b'x')
+    index = IconIndex(tmp_path)
+    assert index.resolve('sword01').name == 'Sword01.DDS'
+    assert index.resolve('SWORD01.dds').name == 'Sword01.DDS'
+    assert index.resolve('sword01.png').name == 'sword01.png'
+    assert index.resolve('Shield.dds').name == 'shield.png'
+    assert index.missing(['shield', 'bow', '', 'bow', 'axe.dds']) == ['bow', 'axe.dds']
+
+    (tmp_path / 'bow.dds').write_bytes(b'x')
+    index.refresh()
+    assert index.resolve('bow') is not None
+
+
+def test_atlas_pages_views_and_staleness(tmp_path):
+    icons = []
+    for i, size in enumerate((8, 16, 8, 16, 8)):
+        icon = tmp_path / f'Icon{i}.dds'
+        write_icon(icon, colour=(i * 40, 10, 20, 255), size=size)
+        icons.append(icon)
+    out = tmp_path / 'cache' / 'icons.atlas'
+    stats = build_atlas(icons, out, cell=8, page_size=16)
+    assert stats['icons'] == 5 and stats['pages'] == 2 and not stats['failed']
+
+    atlas = IconAtlas(out)
+    assert len(atlas) == 5 and 'icon3' in atlas
+    assert atlas.is_scaled('icon1.dds') and not atlas.is_scaled('ICON2')
+    w, h, data = atlas.rgba('icon4', icons[4])
+    assert (w, h) == (8, 8) and data == bytes((160, 10, 20, 255)) * 64
+    buf, w, h, stride = atlas.view('icon0.dds')
+    assert stride == 16 * 4 and bytes(buf[:4]) == bytes((0, 10, 20, 255))
+
+    write_icon(icons[4], size=16)
+    st = icons[4].stat()
+    os.utime(icons[4], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    # source checks are memoized until the directory watcher calls forget_checks()
+    atlas.forget_checks()
+    assert atlas.view('icon4', icons[4]) is None
+    atlas.close()
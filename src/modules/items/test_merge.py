@@ -0,0 +1,55 @@
+"""Tests for the three-way item table merge."""
+
+import gfio
+from modules.items.merge import merge_files, merge_spans
+from modules.items.writer import write_encoded_pair
+
+
+def _spans(lines, nl=b'\r\n'):
+    return gfio.scan_records(nl.join(lines) + nl)
+
+
+def _merge(base, ours, theirs, **kw):
+    res = merge_spans(_spans(base), _spans(ours), _spans(theirs), **kw)
+    return b''.join(res.chunks), res
+
+
+def test_one_sided_changes_are_copied_and_fields_merge():
+    base = [b'1|a|x|0', b'2|b|y|0', b'3|c|z|0']
+    ours = [b'1|a|x|0', b'2|B|y|0', b'3|c|z|0']
+    theirs = [b'1|a|x|5', b'2|b|y|7', b'3|c|z|0']
+    out, res = _merge(base, ours, theirs)
+    assert out == b'1|a|x|5\r\n2|B|y|7\r\n3|c|z|0\r\n'
+    assert res.conflicts == [] and res.stats['merged'] == 1 and res.stats['theirs'] == 1
+
+    # theirs == base: ours comes out byte for byte
+    out, res = _merge(base, ours, base)
+    assert out == b'\r\n'.join(ours) + b'\r\n' and res.stats['unchanged'] == 2
+
+
+def test_conflicts_adds_and_deletes():
+    base = [b'1|a|x', b'2|b|y', b'3|c|z', b'4|d|w', b'5|e|v']
+    ours = [b'1|A|x', b'2|b|Y', b'4|d|w', b'5|e|v', b'8|new|o']  # deletes 3, modifies 2
+    theirs = [b'1|T|x', b'9|ins|t', b'4|d|w']                    # deletes 2, 3 and 5, adds 9 after 1
+    out, res = _merge(base, ours, theirs, prefer='theirs')
+    assert out == b'1|T|x\r\n9|ins|t\r\n2|b|Y\r\n4|d|w\r\n8|new|o\r\n'
+    assert [(c.id, c.column, c.kind, c.base, c.ours, c.theirs) for c in res.conflicts] == [
+        ('1', 'IconFilename', 'field', 'a', 'A', 'T'),
+        ('2', '*', 'modify/delete', '', '', ''),
+    ]
+    assert res.stats['added'] == 2 and res.stats['deleted'] == 1
+
+
+def test_merge_files_writes_identical_pair(tmp_path):
+    paths = {}
+    for name, lines in (('base', [b'1|a', b'2|b']), ('ours', [b'1|a', b'2|b', b'3|c']),
+                        ('theirs', [b'1|z', b'2|b'])):
+        paths[name] = tmp_path / f'{name}.ini'
+        paths[name].write_bytes(b'\n'.join(lines) + b'\n')
+    client, server = tmp_path / 'C_Item.ini', tmp_path / 'S_Item.ini'
+    # output over an input: that input is read instead of mapped
+    res = merge_files(str(paths['base']), str(paths['ours']), str(paths['theirs']),
+                      output_paths=[str(paths['ours'])])
+    write_encoded_pair(res.chunks, str(client), str(server))
+    res.close()
+    assert client.read_bytes() == server.read_bytes() == b'1|z\n2|b\n3|c\n'
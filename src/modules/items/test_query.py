@@ -0,0 +1,62 @@
+"""Tests for the columnar table loader and the query / stats engine."""
+
+import numpy as np
+import pytest
+
+from modules.items.query import QueryError, evaluate, group_stats, parse_aggs
+from modules.items.table import load_table
+
+
+def write_table(path, records):
+    """Write 93-column records (dicts of column index -> value) as a Big5 item file."""
+    lines = []
+    for rec in records:
+        row = ['0'] * 93
+        for i, v in rec.items():
+            row[i] = str(v)
+        lines.append('|'.join(row))
+    path.write_bytes('\r\n'.join(lines).encode('big5'))
+
+
+@pytest.fixture
+def table(tmp_path):
+    p = tmp_path / 'C_Item.ini'
+    write_table(p, [
+        {0: 1, 9: '\u9577\u528d', 10: 7, 12: 4 | 128, 24: 3, 83: 100, 92: 'line1\nline2'},
+        {0: 2, 9: 'Sword', 10: 7, 12: 4, 24: 3, 83: 300, 23: '0x2 / 2'},
+        {0: 3, 9: 'Shield', 10: 17, 12: 0, 24: 6, 83: ''},
+        {0: 4, 9: 'Bow', 10: 13, 12: 128, 24: 6, 83: 50, 23: 'zz'},
+    ])
+    return load_table(str(p))
+
+
+def test_load_table_types_and_multiline(table):
+    assert len(table) == 4 and table.header[83] == 'SysPrice'
+    assert table.column('SysPrice').dtype == np.int64
+    assert table.column('SysPrice').tolist() == [100, 300, 0, 50]
+    assert table.column('Name').dtype == object and table.value(0, 'Name') == '\u9577\u528d'
+    assert table.rows[0][92] == 'line1\nline2'
+
+
+def test_evaluate_expressions(table):
+    def ids(expr):
+        return table.column('Id')[evaluate(table, expr)].tolist()
+
+    assert ids('ItemType == 7 and SysPrice > 150') == [2]
+    assert ids('(OpFlags & NoTrade) and not (OpFlags & BindOnEquip)') == [2]
+    assert ids("flag('BindOnEquip') or contains(Name, 'shi')") == [1, 3, 4]
+    assert ids('ItemQuality in [6] and 0 < SysPrice <= 50') == [4]
+    assert ids("usable_by('Lutador')") == [1, 2, 3, 4]
+    assert ids("has_class(1)") == [2]
+    assert ids('True') == [1, 2, 3, 4]
+    for bad in ("__import__('os')", 'Name.upper()', 'Unknown > 1', 'SysPrice >'):
+        with pytest.raises(QueryError):
+            evaluate(table, bad)
+
+
+def test_group_stats(table):
+    header, rows = group_stats(table, ['ItemQuality'], parse_aggs('count,SysPrice:mean,SysPrice:max'))
+    assert header == ['ItemQuality', 'count', 'SysPrice:mean', 'SysPrice:max']
+    assert rows == [[3, 2, 200.0, 300], [6, 2, 25.0, 50]]
+    mask = evaluate(table, 'ItemType == 7')
+    assert group_stats(table, [], parse_aggs('SysPrice:sum'), mask)[1] == [[400]]
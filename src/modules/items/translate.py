@@ -3,6 +3,7 @@ import tempfile, shutil, io, re
 from typing import Optional, Tuple, List
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTextEdit, QPushButton, QHBoxLayout, QDialog, QFormLayout, QMessageBox, QSizePolicy
 from PySide6.QtCore import Qt
+import instrument
 
 class TranslateFile:
     def __init__(self, path: Path):
@@ -160,6 +161,7 @@ def load_translate(lib_base: Optional[Path], translate_name: str) -> TranslateFi
     p = _resolve_path(lib_base, translate_name)
     return TranslateFile(p)
 
+@instrument.traced('items.translate_lookup', cat='io')
 def get_translation(translate_name: str, item_id: str, lib_base: Optional[Path] = None) -> Optional[Tuple[str, str]]:
     tf = load_translate(lib_base, translate_name)
     return tf.get(item_id)
@@ -287,6 +289,7 @@ def create_tab_translate(rows, header, state):
     tab.btn_create.clicked.connect(on_create_clicked)
     return tab
 
+@instrument.traced('items.update_tab_translate', cat='render')
 def update_tab_translate(tab, row, header, state):
     try:
         item_id = None
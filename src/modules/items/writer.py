@@ -1,34 +1,48 @@
-import os
 import csv
+import io
 from typing import List
 
+try:
+    from ... import gfio as _gfio
+except ImportError:
+    import gfio as _gfio
 
-def _ensure_dir(path: str) -> None:
-    d = os.path.dirname(path)
-    if d and not os.path.exists(d):
-        os.makedirs(d, exist_ok=True)
 
+def encode_items(header: List[str], rows: List[List[str]], delimiter: str = '|', encoding: str = 'big5') -> bytes:
+    """Serialize header and rows (csv, padded/truncated to the header width) and encode once."""
+    buf = io.StringIO(newline='')
+    writer = csv.writer(buf, delimiter=delimiter)
+    writer.writerow(header)
+    width = len(header)
+    for row in rows:
+        # make sure row has same length
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        elif len(row) > width:
+            row = row[:width]
+        writer.writerow(row)
+    return buf.getvalue().encode(encoding)
 
-def write_items_pair(header: List[str], rows: List[List[str]], client_path: str, server_path: str, delimiter: str = '|', encoding: str = 'big5') -> None:
+
+def write_items_pair(header: List[str], rows: List[List[str]], client_path: str, server_path: str, delimiter: str = '|',
+                     encoding: str = 'big5', fsync: bool = False, progress=None) -> None:
     """Write header and rows to two files (client and server).
 
     Note: client/server item files are expected to be encoded in BIG5;
     this function defaults to `encoding='big5'` for that reason.
 
-    The same content is written to both paths so C_ and S_ remain identical.
+    The same content is written to both paths so C_ and S_ remain identical:
+    it is encoded once and both files are written concurrently, each through
+    a temp file + rename (see gfio.write_targets for fsync/progress).
+    """
+    data = encode_items(header, rows, delimiter=delimiter, encoding=encoding)
+    write_encoded_pair(data, client_path, server_path, fsync=fsync, progress=progress)
+
+
+def write_encoded_pair(data, client_path: str, server_path: str, fsync: bool = False, progress=None) -> None:
+    """Write already encoded file content (bytes or a list of chunks) to the client/server pair.
+
+    Same guarantees as write_items_pair; used when records are copied byte
+    for byte (e.g. merge.py) instead of being re-serialized.
     """
-    # Ensure directories exist
-    _ensure_dir(client_path)
-    _ensure_dir(server_path)
-
-    for path in (client_path, server_path):
-        with open(path, 'w', encoding=encoding, newline='') as f:
-            writer = csv.writer(f, delimiter=delimiter)
-            writer.writerow(header)
-            for row in rows:
-                # make sure row has same length
-                if len(row) < len(header):
-                    row = row + [''] * (len(header) - len(row))
-                elif len(row) > len(header):
-                    row = row[:len(header)]
-                writer.writerow(row)
+    _gfio.write_targets([client_path, server_path], data, fsync=fsync, progress=progress)
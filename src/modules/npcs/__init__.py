@@ -8,6 +8,14 @@ def list_entries(lib_path: Path) -> List[str]:
     return [p.name for p in data_dir.glob('*Npc*.ini')]
 
 
+def register():
+    return {
+        'name': 'Npcs',
+        'patterns': ['*Npc*.ini'],
+        'capabilities': ['panel', 'list_entries'],
+    }
+
+
 def panel_widget(parent):
     from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
     w = QWidget(parent)
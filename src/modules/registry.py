@@ -0,0 +1,210 @@
+"""Module registry: cached metadata for the GUI modules under src/modules.
+
+Each module package may expose `register()` (see docs/plugins.md) returning
+its metadata:
+
+    def register():
+        return {
+            'name': 'Items',
+            'patterns': ['C_Item*.ini', 'S_Item*.ini'],
+            'capabilities': ['panel', 'read', 'write'],
+            'warmup': ['modules.items.panel'],   # submodules worth preloading
+        }
+
+`ModuleRegistry.discover()` keeps that metadata in a JSON manifest (per-user
+cache directory) keyed by the size/mtime of each package's __init__.py, so a
+normal startup only stats files: a package is imported to call register()
+only when it is new or its __init__.py changed. Module code is otherwise
+imported when its panel is first opened (`panel()`), or ahead of time by
+`warm_up()` once the window is on screen.
+"""
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatch
+from importlib import import_module
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Dict, List, Optional
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = 'modules_manifest.json'
+
+
+def default_manifest_path() -> Path:
+    """Per-user cache location of the manifest (LOCALAPPDATA on Windows, XDG cache elsewhere)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = str(Path.home() / '.cache')
+    return Path(base) / 'GFEditor' / MANIFEST_NAME
+
+
+@dataclass
+class ModuleInfo:
+    key: str
+    name: str
+    package: str
+    patterns: List[str] = field(default_factory=list)
+    capabilities: List[str] = field(default_factory=list)
+    warmup: List[str] = field(default_factory=list)
+    fingerprint: List[int] = field(default_factory=list)
+
+
+def _fingerprint(pkg_dir: Path) -> Optional[List[int]]:
+    try:
+        st = (pkg_dir / '__init__.py').stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _as_list(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+class ModuleRegistry:
+    """Discover module packages, cache their metadata and load them on demand."""
+
+    def __init__(self, modules_dir, package: str = 'modules', manifest_path=None):
+        self.modules_dir = Path(modules_dir)
+        self.package = package
+        self.manifest_path = Path(manifest_path) if manifest_path else default_manifest_path()
+        self.infos: List[ModuleInfo] = []
+        self.imported: List[str] = []   # packages imported by the last discover() (cache misses)
+        self._panels: Dict[str, Any] = {}
+
+    # --- manifest -------------------------------------------------------
+    def _read_manifest(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION or data.get('modules_dir') != str(self.modules_dir):
+            return {}
+        return data.get('modules') or {}
+
+    def _write_manifest(self) -> None:
+        payload = {
+            'version': MANIFEST_VERSION,
+            'modules_dir': str(self.modules_dir),
+            'modules': {info.key: asdict(info) for info in self.infos},
+        }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.manifest_path.parent), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(payload, fh, indent=1)
+            os.replace(tmp, self.manifest_path)
+        except OSError:
+            # cache only: a read-only profile just means re-reading metadata next time
+            pass
+
+    def _describe(self, key: str, fingerprint: List[int]) -> ModuleInfo:
+        """Import the package and build its ModuleInfo from register() (or defaults)."""
+        package = f'{self.package}.{key}'
+        meta: Dict[str, Any] = {}
+        caps: List[str] = []
+        try:
+            mod = import_module(package)
+            self.imported.append(package)
+            if hasattr(mod, 'register'):
+                meta = dict(mod.register() or {})
+            elif hasattr(mod, 'panel_widget'):
+                caps.append('panel')
+        except Exception:
+            pass
+        return ModuleInfo(
+            key=key,
+            name=str(meta.get('name') or key.capitalize()),
+            package=package,
+            patterns=_as_list(meta.get('patterns')),
+            capabilities=_as_list(meta.get('capabilities')) or caps,
+            warmup=_as_list(meta.get('warmup')),
+            fingerprint=fingerprint,
+        )
+
+    def discover(self) -> List[ModuleInfo]:
+        """Scan modules_dir, reusing cached metadata for unchanged packages."""
+        cached = self._read_manifest()
+        self.imported = []
+        infos = []
+        changed = False
+        if self.modules_dir.is_dir():
+            for p in sorted(self.modules_dir.iterdir()):
+                if not p.is_dir() or p.name.startswith(('_', '.')):
+                    continue
+                fp = _fingerprint(p)
+                if fp is None:
+                    continue
+                entry = cached.get(p.name)
+                if entry is not None and entry.get('fingerprint') == fp:
+                    try:
+                        infos.append(ModuleInfo(**entry))
+                        continue
+                    except TypeError:
+                        pass
+                infos.append(self._describe(p.name, fp))
+                changed = True
+        self.infos = infos
+        if changed or set(cached) != {i.key for i in infos}:
+            self._write_manifest()
+        return infos
+
+    # --- lookup / loading -----------------------------------------------
+    def get(self, key: str) -> Optional[ModuleInfo]:
+        for info in self.infos:
+            if info.key == key:
+                return info
+        return None
+
+    def match(self, filename: str) -> Optional[ModuleInfo]:
+        """The first module whose file patterns match filename (case-insensitive)."""
+        name = Path(filename).name.lower()
+        for info in self.infos:
+            if any(fnmatch(name, pat.lower()) for pat in info.patterns):
+                return info
+        return None
+
+    def load(self, key: str):
+        """Import and return the module package."""
+        info = self.get(key)
+        if info is None:
+            raise KeyError(key)
+        return import_module(info.package)
+
+    def panel(self, key: str, parent=None):
+        """Return the module's panel widget, created on first use and reused afterwards.
+
+        Returns None if the module has no panel_widget.
+        """
+        if key in self._panels:
+            return self._panels[key]
+        mod = self.load(key)
+        factory = getattr(mod, 'panel_widget', None)
+        if factory is None:
+            return None
+        widget = factory(parent)
+        self._panels[key] = widget
+        return widget
+
+    def has_panel(self, key: str) -> bool:
+        return key in self._panels
+
+    def warm_up(self, keys) -> List[str]:
+        """Import the given modules and their declared warm-up submodules. Returns what was imported."""
+        done = []
+        for key in keys:
+            info = self.get(key)
+            if info is None:
+                continue
+            for name in [info.package] + info.warmup:
+                try:
+                    import_module(name)
+                    done.append(name)
+                except Exception:
+                    pass
+        return done
@@ -0,0 +1,53 @@
+"""Tests for the cached module registry."""
+
+import sys
+
+from modules.registry import ModuleRegistry
+
+
+def _make_pkg(root, name, body=''):
+    d = root / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / '__init__.py').write_text(body, encoding='utf-8')
+    return d
+
+
+def test_manifest_cache_and_lazy_panels(tmp_path, monkeypatch):
+    pkgs = tmp_path / 'src'
+    _make_pkg(pkgs, 'regmods')
+    _make_pkg(pkgs / 'regmods', 'alpha',
+              "def register():\n"
+              "    return {'name': 'Alpha', 'patterns': ['A_*.ini'], 'capabilities': ['panel'], "
+              "'warmup': ['regmods.alpha.extra']}\n"
+              "def panel_widget(parent):\n"
+              "    return object()\n")
+    (pkgs / 'regmods' / 'alpha' / 'extra.py').write_text('X = 1\n', encoding='utf-8')
+    _make_pkg(pkgs / 'regmods', 'beta', "def panel_widget(parent):\n    return object()\n")
+    monkeypatch.syspath_prepend(str(pkgs))
+    manifest = tmp_path / 'manifest.json'
+
+    def fresh():
+        for m in [m for m in sys.modules if m.startswith('regmods')]:
+            del sys.modules[m]
+        reg = ModuleRegistry(pkgs / 'regmods', package='regmods', manifest_path=manifest)
+        reg.discover()
+        return reg
+
+    reg = fresh()
+    assert [i.name for i in reg.infos] == ['Alpha', 'Beta']
+    assert reg.get('beta').capabilities == ['panel']
+    assert sorted(reg.imported) == ['regmods.alpha', 'regmods.beta']
+    assert reg.match('a_thing.INI').key == 'alpha' and reg.match('x.ini') is None
+
+    # second start: metadata from the manifest, nothing imported
+    reg = fresh()
+    assert reg.imported == [] and 'regmods.alpha' not in sys.modules
+    assert reg.get('alpha').warmup == ['regmods.alpha.extra']
+    panel = reg.panel('alpha')
+    assert reg.panel('alpha') is panel and 'regmods.alpha' in sys.modules
+    assert reg.warm_up(['beta', 'alpha']) == ['regmods.beta', 'regmods.alpha', 'regmods.alpha.extra']
+
+    # only the edited package is re-read
+    _make_pkg(pkgs / 'regmods', 'beta', "def register():\n    return {'name': 'Beta 2'}\n")
+    reg = fresh()
+    assert reg.imported == ['regmods.beta'] and reg.get('beta').name == 'Beta 2'
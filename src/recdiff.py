@@ -0,0 +1,158 @@
+"""Record-level diff of two versions of a pipe-delimited data file.
+
+Works on gfio.RecordSpans (raw bytes + record offsets), so telling which
+records changed costs one hash per record and no decoding; only the records
+that differ are decoded afterwards. Records are matched by position when both
+versions have the same Ids in the same order (the common case: fields edited
+in place), otherwise by Id (duplicate Ids pair up in file order).
+
+compare_spans() adds the column-level view used by the Compare dialog
+(compare.py) and `gfeditor diff`.
+"""
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from . import instrument
+    from .gfio import decode_record
+except ImportError:
+    import instrument
+    from gfio import decode_record
+
+
+def record_id(spans, i: int) -> bytes:
+    """Raw Id of record i (the bytes before the first '|')."""
+    data = spans.data
+    start, end = spans.cstarts[i], spans.cends[i]
+    bar = data.find(b'|', start, end)
+    return data[start:bar if bar >= 0 else end].strip()
+
+
+def record_hashes(spans) -> Sequence[int]:
+    """One hash per record over its content bytes (terminators excluded), as an array('q')."""
+    view = memoryview(spans.data)
+    try:
+        return array('q', [hash(view[a:b]) for a, b in zip(spans.cstarts, spans.cends)])
+    finally:
+        view.release()
+
+
+@dataclass
+class RecordDelta:
+    """How the records of `new` relate to those of `old`.
+
+    changed: (old index, new index) pairs with the same Id and different content.
+    added / removed: new / old indices without a counterpart.
+    new_to_old: for structural changes (records added, removed or moved) the
+    old index of every new record (-1 for added ones); None when records line
+    up one to one by position.
+    """
+    changed: List[Tuple[int, int]] = field(default_factory=list)
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    new_to_old: Optional[List[int]] = None
+
+    @property
+    def structural(self) -> bool:
+        return self.new_to_old is not None
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.added or self.removed or self.new_to_old is not None)
+
+
+def record_keys(spans) -> List:
+    """The key each record is matched by: its raw Id, or (Id, n) for the n-th repeat of an Id."""
+    seen: Dict[bytes, int] = {}
+    keys = []
+    for i in range(len(spans)):
+        rid = record_id(spans, i)
+        n = seen.get(rid)
+        if n is None:
+            seen[rid] = 1
+            keys.append(rid)
+        else:
+            seen[rid] = n + 1
+            keys.append((rid, n))
+    return keys
+
+
+def key_id(key) -> str:
+    """The Id of a record_keys() key, as text."""
+    return (key if isinstance(key, bytes) else key[0]).decode('ascii', 'replace')
+
+
+def diff_records(old, new, old_hashes: Optional[Sequence[int]] = None,
+                 new_hashes: Optional[Sequence[int]] = None) -> RecordDelta:
+    """Compare two RecordSpans. Hashes can be passed in when already computed."""
+    with instrument.span('recdiff.diff_records', cat='diff', old=len(old), new=len(new)) as sp:
+        delta = RecordDelta()
+        if old.data == new.data:
+            return delta
+        oh = old_hashes if old_hashes is not None else record_hashes(old)
+        nh = new_hashes if new_hashes is not None else record_hashes(new)
+        if len(oh) == len(nh):
+            differ = [i for i in range(len(nh)) if oh[i] != nh[i]]
+            if all(record_id(old, i) == record_id(new, i) for i in differ):
+                delta.changed = [(i, i) for i in differ]
+                sp.set(changed=len(differ))
+                return delta
+        # records added/removed/reordered: pair them up by (Id, occurrence)
+        old_index = {k: i for i, k in enumerate(record_keys(old))}
+        new_to_old = []
+        for j, k in enumerate(record_keys(new)):
+            i = old_index.pop(k, -1)
+            new_to_old.append(i)
+            if i < 0:
+                delta.added.append(j)
+            elif oh[i] != nh[j]:
+                delta.changed.append((i, j))
+        delta.removed = sorted(old_index.values())
+        if delta.added or delta.removed or any(i != j for j, i in enumerate(new_to_old)):
+            delta.new_to_old = new_to_old
+        sp.set(changed=len(delta.changed), added=len(delta.added), removed=len(delta.removed))
+        return delta
+
+
+@dataclass
+class RecordChange:
+    """One differing record: kind is 'changed', 'added' (only in right) or 'removed' (only in left)."""
+    kind: str
+    id: str
+    left: Optional[int] = None
+    right: Optional[int] = None
+    columns: List[int] = field(default_factory=list)
+
+
+def column_diff(a: List[str], b: List[str]) -> List[int]:
+    """Indices of the fields that differ (a missing field counts as '')."""
+    n = max(len(a), len(b))
+    return [c for c in range(n) if (a[c] if c < len(a) else '') != (b[c] if c < len(b) else '')]
+
+
+def compare_spans(left, right, encoding: str = 'big5', expected_fields: int = 93) -> List[RecordChange]:
+    """Record/column diff of two scanned files, in right-file order (removed records last).
+
+    Records are compared by hash first; only the ones that differ are decoded
+    and compared column by column. Records whose bytes differ but decode to
+    the same fields (e.g. CRLF vs LF inside a Tip) are not reported.
+    """
+    with instrument.span('recdiff.compare', cat='diff', left=len(left), right=len(right)) as sp:
+        delta = diff_records(left, right)
+        out: List[RecordChange] = []
+        changed = dict((j, i) for i, j in delta.changed)
+        added = set(delta.added)
+        for j in sorted(set(changed) | added):
+            b = decode_record(right, j, encoding, expected_fields)
+            if j in added:
+                out.append(RecordChange('added', b[0], None, j, list(range(len(b)))))
+                continue
+            i = changed[j]
+            a = decode_record(left, i, encoding, expected_fields)
+            cols = column_diff(a, b)
+            if cols:
+                out.append(RecordChange('changed', b[0], i, j, cols))
+        for i in delta.removed:
+            out.append(RecordChange('removed', record_id(left, i).decode('ascii', 'replace'), i, None, []))
+        sp.set(changes=len(out))
+        return out
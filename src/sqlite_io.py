@@ -0,0 +1,455 @@
+"""SQLite export/import of item tables (C_Item, C_ItemMall) and T_ translation files.
+
+Export streams every record of each file into its own table (named after
+the file, e.g. "C_Item", "T_Item") inside a single transaction, with batched
+executemany. Item columns are typed from DEFAULT_HEADER: the text columns
+(TEXT_COLUMNS) are TEXT, every other one INTEGER, with empty cells stored as
+NULL so `SysPrice > 100` means what it says. `_record` (INTEGER PRIMARY KEY,
+never reused) is the record's position in the file, 1-based. Indexes: Id, ItemType,
+ItemQuality, IconFilename (items) and Id (T_). `_gfeditor_files` records
+where each table came from.
+
+    export_files('items.db', ['Assets/Client/C_Item.ini', 'Assets/Translate/T_Item.ini'])
+    for res in import_files('items.db'):
+        gfio.write_targets([res.path], res.chunks)
+
+Triggers log the `_record` of every row inserted, updated or deleted in
+SQL into `_gfeditor_changes`, so import reads only those rows: the cost is
+the number of edits, not the size of the table. When the triggers are gone
+(a tool that rebuilds tables drops them) import compares every row instead.
+
+Import is an edit merge against the current file: a record whose values did
+not change - compared as numbers for INTEGER columns, so '007' and 7 are the
+same - is copied byte for byte. In an edited record only the changed cells
+are rewritten: every other field keeps its text from the file (extra fields
+and the line terminator too), and a REAL written into an INTEGER column is
+rounded only in the cells that changed. Deleted records are dropped and
+inserted rows are appended.
+A file changed on disk since the export is refused unless force=True (its
+newer records would be reverted).
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+import math
+import os
+from pathlib import Path
+import re
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    from . import gfio, instrument
+    from .modules.items.reader import DEFAULT_HEADER
+except ImportError:
+    import gfio
+    import instrument
+    from modules.items.reader import DEFAULT_HEADER
+
+TEXT_COLUMNS = frozenset(('IconFilename', 'ModelFilename', 'UsedSoundName', 'Name', 'RestrictClass', 'Tip'))
+ITEM_INDEXES = ('Id', 'ItemType', 'ItemQuality', 'IconFilename')
+TRANSLATE_COLUMNS = ('Id', 'Name', 'Description')
+RECORD_COLUMN = '_record'
+META_TABLE = '_gfeditor_files'
+CHANGES_TABLE = '_gfeditor_changes'
+BATCH = 5000
+
+
+class SqliteIOError(Exception):
+    """Raised for databases not written by export_files, or files changed since the export."""
+
+
+def default_translate_encoding() -> str:
+    # same as the Translate tab (modules/items/translate.py)
+    return 'mbcs' if os.name == 'nt' else 'utf-8'
+
+
+def file_kind(path) -> str:
+    """'translate' for T_ files, 'items' otherwise."""
+    return 'translate' if Path(path).name.upper().startswith('T_') else 'items'
+
+
+def table_name(path) -> str:
+    """SQL table of a data file: its stem, e.g. C_Item.ini -> C_Item."""
+    return re.sub(r'\W', '_', Path(path).stem) or 'data'
+
+
+def find_data_files(assets_dir) -> List[str]:
+    """C_Item, C_ItemMall and the T_ translation files under an Assets folder."""
+    base = Path(assets_dir)
+    found = []
+    for pattern in ('Client/C_Item.*', 'Client/C_ItemMall.*', 'Translate/T_*.*'):
+        found += sorted(str(p) for p in base.glob(pattern) if p.is_file() and p.suffix.lower() != '.journal')
+    return found
+
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _header(kind: str, width: int) -> List[str]:
+    if kind == 'translate':
+        return list(TRANSLATE_COLUMNS)
+    return list(DEFAULT_HEADER) if width == len(DEFAULT_HEADER) else [f'c{i}' for i in range(width)]
+
+
+def _column_types(kind: str, header: List[str]) -> List[str]:
+    if kind == 'translate':
+        return ['INTEGER', 'TEXT', 'TEXT']
+    return ['TEXT' if name in TEXT_COLUMNS else 'INTEGER' for name in header]
+
+
+def _field_count(spans, sample: int = 2000) -> int:
+    """Most common number of fields over the first records (a stray trailing '|' does not count)."""
+    data = spans.data
+    counts = Counter(data.count(b'|', spans.cstarts[i], spans.cends[i]) + 1 for i in range(min(len(spans), sample)))
+    return counts.most_common(1)[0][0] if counts else len(DEFAULT_HEADER)
+
+
+def decode_translate(spans, i: int, encoding: str) -> List[str]:
+    """[Id, Name, Description] of a T_ record ('id|name|desc|', desc may span lines)."""
+    parts = spans.data[spans.cstarts[i]:spans.cends[i]].decode(encoding, errors='replace').split('|')
+    desc = '|'.join(parts[2:])
+    if desc.endswith('|'):
+        desc = desc[:-1]
+    return [parts[0].strip(), parts[1] if len(parts) > 1 else '', desc]
+
+
+def _decoder(kind: str, encoding: str, width: int):
+    if kind == 'translate':
+        return lambda spans, i: decode_translate(spans, i, encoding)
+    return lambda spans, i: gfio.decode_record(spans, i, encoding, width)
+
+
+def _encoder(kind: str):
+    if kind == 'translate':
+        return lambda values: f'{values[0]}|{values[1]}|{values[2]}|'
+    return '|'.join
+
+
+def _read(path: str, encoding: str):
+    if not gfio.is_ascii_compatible(encoding):
+        raise SqliteIOError(f'{Path(path).name}: encoding {encoding} is not supported (not ASCII compatible)')
+    return gfio.scan_records(Path(path).read_bytes())
+
+
+@dataclass
+class SourceFile:
+    """One exported data file: its table, layout and state on disk at export time."""
+    table: str
+    path: str
+    kind: str
+    encoding: str
+    columns: int
+    records: int = 0
+    size: int = 0
+    mtime_ns: int = 0
+
+
+def _create_triggers(conn, name: str) -> None:
+    t, rec = _q(name), RECORD_COLUMN
+    # table names are word characters only (table_name)
+    log = f"INSERT OR IGNORE INTO {CHANGES_TABLE} VALUES ('{name}'"
+    conn.execute(f'CREATE TRIGGER {_q(name + "_ins")} AFTER INSERT ON {t} BEGIN {log}, new.{rec}); END')
+    conn.execute(f'CREATE TRIGGER {_q(name + "_upd")} AFTER UPDATE ON {t} BEGIN '
+                 f'{log}, old.{rec}); {log}, new.{rec}); END')
+    conn.execute(f'CREATE TRIGGER {_q(name + "_del")} AFTER DELETE ON {t} BEGIN {log}, old.{rec}); END')
+
+
+def export_files(db_path: str, paths: Iterable[str], encoding: str = 'big5',
+                 translate_encoding: Optional[str] = None, progress=None) -> List[SourceFile]:
+    """Write the files into a new SQLite database at db_path (replaced atomically).
+
+    progress(table, rows_done) is called after every batch.
+    """
+    translate_encoding = translate_encoding or default_translate_encoding()
+    db_path = str(db_path)
+    tmp = db_path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp, isolation_level=None)
+    out: List[SourceFile] = []
+    try:
+        # fresh file written in one go: no rollback journal, no fsync per page
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('BEGIN')
+        conn.execute(f'CREATE TABLE {META_TABLE} (table_name TEXT PRIMARY KEY, path TEXT, kind TEXT, '
+                     f'encoding TEXT, columns INTEGER, records INTEGER, size INTEGER, mtime_ns INTEGER)')
+        conn.execute(f'CREATE TABLE {CHANGES_TABLE} (table_name TEXT, record INTEGER, '
+                     f'PRIMARY KEY (table_name, record)) WITHOUT ROWID')
+        for path in paths:
+            path = str(Path(path).resolve())
+            kind = file_kind(path)
+            enc = translate_encoding if kind == 'translate' else encoding
+            name = table_name(path)
+            if name.startswith('_gfeditor') or any(f.table == name for f in out):
+                raise SqliteIOError(f'{Path(path).name}: table name {name} already used')
+            st = os.stat(path)
+            with instrument.span('sqlite.export', cat='io', table=name) as sp:
+                spans = _read(path, enc)
+                header = _header(kind, _field_count(spans))
+                types = _column_types(kind, header)
+                # AUTOINCREMENT: a row inserted after the last one was deleted must not take its number
+                conn.execute(f'CREATE TABLE {_q(name)} ({RECORD_COLUMN} INTEGER PRIMARY KEY AUTOINCREMENT, ' +
+                             ', '.join(f'{_q(h)} {t}' for h, t in zip(header, types)) + ')')
+                # _record is assigned 1..N in insert order; empty INTEGER cells become NULL inside SQLite
+                params = ', '.join("NULLIF(?, '')" if t == 'INTEGER' else '?' for t in types)
+                sql = f'INSERT INTO {_q(name)} ({", ".join(_q(h) for h in header)}) VALUES ({params})'
+                decode = _decoder(kind, enc, len(header))
+                rows: Iterator[List[str]] = (decode(spans, i) for i in range(len(spans)))
+                done = 0
+                while True:
+                    batch = list(islice(rows, BATCH))
+                    if not batch:
+                        break
+                    conn.executemany(sql, batch)
+                    done += len(batch)
+                    if progress is not None:
+                        progress(name, done)
+                for col in (('Id',) if kind == 'translate' else [c for c in ITEM_INDEXES if c in header]):
+                    conn.execute(f'CREATE INDEX {_q(f"{name}_{col}")} ON {_q(name)} ({_q(col)})')
+                _create_triggers(conn, name)
+                sp.set(rows=done)
+            src = SourceFile(name, path, kind, enc, len(header), len(spans), st.st_size, st.st_mtime_ns)
+            conn.execute(f'INSERT INTO {META_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (src.table, src.path, src.kind, src.encoding, src.columns, src.records,
+                          src.size, src.mtime_ns))
+            out.append(src)
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.close()
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    conn.close()
+    os.replace(tmp, db_path)
+    return out
+
+
+def sources(conn) -> List[SourceFile]:
+    try:
+        rows = conn.execute(f'SELECT table_name, path, kind, encoding, columns, records, size, mtime_ns '
+                            f'FROM {META_TABLE} ORDER BY rowid').fetchall()
+    except sqlite3.DatabaseError as exc:
+        raise SqliteIOError(f'not a database written by export-sqlite: {exc}')
+    return [SourceFile(*r) for r in rows]
+
+
+@dataclass
+class ImportResult:
+    source: SourceFile
+    chunks: List = field(default_factory=list)      # new file content (bytes / memoryview chunks)
+    stats: Dict[str, int] = field(default_factory=dict)
+    full_scan: bool = False                         # change log missing: every row was compared
+
+    @property
+    def path(self) -> str:
+        return self.source.path
+
+    @property
+    def changed(self) -> bool:
+        st = self.stats
+        return bool(st.get('updated') or st.get('added') or st.get('deleted'))
+
+
+def _select_list(header: List[str]) -> str:
+    return ', '.join([RECORD_COLUMN] + [f"COALESCE(CAST({_q(h)} AS TEXT), '')" for h in header])
+
+
+def _raw_decoder(kind: str, encoding: str):
+    """Fields of a record as written in the file (no padding, no trimming; T_: decode_translate)."""
+    if kind == 'translate':
+        return lambda spans, i: decode_translate(spans, i, encoding)
+    return lambda spans, i: spans.data[spans.cstarts[i]:spans.cends[i]].decode(encoding, errors='replace').split('|')
+
+
+def _cell_text(value: str, col_type: str) -> str:
+    """Text written for a changed cell: values computed in SQL come back as REAL,
+    integer columns stay integers (rounded half away from zero, like SQL round())."""
+    if col_type != 'INTEGER' or not value:
+        return value
+    try:
+        int(value)
+        return value
+    except ValueError:
+        pass
+    try:
+        f = float(value)
+    except ValueError:
+        return value
+    if not math.isfinite(f):
+        return value
+    return str(int(math.floor(abs(f) + 0.5)) * (1 if f >= 0 else -1))
+
+
+def _same(new: str, old: str) -> bool:
+    """Cell equality for import: numbers compare by value ('007' == '7', '' == '0' is not)."""
+    if new == old:
+        return True
+    if not new or not old:
+        return False
+    try:
+        return int(new) == int(old)
+    except ValueError:
+        try:
+            return float(new) == float(old)
+        except ValueError:
+            return False
+
+
+def _merge_fields(values: List[str], old: List[str], types: List[str]) -> Optional[List[str]]:
+    """The record's fields with the changed cells replaced; None when no cell changed."""
+    out = None
+    for k, (v, t) in enumerate(zip(values, types)):
+        o = old[k] if k < len(old) else ''
+        if k == 0:
+            o = o.strip()
+        if _same(v, o) if t == 'INTEGER' else v == o:
+            continue
+        if out is None:
+            out = list(old)
+        if len(out) <= k:
+            out += [''] * (k + 1 - len(out))
+        out[k] = _cell_text(v, t)
+    return out
+
+
+def _has_change_log(conn, name: str) -> bool:
+    triggers = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+                                           (name,))}
+    return {f'{name}_ins', f'{name}_upd', f'{name}_del'} <= triggers
+
+
+def import_table(conn, src: SourceFile, force: bool = False, full_scan: bool = False) -> ImportResult:
+    """New content of src.path with the table's edits applied (nothing is written)."""
+    result = ImportResult(src)
+    path = Path(src.path)
+    if not path.is_file():
+        raise SqliteIOError(f'{path}: file not found')
+    if src.size < 0:
+        raise SqliteIOError(f'{src.table} was already imported with records added or removed; export again')
+    st = path.stat()
+    if not force and (st.st_size, st.st_mtime_ns) != (src.size, src.mtime_ns):
+        raise SqliteIOError(f'{path.name} changed on disk since the export (force to import anyway)')
+    result.full_scan = full_scan or not _has_change_log(conn, src.table)
+    touched = None
+    if not result.full_scan:
+        touched = {r[0] for r in conn.execute(f'SELECT record FROM {CHANGES_TABLE} WHERE table_name = ?',
+                                              (src.table,))}
+        if not touched:
+            result.stats = {'unchanged': 0, 'updated': 0, 'added': 0, 'deleted': 0}
+            return result
+    with instrument.span('sqlite.import', cat='io', table=src.table) as sp:
+        spans = _read(str(path), src.encoding)
+        if len(spans) != src.records:
+            raise SqliteIOError(f'{path.name} has {len(spans)} records, {src.records} were exported')
+        data = spans.data
+        header = _header(src.kind, src.columns)
+        types = _column_types(src.kind, header)
+        decode, encode = _raw_decoder(src.kind, src.encoding), _encoder(src.kind)
+        sql = f'SELECT {_select_list(header)} FROM {_q(src.table)}'
+        if touched is None:
+            cur = conn.execute(sql + f' ORDER BY {RECORD_COLUMN}')
+        else:
+            cur = conn.execute(sql + f' WHERE {RECORD_COLUMN} IN (SELECT record FROM {CHANGES_TABLE} '
+                               f'WHERE table_name = ?) ORDER BY {RECORD_COLUMN}', (src.table,))
+        n = len(spans)
+        present = set()
+        replaced: Dict[int, bytes] = {}
+        added: List[bytes] = []
+        unchanged = 0
+        while True:
+            batch = cur.fetchmany(BATCH)
+            if not batch:
+                break
+            for rec, *values in batch:
+                i = rec - 1
+                if not 0 <= i < n:
+                    added.append(encode([_cell_text(v, t) for v, t in zip(values, types)])
+                                 .encode(src.encoding, errors='replace'))
+                    continue
+                present.add(i)
+                if encode(values).encode(src.encoding, errors='replace') == data[spans.cstarts[i]:spans.cends[i]]:
+                    unchanged += 1
+                    continue
+                fields = _merge_fields(values, decode(spans, i), types)
+                if fields is None:
+                    unchanged += 1
+                else:
+                    replaced[i] = encode(fields).encode(src.encoding, errors='replace')
+        candidates = range(n) if touched is None else (r - 1 for r in touched if 0 < r <= n)
+        deleted = {i for i in candidates if i not in present}
+        result.stats = {'unchanged': unchanged, 'updated': len(replaced), 'added': len(added), 'deleted': len(deleted)}
+        sp.set(**result.stats)
+        if replaced or added or deleted:
+            result.chunks = _rebuild(spans, replaced, deleted, added)
+    return result
+
+
+def _rebuild(spans, replaced: Dict[int, bytes], deleted, added: List[bytes]) -> List:
+    """File chunks: unchanged runs as memoryview slices, edited records with their own terminators."""
+    data = spans.data
+    view = memoryview(data)
+    chunks: List = []
+    pos = 0
+    for i in sorted(set(replaced) | set(deleted)):
+        if spans.starts[i] > pos:
+            chunks.append(view[pos:spans.starts[i]])
+        if i in replaced:
+            chunks.append(data[spans.starts[i]:spans.cstarts[i]] + replaced[i] +
+                          data[spans.cends[i]:spans.next_start(i)])
+        pos = spans.next_start(i)
+    if pos < len(data):
+        chunks.append(view[pos:])
+    if added:
+        newline = b'\r\n' if len(spans) and data[spans.cends[0]:spans.cends[0] + 2] == b'\r\n' else b'\n'
+        if chunks and len(chunks[-1]) and chunks[-1][-1] not in (10, 13):
+            chunks.append(newline)
+        chunks.append(newline.join(added) + newline)
+    return chunks
+
+
+def import_files(db_path: str, tables: Optional[Iterable[str]] = None, force: bool = False,
+                 full_scan: bool = False) -> List[ImportResult]:
+    """Edits of every exported table (or just `tables`), ready to be written."""
+    if not Path(db_path).is_file():
+        raise SqliteIOError(f'{db_path}: database not found')
+    conn = sqlite3.connect(f'file:{Path(db_path).resolve().as_posix()}?mode=ro', uri=True)
+    try:
+        srcs = sources(conn)
+        if tables:
+            wanted = set(tables)
+            missing = wanted - {s.table for s in srcs}
+            if missing:
+                raise SqliteIOError(f'no such table in the database: {", ".join(sorted(missing))}')
+            srcs = [s for s in srcs if s.table in wanted]
+        return [import_table(conn, s, force=force, full_scan=full_scan) for s in srcs]
+    finally:
+        conn.close()
+
+
+def mark_imported(db_path: str, results: Iterable[ImportResult]) -> None:
+    """After the files were written: the DB matches them again, clear the change log.
+
+    Records added or removed shift the file positions `_record` points at, so
+    such a table can not be imported again (export it anew).
+    """
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        conn.execute('BEGIN')
+        for res in results:
+            src = res.source
+            if res.stats.get('added') or res.stats.get('deleted'):
+                size, mtime_ns = -1, 0
+            else:
+                st = os.stat(src.path)
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+            conn.execute(f'UPDATE {META_TABLE} SET size = ?, mtime_ns = ? WHERE table_name = ?',
+                          (size, mtime_ns, src.table))
+            conn.execute(f'DELETE FROM {CHANGES_TABLE} WHERE table_name = ?', (src.table,))
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
@@ -0,0 +1,45 @@
+"""Tests for the deduplicating backup store."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+import backup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'tools'))
+import synth_items  # noqa: E402
+
+
+def test_snapshots_dedupe_restore_and_prune(tmp_path):
+    paths = synth_items.generate(tmp_path / 'Assets', 3000)
+    client, server = str(paths['client']), str(paths['server'])
+    original = paths['client'].read_bytes()
+    store = backup.BackupStore(backup.default_store_for(client))
+    assert store.root == tmp_path / '.gfeditor' / 'backups'
+
+    first = store.snapshot([client, server], label='save')
+    assert first['new_bytes'] == len(original)      # the identical S_ file adds nothing
+
+    # edit two records and take nine more snapshots: each stores only a few chunks
+    rows = synth_items.make_rows(3000)
+    rows[10][9] = 'edited'
+    rows[2500][92] = 'another tip'
+    synth_items.write_item_file(client, rows)
+    second = store.snapshot([client])
+    assert 0 < second['new_bytes'] < len(original) // 20
+    for _ in range(8):
+        assert store.snapshot([client])['new_bytes'] == 0
+    assert len(store.list()) == 10
+
+    out = store.restore(first['id'], dest_dir=tmp_path / 'restored', only='C_Item.ini')
+    assert Path(out[0]).read_bytes() == original
+    store.restore('latest')
+    assert paths['client'].read_bytes() != original
+
+    stats = store.prune(keep=1)
+    assert stats['snapshots'] == 9 and stats['chunks'] > 0
+    assert [s['id'] for s in store.list()] == [store.get('latest')['id']]
+    with pytest.raises(backup.BackupError):
+        store.get(first['id'])
+    assert store.read_file(store.get('latest')['files'][0]) == paths['client'].read_bytes()
@@ -0,0 +1,44 @@
+"""Compare dialog opened on a loaded C_/S_ pair."""
+
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+
+import compare
+import gfio
+from document import RowDocument
+
+
+def _write(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(''.join(line + '\r\n' for line in lines).encode('big5'))
+
+
+def test_compare_dialog_uses_the_open_pair(tmp_path):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    client = tmp_path / 'Assets' / 'Client' / 'C_Item.ini'
+    server = tmp_path / 'Assets' / 'Server' / 'S_Item.ini'
+    _write(client, ['1|a|10', '2|b|20', '3|c|30'])
+    _write(server, ['1|a|10', '2|b|25', '3|c|30'])
+    rows, spans = gfio.read_pipe_records(str(client), encoding='big5', expected_fields=3)
+
+    parent = QtWidgets.QWidget()
+    parent.document = RowDocument(rows, source=spans)
+    parent.current_path, parent.pair_paths = str(client), (str(client), str(server))
+    dlg = compare.show_compare_dialog(parent, rows, ['Id', 'Name', 'SysPrice'])
+    assert (dlg.current_path, dlg.server_path) == (str(client), str(server))
+
+    dlg.run()                       # default source: the server mirror
+    dlg.worker.wait()
+    app.processEvents()
+    assert [(ch.kind, ch.left, ch.columns) for ch in dlg.result['changes']] == [('changed', 1, [2])]
+
+    # rows that are not the parent's document: only the paths given are used
+    other = [list(r) for r in rows]
+    dlg2 = compare.show_compare_dialog(parent, other, ['Id', 'Name', 'SysPrice'], current_path=str(client))
+    assert dlg2.server_path is None
+    for d in (dlg, dlg2):
+        d.close()
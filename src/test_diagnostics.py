@@ -0,0 +1,18 @@
+"""Tests for the Qt-free helpers of the diagnostics dock."""
+
+import sys
+
+import diagnostics
+
+
+def test_memory_helpers():
+    rows = [[str(i), 'x' * 10, '0'] for i in range(1000)]
+    est = diagnostics.estimate_rows_bytes(rows, sample=50)
+    exact = sys.getsizeof(rows) + sum(sys.getsizeof(r) + sum(sys.getsizeof(c) for c in r) for r in rows)
+    assert abs(est - exact) / exact < 0.05
+    assert diagnostics.estimate_rows_bytes([]) == 0
+    assert diagnostics.format_bytes(512) == '512 B'
+    assert diagnostics.format_bytes(3 * 1024 * 1024) == '3.0 MB'
+    assert diagnostics.format_bytes(None) == '?'
+    rss = diagnostics.process_rss()
+    assert rss is None or rss > 0
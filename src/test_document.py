@@ -0,0 +1,59 @@
+"""Tests for the dirty-tracked row document."""
+
+import gfio
+from document import RowDocument
+
+
+def test_save_only_when_dirty_and_reencode_touched_rows(tmp_path):
+    rows = [[str(i), f'name{i}', '0'] for i in range(5)]
+    doc = RowDocument(rows, encoding='big5')
+    client, server = tmp_path / 'C_Item.ini', tmp_path / 'S_Item.ini'
+
+    assert doc.save([str(client), str(server)]) is False and not client.exists()
+    progress = []
+    assert doc.save([str(client), str(server)], force=True, fsync=True, progress=lambda d, t: progress.append((d, t))) is True
+    assert client.read_bytes() == server.read_bytes() == b''.join(f'{i}|name{i}|0\n'.encode() for i in range(5))
+    assert progress[-1][0] == progress[-1][1] == 2 * client.stat().st_size
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['C_Item.ini', 'S_Item.ini']
+
+    assert doc.set_cell(2, 1, 'name2') is False and not doc.is_dirty
+    assert doc.set_cell(2, 1, '\u9577\u528d') is True
+    rows[4][2] = '7'
+    doc.mark_dirty(4)
+    assert sorted(doc.snapshot().pending) == [2, 4]
+    assert doc.save([str(client), str(server)]) is True and not doc.is_dirty
+    data = client.read_bytes()
+    assert data == server.read_bytes()
+    assert data.splitlines()[2] == '2|\u9577\u528d|0'.encode('big5') and data.splitlines()[4] == b'4|name4|7'
+    assert doc.save([str(client)]) is False
+
+
+def test_edit_during_background_save_stays_dirty():
+    rows = [[str(i), 'a'] for i in range(3)]
+    doc = RowDocument(rows)
+    doc.set_cell(1, 1, 'b')
+    job = doc.snapshot()
+    doc.set_cell(1, 1, 'c')      # edited while the job is being written
+    doc.set_cell(0, 1, 'z')
+    assert b''.join(job.encode()).splitlines()[1] == b'1|b'
+    doc.commit(job)
+    assert sorted(doc.dirty) == [0, 1]
+    assert sorted(doc.snapshot().pending) == [0, 1]
+
+
+def test_unchanged_records_are_copied_byte_exact(tmp_path):
+    src = tmp_path / 'C_Item.ini'
+    # header line, CRLF, a blank line, a multi-line Tip and a byte pair Big5 cannot decode
+    raw = (b'; header\r\n1|a|tip\r\n\r\n2|\xa4\xa4|line1\nline2\r\n3|bad\xff\xfe|x\r\n4|d|e\r\n')
+    src.write_bytes(raw)
+    rows, spans = gfio.read_pipe_records(str(src), encoding='big5', expected_fields=3)
+    assert rows == gfio.read_pipe_file(str(src), encoding='big5', expected_fields=3)
+    doc = RowDocument(rows, encoding='big5', source=spans)
+
+    out = tmp_path / 'out.ini'
+    assert doc.save([str(out)], force=True) and out.read_bytes() == raw
+    doc.set_cell(1, 2, 'new tip')
+    chunks = doc.snapshot().encode()
+    assert len(chunks) == 3     # untouched runs stay single memoryview slices
+    assert doc.save([str(out)])
+    assert out.read_bytes() == raw.replace(b'line1\nline2', b'new tip')
@@ -0,0 +1,55 @@
+"""Closing the main window while a background save is running."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent
+
+SCRIPT = r'''
+import gc, os, sys, time
+from PySide6.QtWidgets import QApplication
+app = QApplication([])
+import gfio, gui
+from document import RowDocument
+
+client, server = sys.argv[1], sys.argv[2]
+write_targets = gfio.write_targets
+
+def slow_write_targets(*args, **kwargs):
+    time.sleep(0.5)
+    return write_targets(*args, **kwargs)
+
+gui._gfio.write_targets = slow_write_targets
+w = gui.MainWindow()
+rows, spans = gfio.read_pipe_records(client, encoding='big5', expected_fields=3)
+w.current_path, w.pair_paths = client, (client, server)
+w.rows, w.document = rows, RowDocument(rows, source=spans)
+w.document.set_cell(1, 2, '99')
+w.save_file(quiet=True)
+assert w._save_worker is not None and w._save_worker.isRunning()
+w.close()
+print('closed', w._save_worker is None, w.document.is_dirty, flush=True)
+del w
+gc.collect()
+print('collected', flush=True)
+os._exit(0)
+'''
+
+
+def test_close_waits_for_running_save(tmp_path):
+    pytest.importorskip('PySide6')
+    client, server = tmp_path / 'C_Item.ini', tmp_path / 'S_Item.ini'
+    for path in (client, server):
+        path.write_bytes(b'1|a|10\r\n2|b|20\r\n')
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', HOME=str(tmp_path),
+               PYTHONPATH=os.pathsep.join([str(SRC), str(SRC / 'modules' / 'items')]))
+    out = subprocess.run([sys.executable, '-c', SCRIPT, str(client), str(server)],
+                         capture_output=True, text=True, env=env, timeout=60)
+    assert out.returncode == 0, out.stderr[-2000:]
+    assert 'closed True False' in out.stdout and 'collected' in out.stdout
+    # both files of the pair were written
+    assert client.read_bytes() == server.read_bytes() == b'1|a|10\r\n2|b|99\r\n'
@@ -0,0 +1,44 @@
+"""Tests for the stage timing spans and Chrome trace export."""
+
+import json
+
+import instrument
+
+
+def test_spans_and_chrome_trace(tmp_path):
+    @instrument.traced('work', cat='test')
+    def work(n):
+        return sum(range(n))
+
+    was_enabled = instrument.is_enabled()
+    instrument.clear()
+    instrument.enable(False)
+    with instrument.span('ignored'):
+        work(10)
+    assert instrument.spans() == []
+
+    instrument.enable(True)
+    try:
+        with instrument.span('outer', cat='test', path=tmp_path) as sp:
+            assert work(1000) == 499500
+            sp.set(rows=3)
+        try:
+            with instrument.span('boom'):
+                raise ValueError('x')
+        except ValueError:
+            pass
+    finally:
+        instrument.enable(was_enabled)
+
+    names = [s['name'] for s in instrument.spans()]
+    assert names == ['work', 'outer', 'boom']
+    outer = instrument.spans()[1]
+    assert outer['args'] == {'path': str(tmp_path), 'rows': 3} and outer['dur'] >= 0
+    assert instrument.spans()[2]['args'] == {'error': 'ValueError'}
+    assert instrument.summary()['work']['count'] == 1
+
+    out = instrument.dump_chrome_trace(str(tmp_path / 'trace.json'))
+    events = json.loads(open(out, encoding='utf-8').read())['traceEvents']
+    assert [e['name'] for e in events if e['ph'] == 'X'] == names
+    assert any(e['ph'] == 'M' for e in events)
+    instrument.clear()
@@ -0,0 +1,73 @@
+"""Tests for the edit journal (crash recovery)."""
+
+import journal
+from document import RowDocument
+
+
+def _rows():
+    return [[str(100 + i), f'name{i}', '0'] for i in range(5)]
+
+
+def test_journal_replays_edits_and_drops_torn_tail(tmp_path):
+    data = tmp_path / 'C_Item.ini'
+    data.write_bytes(b'100|name0|0\n')
+    doc = RowDocument(_rows())
+    doc.journal = journal.Journal(str(data))
+    appended = []
+    doc.journal.on_append = appended.append
+
+    doc.set_cell(1, 1, '\u9577\u528d')
+    before = list(doc.rows[3])
+    doc.rows[3][2] = '7'
+    doc.rows[3].append('tip')
+    doc.mark_dirty(3, before=before)
+    doc.set_cell(4, 0, '999')            # Id change: later records follow the row
+    doc.set_cell(4, 1, 'renamed')
+    doc.journal.close()
+    assert appended == [1, 3, 4, 5]
+
+    # a crash in the middle of the next record leaves a torn tail
+    with open(doc.journal.path, 'ab') as fh:
+        fh.write(journal.encode_record(journal.Record(0, '100', 1, 'name0', 'lost'))[:-3])
+    records = journal.read_journal(doc.journal.path)[1]
+    assert len(records) == 5 and records[0] == journal.Record(1, '101', 1, 'name1', '\u9577\u528d')
+
+    # fresh load with a row removed in front: records are matched by Id
+    fresh = RowDocument(_rows()[1:])
+    applied, conflicts = journal.replay(records, fresh)
+    assert (applied, conflicts) == (5, 0)
+    assert fresh.rows[0][1] == '\u9577\u528d'
+    assert fresh.rows[2] == ['103', 'name3', '7', 'tip']
+    assert fresh.rows[3] == ['999', 'renamed', '0']
+    assert sorted(fresh.dirty) == [0, 2, 3]
+
+    # appending again truncates the torn tail first
+    jr = journal.Journal(str(data))
+    jr.append(0, '100', 2, '0', '1')
+    jr.close()
+    assert len(jr.records()) == 6 and jr.count == 6
+
+
+def test_compact_keeps_unsaved_rows_and_detects_changed_base(tmp_path):
+    data = tmp_path / 'C_Item.ini'
+    data.write_bytes(b'x')
+    doc = RowDocument(_rows())
+    doc.journal = journal.Journal(str(data))
+    doc.set_cell(0, 1, 'a')
+    doc.set_cell(2, 1, 'b')
+    assert not doc.journal.base_changed()
+
+    data.write_bytes(b'saved')
+    assert doc.journal.base_changed()
+    assert doc.journal.compact({2: 1}) == 1
+    assert [r.index for r in doc.journal.records()] == [2] and not doc.journal.base_changed()
+
+    stale = RowDocument(_rows())
+    stale.rows[2][1] = 'other'
+    assert journal.replay(doc.journal.records(), stale) == (1, 1)
+    assert stale.rows[2][1] == 'b'
+
+    assert doc.journal.compact({}) == 0
+    assert not (tmp_path / 'C_Item.ini.journal').exists()
+    doc.set_cell(1, 1, 'c')             # re-created on the next edit
+    assert len(doc.journal.records()) == 1
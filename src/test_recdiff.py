@@ -0,0 +1,58 @@
+"""Tests for record hashing/diffing and incremental reload of a changed file."""
+
+import gfio
+import recdiff
+from document import RowDocument
+
+BASE = b'; header\r\n1|a|x\r\n2|b|y\r\n\r\n3|c|line1\nline2\r\n4|d|w\r\n'
+
+
+def _load(data):
+    spans = gfio.scan_records(data)
+    rows = [gfio.decode_record(spans, i, 'big5', 3) for i in range(len(spans))]
+    return rows, spans
+
+
+def test_in_place_edit_patches_only_changed_rows():
+    rows, old = _load(BASE)
+    doc = RowDocument(rows, source=old)
+    keep = rows[0]
+    new_data = BASE.replace(b'2|b|y', b'2|B|y').replace(b'line1\nline2', b'tip')
+    new = gfio.scan_records(new_data)
+    delta = recdiff.diff_records(old, new)
+    assert delta.changed == [(1, 1), (2, 2)] and not delta.structural
+
+    doc.set_cell(2, 1, 'local')          # unsaved edit wins over the external change
+    decoded = {j: gfio.decode_record(new, j, 'big5', 3) for _, j in delta.changed}
+    patched, conflicts = doc.apply_reload(delta, decoded, new)
+    assert (patched, conflicts) == ([1], [2])
+    assert rows[0] is keep and rows[1] == ['2', 'B', 'y'] and rows[2] == ['3', 'local', 'line1\nline2']
+    # unchanged records are now copied from the new file
+    assert doc.serialize() == new_data.replace(b'3|c|tip', b'3|local|line1\nline2')
+
+
+def test_added_removed_and_moved_records_are_matched_by_id():
+    rows, old = _load(BASE)
+    doc = RowDocument(rows, source=old)
+    doc.set_cell(3, 1, 'edited')          # row 4 moves to index 2
+    new_data = b'; header\r\n1|a|x\r\n3|c|line1\nline2\r\n4|d|w\r\n9|new|z\r\n'
+    new = gfio.scan_records(new_data)
+    delta = recdiff.diff_records(old, new)
+    assert delta.structural and delta.added == [3] and delta.removed == [1] and delta.changed == []
+    assert delta.new_to_old == [0, 2, 3, -1]
+
+    outer = doc.rows
+    patched, conflicts = doc.apply_reload(delta, {3: gfio.decode_record(new, 3, 'big5', 3)}, new)
+    assert doc.rows is outer and [r[0] for r in outer] == ['1', '3', '4', '9']
+    assert patched == [3] and conflicts == [] and sorted(doc.dirty) == [2]
+    assert outer[2] == ['4', 'edited', 'w']
+    assert recdiff.diff_records(new, gfio.scan_records(new_data)).changed == []
+
+
+def test_compare_spans_reports_changed_columns_only():
+    left = gfio.scan_records(BASE)
+    right = gfio.scan_records(BASE.replace(b'2|b|y', b'2|b|Y').replace(b'\r\n', b'\n') + b'5|e|v\n')
+    changes = recdiff.compare_spans(left, right, 'big5', 3)
+    # line endings differ everywhere, but only record 2 decodes differently
+    assert [(c.kind, c.id, c.columns) for c in changes] == [('changed', '2', [2]), ('added', '5', [0, 1, 2])]
+    assert changes[0].left == changes[0].right == 1
@@ -0,0 +1,101 @@
+"""Tests for the SQLite export/import of item and T_ files."""
+
+import os
+import sqlite3
+
+import pytest
+
+import sqlite_io
+from modules.items.reader import DEFAULT_HEADER
+
+
+def _record(rid, name, price='', tail=''):
+    row = [''] * len(DEFAULT_HEADER)
+    row[0], row[9], row[DEFAULT_HEADER.index('SysPrice')] = rid, name, price
+    row[DEFAULT_HEADER.index('ItemType')] = '7'
+    return '|'.join(row) + tail
+
+
+@pytest.fixture
+def files(tmp_path):
+    items = tmp_path / 'C_Item.ini'
+    # 007: non canonical number, kept as written unless its record is edited
+    lines = [_record('1', '劍', '007'), _record('2', 'b', '200', tail='|'), _record('3', 'c', '')]
+    items.write_bytes('\r\n'.join(lines).encode('big5') + b'\r\n')
+    trans = tmp_path / 'T_Item.ini'
+    trans.write_bytes(b'1|Sword|line1\nline2|\n2|Bow|desc|\n')
+    return items, trans
+
+
+def test_export_types_and_noop_import(files, tmp_path):
+    items, trans = files
+    db = tmp_path / 'x.db'
+    srcs = sqlite_io.export_files(str(db), [str(items), str(trans)], translate_encoding='utf-8')
+    assert [(s.table, s.records, s.columns) for s in srcs] == [('C_Item', 3, 93), ('T_Item', 2, 3)]
+    conn = sqlite3.connect(str(db))
+    assert conn.execute('SELECT Name, SysPrice, typeof(SysPrice) FROM C_Item WHERE ItemType = 7 '
+                        'ORDER BY _record').fetchall() == [('劍', 7, 'integer'), ('b', 200, 'integer'),
+                                                           ('c', None, 'null')]
+    assert conn.execute("SELECT Description FROM T_Item WHERE Id = 1").fetchone() == ('line1\nline2',)
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'C_Item_Id', 'C_Item_ItemType', 'C_Item_ItemQuality', 'C_Item_IconFilename', 'T_Item_Id'} <= indexes
+    # rewriting a row with the same values changes nothing
+    conn.execute('UPDATE C_Item SET SysPrice = SysPrice')
+    conn.commit()
+    conn.close()
+    assert [r.changed for r in sqlite_io.import_files(str(db))] == [False, False]
+
+
+def test_sql_edits_come_back_byte_exact(files, tmp_path):
+    items, trans = files
+    original = items.read_bytes()
+    db = tmp_path / 'x.db'
+    sqlite_io.export_files(str(db), [str(items), str(trans)], translate_encoding='utf-8')
+    conn = sqlite3.connect(str(db))
+    conn.execute('UPDATE C_Item SET SysPrice = SysPrice * 1.15 WHERE Id = 2')
+    conn.execute('DELETE FROM C_Item WHERE Id = 3')
+    conn.execute("INSERT INTO C_Item (Id, Name, SysPrice) VALUES (9, 'new', 5)")
+    conn.execute("UPDATE T_Item SET Name = 'Espada' WHERE Id = 1")
+    conn.commit()
+    conn.close()
+
+    for full in (False, True):
+        res_items, res_trans = sqlite_io.import_files(str(db), full_scan=full)
+        assert res_items.full_scan == full
+        assert res_items.stats == {'unchanged': 0 if not full else 1, 'updated': 1, 'added': 1, 'deleted': 1}
+        out = b''.join(res_items.chunks).split(b'\r\n')
+        assert out[0] == original.split(b'\r\n')[0]                 # untouched: '007' kept
+        assert out[1] == _record('2', 'b', '230', tail='|').encode()  # REAL result rounded, stray '|' kept
+        assert out[2] == _record('9', 'new', '5').replace('|7|', '||', 1).encode() and out[3] == b''
+        assert b''.join(res_trans.chunks) == b'1|Espada|line1\nline2|\n2|Bow|desc|\n'
+
+    for res in (res_items, res_trans):
+        with open(res.path, 'wb') as fh:
+            fh.write(b''.join(res.chunks))
+    sqlite_io.mark_imported(str(db), [res_items, res_trans])
+    with pytest.raises(sqlite_io.SqliteIOError):
+        sqlite_io.import_files(str(db), ['C_Item'])           # records moved: export again
+    assert not sqlite_io.import_files(str(db), ['T_Item'])[0].changed
+
+    os.utime(trans, ns=(1, 1))
+    with pytest.raises(sqlite_io.SqliteIOError):
+        sqlite_io.import_table(sqlite3.connect(str(db)), sqlite_io.sources(sqlite3.connect(str(db)))[1])
+
+
+def test_editing_one_column_keeps_the_rest_of_the_record(tmp_path):
+    row = _record('1', 'a', '007').split('|')
+    row[DEFAULT_HEADER.index('AttackSpeed')] = '1.5'
+    row[DEFAULT_HEADER.index('DueDateTime')] = '007'
+    items = tmp_path / 'C_Item.ini'
+    items.write_bytes(('|'.join(row) + '\r\n').encode('big5'))
+    db = tmp_path / 'x.db'
+    sqlite_io.export_files(str(db), [str(items)])
+    conn = sqlite3.connect(str(db))
+    conn.execute("UPDATE C_Item SET Name = 'b', AttackSpeed = AttackSpeed * 1 WHERE Id = 1")
+    conn.commit()
+    conn.close()
+    res, = sqlite_io.import_files(str(db))
+    assert res.stats['updated'] == 1
+    # only Name differs: the REAL 1.5 and both '007' are kept as written
+    row[9] = 'b'
+    assert b''.join(res.chunks) == ('|'.join(row) + '\r\n').encode('big5')
@@ -0,0 +1,24 @@
+"""Import-time guards: the CLI and the item read/write helpers must stay Qt-free."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent
+HEAVY = ('PySide6', 'numpy', 'PIL', 'chardet')
+
+
+def _loaded_after(stmt: str):
+    code = (f'import sys; {stmt}; '
+            f'print(sorted({{m.split(".")[0] for m in sys.modules}} & set({HEAVY!r})))')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), str(SRC.parent)]))
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    return out.stdout.strip()
+
+
+def test_cli_and_items_import_without_qt():
+    assert _loaded_after('import src.cli') == '[]'
+    assert _loaded_after('from modules.items import read_items, write_items_pair') == '[]'
+    # the panel is still reachable, loaded on first access
+    assert 'PySide6' in _loaded_after('import modules.items as m; m.panel_widget')
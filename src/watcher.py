@@ -0,0 +1,131 @@
+"""Watch the open data files for changes made by other programs.
+
+QFileSystemWatcher is used by default; with a poll interval (setting
+watch/poll_ms, or when the watcher cannot add a path, e.g. some network
+drives) the files are stat'ed on a timer instead. Notifications are debounced
+and filtered by (size, mtime): `changed(path)` is emitted once per real change,
+after the writer is done. Saves made by GFEditor itself run between
+`suspend()` and `resume(paths)` so they are not reported back.
+"""
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+DEBOUNCE_MS = 300
+FALLBACK_POLL_MS = 2000
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+class FileWatcher(QObject):
+    """Emits changed(path) when a watched file's size or mtime changes."""
+    changed = Signal(str)
+
+    def __init__(self, parent=None, poll_ms: int = 0, debounce_ms: int = DEBOUNCE_MS):
+        super().__init__(parent)
+        self.poll_ms = poll_ms
+        self.known: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._pending: Set[str] = set()
+        self._suspended = False
+        self._fs = QFileSystemWatcher(self)
+        self._fs.fileChanged.connect(self._on_fs_event)
+        # atomic replaces (os.replace) drop the file watch; the directory event re-arms it
+        self._fs.directoryChanged.connect(self._on_dir_event)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._flush)
+        self._poll = QTimer(self)
+        self._poll.timeout.connect(self._on_poll)
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Replace the watched set with the existing files among paths."""
+        self.clear()
+        for p in paths:
+            if p and os.path.isfile(p):
+                p = os.path.abspath(p)
+                self.known[p] = _stat(p)
+        if not self.known:
+            return
+        use_poll = self.poll_ms > 0
+        if not use_poll:
+            dirs = sorted({os.path.dirname(p) for p in self.known})
+            failed = self._fs.addPaths(list(self.known) + dirs)
+            use_poll = bool(failed)
+        if use_poll:
+            self._poll.start(self.poll_ms if self.poll_ms > 0 else FALLBACK_POLL_MS)
+
+    def clear(self) -> None:
+        watched = self._fs.files() + self._fs.directories()
+        if watched:
+            self._fs.removePaths(watched)
+        self._poll.stop()
+        self._debounce.stop()
+        self.known.clear()
+        self._pending.clear()
+
+    def paths(self):
+        return list(self.known)
+
+    def suspend(self) -> None:
+        """Hold notifications (our own save is writing the files)."""
+        self._suspended = True
+
+    def resume(self, written: Iterable[str] = ()) -> None:
+        """Accept the current state of the files we wrote, then deliver anything else pending."""
+        for p in written:
+            p = os.path.abspath(p)
+            if p in self.known:
+                self.known[p] = _stat(p)
+                self._rearm(p)
+        self._suspended = False
+        if self._pending:
+            self._debounce.start()
+
+    # --- events -----------------------------------------------------------
+    def _rearm(self, path: str) -> None:
+        if not self._poll.isActive() and path not in self._fs.files() and os.path.isfile(path):
+            self._fs.addPath(path)
+
+    def _on_fs_event(self, path: str) -> None:
+        path = os.path.abspath(path)
+        if path in self.known:
+            self._pending.add(path)
+            self._debounce.start()
+
+    def _on_dir_event(self, directory: str) -> None:
+        directory = os.path.abspath(directory)
+        for p in self.known:
+            if os.path.dirname(p) == directory:
+                self._pending.add(p)
+        if self._pending:
+            self._debounce.start()
+
+    def _on_poll(self) -> None:
+        for p, fp in self.known.items():
+            if _stat(p) != fp:
+                self._pending.add(p)
+        if self._pending and not self._debounce.isActive():
+            self._debounce.start()
+
+    def _flush(self) -> None:
+        if self._suspended:
+            return
+        pending, self._pending = self._pending, set()
+        for p in sorted(pending):
+            if p not in self.known:
+                continue
+            self._rearm(p)
+            fp = _stat(p)
+            if fp is None or fp == self.known[p]:
+                # deleted (mid-replace) or touched without a change
+                continue
+            self.known[p] = fp
+            self.changed.emit(p)
@@ -0,0 +1,125 @@
+"""I/O and decode benchmarks on a synthetic dataset.
+
+Not collected by the default test run (file name); run explicitly:
+
+    python -m pytest -q tools/bench/bench_io.py
+    GFEDITOR_BENCH_ROWS=1000000 python -m pytest -q tools/bench/bench_io.py
+
+Results are printed and written as JSON (see conftest.py).
+"""
+import gfio
+import recdiff
+from document import RowDocument
+from modules.items import flags as item_flags
+from modules.items.flag_index import ItemFlagIndex
+from modules.items.reader import DEFAULT_HEADER, read_items
+from modules.items.table import load_table
+from modules.items.translate import TranslateFile
+from modules.items.writer import write_items_pair
+
+
+def test_read_pipe_file_records(bench, dataset):
+    rows = bench(lambda: gfio.read_pipe_file(str(dataset['client']), encoding='big5', expected_fields=93))
+    assert len(rows) == dataset['rows']
+
+
+def test_read_pipe_file_lines(bench, dataset):
+    rows = bench(lambda: gfio.read_pipe_file(str(dataset['client']), encoding='big5'))
+    assert len(rows) >= dataset['rows']
+
+
+def test_read_ids(bench, dataset):
+    ids = bench(lambda: gfio.read_ids(str(dataset['client']), encoding='big5'))
+    assert len(ids) == dataset['rows']
+
+
+def test_read_items(bench, dataset):
+    header, rows, items = bench(lambda: read_items(str(dataset['client']), encoding='big5'), rounds=1)
+    assert len(header) == len(DEFAULT_HEADER) and rows
+
+
+def test_load_table(bench, dataset):
+    table = bench(lambda: load_table(str(dataset['client'])))
+    assert len(table) == dataset['rows']
+
+
+def test_write_pipe_file(bench, dataset, tmp_path):
+    rows = gfio.read_pipe_file(str(dataset['client']), encoding='big5', expected_fields=93)
+    out = tmp_path / 'out.ini'
+    bench(lambda: gfio.write_pipe_file(str(out), rows, encoding='big5'))
+    assert out.stat().st_size > 0
+
+
+def test_write_items_pair(bench, dataset, tmp_path):
+    rows = gfio.read_pipe_file(str(dataset['client']), encoding='big5', expected_fields=93)
+    client, server = tmp_path / 'C_Item.ini', tmp_path / 'S_Item.ini'
+    bench(lambda: write_items_pair(DEFAULT_HEADER, rows, str(client), str(server)))
+    assert client.stat().st_size == server.stat().st_size
+
+
+def test_read_pipe_records(bench, dataset):
+    rows, spans = bench(lambda: gfio.read_pipe_records(str(dataset['client']), encoding='big5', expected_fields=93))
+    assert len(rows) == len(spans) == dataset['rows']
+
+
+def test_document_save_few_edits(bench, dataset, tmp_path):
+    """Byte-exact save after editing 10 records: only those are re-encoded."""
+    rows, spans = gfio.read_pipe_records(str(dataset['client']), encoding='big5', expected_fields=93)
+    client, server = tmp_path / 'C_Item.ini', tmp_path / 'S_Item.ini'
+
+    def setup():
+        doc = RowDocument(rows, encoding='big5', source=spans)
+        for i in range(0, len(rows), max(1, len(rows) // 10)):
+            doc.mark_dirty(i)
+        return doc
+
+    bench(lambda doc: doc.save([str(client), str(server)]), setup=setup)
+    assert client.read_bytes() == server.read_bytes() == dataset['client'].read_bytes()
+
+
+def test_reload_diff_few_changes(bench, dataset):
+    """External change of 10 records: scan + hash + diff of the new bytes, no full decode."""
+    data = dataset['client'].read_bytes()
+    old = gfio.scan_records(data)
+    step = max(1, len(old) // 10)
+    new_data = bytearray(data)
+    for i in range(0, len(old), step):
+        new_data[old.cends[i] - 1:old.cends[i]] = b'#'   # same length: offsets stay valid
+    new_data = bytes(new_data)
+    old_hashes = recdiff.record_hashes(old)
+
+    delta = bench(lambda: recdiff.diff_records(old, gfio.scan_records(new_data), old_hashes=old_hashes))
+    assert len(delta.changed) == len(range(0, len(old), step)) and not delta.structural
+
+
+def test_translate_load(bench, dataset):
+    tf = bench(lambda: TranslateFile(dataset['translate']))
+    assert len(tf.records) == dataset['rows']
+
+
+def test_translate_save(bench, dataset, tmp_path):
+    target = tmp_path / 'T_Item.ini'
+    target.write_bytes(dataset['translate'].read_bytes())
+    tf = TranslateFile(target)
+    bench(tf.save)
+    assert target.stat().st_size > 0
+
+
+def test_decode_flags_scalar(bench, dataset):
+    table = load_table(str(dataset['client']))
+    values = [int(v) for v in table.raw('OpFlags')]
+    decoded = bench(lambda: [item_flags.decode_flags(v) for v in values])
+    assert len(decoded) == dataset['rows']
+
+
+def test_flag_index_build(bench, dataset):
+    table = load_table(str(dataset['client']))
+    index = bench(lambda: ItemFlagIndex(table.rows, table.header))
+    assert index.size == dataset['rows']
+
+
+def test_flag_index_decode_all(bench, dataset):
+    table = load_table(str(dataset['client']))
+    index = ItemFlagIndex(table.rows, table.header)
+    decoded = bench(index.flags.decode_all)
+    assert decoded[0] == item_flags.decode_flags(int(table.rows[0][12]))
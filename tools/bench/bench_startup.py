@@ -0,0 +1,102 @@
+"""Startup budgets: CLI import time (-X importtime) and GUI time to first paint.
+
+Not collected by the default test run (file name); run explicitly:
+
+    python -m pytest -q tools/bench/bench_startup.py
+
+Budgets (milliseconds) can be tightened or relaxed per machine:
+    GFEDITOR_CLI_IMPORT_BUDGET_MS   cumulative import time of src.cli (default 150)
+    GFEDITOR_GUI_PAINT_BUDGET_MS    interpreter start to first MainWindow paint (default 2000)
+
+Each check runs in a fresh interpreter, best of three.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / 'src'
+
+_FIRST_PAINT = r'''
+import os, sys, time
+t0 = float(os.environ['GFEDITOR_T0'])
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+import gui
+
+class _Paint(QObject):
+    def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Paint:
+            print('first_paint_ms', (time.time() - t0) * 1000.0)
+            QTimer.singleShot(0, app.quit)
+            app.removeEventFilter(self)
+        return False
+
+app = QApplication(sys.argv)
+f = _Paint()
+app.installEventFilter(f)
+w = gui.MainWindow()
+w.resize(1000, 600)
+w.show()
+QTimer.singleShot(10000, app.quit)
+app.exec()
+'''
+
+
+def _budget(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), str(ROOT)]))
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return env
+
+
+def cli_import_ms() -> float:
+    """Cumulative -X importtime of src.cli in a fresh interpreter (ms)."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import src.cli'],
+                         capture_output=True, text=True, env=_env(), check=True)
+    for line in out.stderr.splitlines():
+        m = re.match(r'import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*src\.cli\s*$', line)
+        if m:
+            return int(m.group(1)) / 1000.0
+    raise AssertionError('src.cli not found in -X importtime output')
+
+
+def gui_first_paint_ms() -> float:
+    """Wall time from launching a fresh interpreter to the first paint event of MainWindow (ms)."""
+    env = _env()
+    env['GFEDITOR_T0'] = repr(time.time())
+    out = subprocess.run([sys.executable, '-c', _FIRST_PAINT], capture_output=True, text=True,
+                         env=env, cwd=str(ROOT), check=True, timeout=60)
+    for line in out.stdout.splitlines():
+        if line.startswith('first_paint_ms'):
+            return float(line.split()[1])
+    raise AssertionError('no paint event: ' + out.stderr[-500:])
+
+
+def _record(bench, fn):
+    samples = []
+    bench(lambda: samples.append(fn()), rounds=3)
+    return min(samples)
+
+
+def test_cli_import_budget(bench):
+    best = _record(bench, cli_import_ms)
+    budget = _budget('GFEDITOR_CLI_IMPORT_BUDGET_MS', 150)
+    print(f'\nsrc.cli import: {best:.1f} ms (budget {budget:.0f} ms)')
+    assert best <= budget
+
+
+def test_gui_first_paint_budget(bench):
+    best = _record(bench, gui_first_paint_ms)
+    budget = _budget('GFEDITOR_GUI_PAINT_BUDGET_MS', 2000)
+    print(f'\nGUI first paint: {best:.1f} ms (budget {budget:.0f} ms)')
+    assert best <= budget
@@ -0,0 +1,90 @@
+"""Fixtures for the benchmark suite (see bench_io.py).
+
+Environment:
+    GFEDITOR_BENCH_ROWS  records in the synthetic dataset (default 10000; try 100000 or 1000000)
+    GFEDITOR_BENCH_JSON  where to write the results (default bench_results.json in the current dir)
+"""
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+for p in (ROOT / 'src', ROOT / 'tools'):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+_RESULTS = []
+
+
+def bench_rows() -> int:
+    try:
+        return int(os.environ.get('GFEDITOR_BENCH_ROWS', '10000'))
+    except ValueError:
+        return 10000
+
+
+@pytest.fixture(scope='session')
+def dataset(tmp_path_factory):
+    """Synthetic C_Item/S_Item/T_Item files, generated once per session."""
+    import synth_items
+    out = tmp_path_factory.mktemp('bench_data')
+    paths = synth_items.generate(out, bench_rows())
+    paths['rows'] = bench_rows()
+    return paths
+
+
+@pytest.fixture
+def bench(request):
+    """bench(fn, rounds=3, setup=None) -> result of the last call; records best and mean time.
+
+    setup() runs before every round and is not timed; its return value is passed to fn.
+    """
+    def run(fn, rounds: int = 3, setup=None):
+        times = []
+        result = None
+        for _ in range(max(1, rounds)):
+            arg = setup() if setup is not None else None
+            t0 = time.perf_counter()
+            result = fn(arg) if setup is not None else fn()
+            times.append(time.perf_counter() - t0)
+        rows = bench_rows()
+        _RESULTS.append({
+            'name': request.node.name,
+            'rows': rows,
+            'rounds': len(times),
+            'best_s': min(times),
+            'mean_s': sum(times) / len(times),
+            'rows_per_s': rows / min(times) if min(times) > 0 else None,
+        })
+        return result
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _RESULTS:
+        return
+    terminalreporter.write_sep('-', f'benchmarks ({bench_rows()} rows)')
+    for r in _RESULTS:
+        terminalreporter.write_line(f"{r['name']:<40} best {r['best_s'] * 1000:10.1f} ms"
+                                    f"   mean {r['mean_s'] * 1000:10.1f} ms")
+
+
+def pytest_sessionfinish(session):
+    if not _RESULTS:
+        return
+    out = Path(os.environ.get('GFEDITOR_BENCH_JSON') or 'bench_results.json')
+    payload = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': _RESULTS,
+    }
+    try:
+        out.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    except OSError:
+        pass
@@ -0,0 +1,148 @@
+"""Generate synthetic Grand Fantasia item tables for tests and benchmarks.
+
+Writes a C_Item / S_Item pair (93 pipe-separated columns, Big5, identical
+content) and a matching T_Item translation file:
+
+    python tools/synth_items.py OUT_DIR --rows 100000 [--seed 1]
+
+Values follow rough distributions of the real tables: most items are
+materials/consumables, quality is skewed towards Gray/Green, prices are
+log-normal, most items carry OpFlags combinations, a quarter carry a
+RestrictClass mask in the editor's '0xHEX / DEC' form and about one in five
+has a multi-line Tip.
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src'))
+
+from modules.items import flags as item_flags  # noqa: E402
+from modules.items.reader import DEFAULT_HEADER  # noqa: E402
+
+COLUMNS = len(DEFAULT_HEADER)
+COL = {name: i for i, name in enumerate(DEFAULT_HEADER)}
+
+
+def _big5_common_chars():
+    """The Big5 frequently-used block (lead bytes 0xA4-0xC6), decoded once."""
+    out = []
+    for lead in range(0xA4, 0xC7):
+        for trail in list(range(0x40, 0x7F)) + list(range(0xA1, 0xFF)):
+            try:
+                out.append(bytes((lead, trail)).decode('big5'))
+            except UnicodeDecodeError:
+                pass
+    return out
+
+
+# names and tips draw from the start of the block (the most common characters)
+_CHARS = _big5_common_chars()
+_NAME_CHARS = _CHARS[:1500]
+_TIP_CHARS = _CHARS[:800]
+
+# (ItemType, weight): materials and consumables dominate real tables
+_ITEM_TYPES = [(23, 30), (22, 25), (25, 8), (34, 5), (1, 3), (2, 3), (3, 3), (4, 3), (5, 3), (7, 2), (8, 2),
+               (13, 2), (14, 2), (16, 2), (17, 2), (18, 2), (28, 2), (29, 2), (24, 1), (31, 1), (44, 1)]
+_QUALITY = [(1, 40), (2, 25), (3, 15), (4, 8), (5, 6), (6, 4), (7, 2)]
+_FLAG_COMBOS = [0, 0, 0, 0, 0, 0, 1, 4, 4 | 8, 4 | 128, 1 | 2, 128, 4 | 8 | 32, 1 | 256, 65536, 2031616 | 4]
+_FLAG_PLUS_COMBOS = [0] * 12 + [1, 2, 4, 32, 64, 512, 384, 2097152]
+
+
+def _weighted(rng, table):
+    values, weights = zip(*table)
+    return rng.choices(values, weights=weights)[0]
+
+
+def make_row(rng: random.Random, item_id: int):
+    """One 93-column record as a list of strings."""
+    r = ['0'] * COLUMNS
+    r[COL['Id']] = str(item_id)
+    r[COL['IconFilename']] = f'icon{rng.randrange(20000):05d}'
+    r[COL['ModelId']] = str(rng.randrange(5000))
+    r[COL['ModelFilename']] = f'model_{rng.randrange(5000)}.ini' if rng.random() < 0.3 else ''
+    r[COL['UsedSoundName']] = ''
+    r[COL['Name']] = ''.join(rng.choices(_NAME_CHARS, k=rng.randint(2, 7)))
+    r[COL['ItemType']] = str(_weighted(rng, _ITEM_TYPES))
+    r[COL['EquipType']] = str(rng.randrange(12))
+    r[COL['OpFlags']] = str(rng.choice(_FLAG_COMBOS))
+    r[COL['OpFlagsPlus']] = str(rng.choice(_FLAG_PLUS_COMBOS))
+    r[COL['Target']] = str(rng.randint(1, 5))
+    r[COL['RestrictLevel']] = str(min(150, int(rng.expovariate(1 / 25))))
+    if rng.random() < 0.25:
+        ids = rng.sample(sorted(item_flags.ID_TO_CLASS), rng.randint(1, 8))
+        mask = item_flags.class_names_to_mask([item_flags.ID_TO_CLASS[i] for i in ids])
+        r[COL['RestrictClass']] = f'0x{mask:X} / {mask}'
+    r[COL['ItemQuality']] = str(_weighted(rng, _QUALITY))
+    for stat in ('MaxHp', 'MaxMp', 'Str', 'Vit', 'Int', 'Von', 'Agi', 'Attack', 'PhysicoDefence', 'MagicDefence'):
+        if rng.random() < 0.2:
+            r[COL[stat]] = str(rng.randint(1, 500))
+    r[COL['MaxStack']] = str(rng.choice((1, 1, 1, 10, 50, 99, 999)))
+    r[COL['MaxDurability']] = str(rng.choice((0, 0, 100, 200)))
+    r[COL['SysPrice']] = str(int(rng.lognormvariate(6, 2)) % 100000000)
+    r[COL['Tip']] = make_tip(rng)
+    return r
+
+
+def make_tip(rng: random.Random) -> str:
+    lines = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+    return '\n'.join(''.join(rng.choices(_TIP_CHARS, k=rng.randint(6, 30))) for _ in range(lines))
+
+
+def make_rows(n: int, seed: int = 1, first_id: int = 100000):
+    rng = random.Random(seed)
+    return [make_row(rng, first_id + i) for i in range(n)]
+
+
+def write_item_file(path, rows, encoding: str = 'big5', newline: str = '\r\n') -> None:
+    data = newline.join('|'.join(r) for r in rows) + newline
+    Path(path).write_bytes(data.encode(encoding, errors='replace'))
+
+
+def write_translate_file(path, rows, encoding: str = 'utf-8') -> None:
+    """T_Item format: 'id|name|desc' where desc may span lines; the last line ends with '|'."""
+    out = []
+    for r in rows:
+        tip = r[COL['Tip']].split('\n')
+        name = f'Item {r[COL["Id"]]}'
+        if len(tip) == 1:
+            out.append(f'{r[COL["Id"]]}|{name}|Descricao do item {r[COL["Id"]]}|')
+        else:
+            out.append(f'{r[COL["Id"]]}|{name}|Linha 1')
+            out.extend(f'Linha {i}' for i in range(2, len(tip)))
+            out.append(f'Linha {len(tip)}|')
+    Path(path).write_text('\n'.join(out) + '\n', encoding=encoding)
+
+
+def generate(out_dir, n: int, seed: int = 1) -> dict:
+    """Write C_Item.ini, S_Item.ini and T_Item.ini under out_dir. Returns the paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows = make_rows(n, seed)
+    paths = {
+        'client': out_dir / 'C_Item.ini',
+        'server': out_dir / 'S_Item.ini',
+        'translate': out_dir / 'T_Item.ini',
+    }
+    write_item_file(paths['client'], rows)
+    write_item_file(paths['server'], rows)
+    write_translate_file(paths['translate'], rows)
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Generate synthetic C_Item/S_Item/T_Item files.')
+    ap.add_argument('out_dir')
+    ap.add_argument('--rows', type=int, default=10000)
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args(argv)
+    paths = generate(args.out_dir, args.rows, args.seed)
+    for kind, p in paths.items():
+        print(f'{kind}: {p} ({p.stat().st_size / 1e6:.1f} MB)')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())